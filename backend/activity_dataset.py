@@ -0,0 +1,147 @@
+"""Activity dataset seeding.
+
+The dataset lives in versioned seed files under ``backend/data``
+(``activities.v<N>.json`` or ``.csv``) and is upserted keyed on a stable
+slug, so reseeding is idempotent: unchanged activities are not written at
+all, changed ones are updated in place and keep their ``id`` (which daily
+picks reference).
+"""
+import csv
+import hashlib
+import json
+import os
+import random
+import re
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+DATA_DIR = Path(__file__).parent / "data"
+DEFAULT_SEED_FILE = DATA_DIR / "activities.v1.json"
+
+CONTENT_FIELDS = ("title", "description", "category", "difficulty", "estimated_time_minutes")
+
+
+def slugify(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
+
+
+def seed_file_path() -> Path:
+    return Path(os.environ.get("ACTIVITY_DATASET_PATH", DEFAULT_SEED_FILE))
+
+
+@lru_cache(maxsize=4)
+def load_seed_file(path: str) -> Dict:
+    """Parse a seed file into ``{"version": int, "activities": [...]}``."""
+    path = Path(path)
+    if path.suffix == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            activities = [
+                {**row, "estimated_time_minutes": int(row.get("estimated_time_minutes") or 15)}
+                for row in csv.DictReader(f)
+            ]
+        match = re.search(r"\.v(\d+)\.csv$", path.name)
+        seed = {"version": int(match.group(1)) if match else 1, "activities": activities}
+    else:
+        with open(path, encoding="utf-8") as f:
+            seed = json.load(f)
+
+    for activity in seed["activities"]:
+        activity.setdefault("slug", slugify(activity["title"]))
+        activity.setdefault("category", "general")
+        activity.setdefault("difficulty", "easy")
+        activity.setdefault("estimated_time_minutes", 15)
+    return seed
+
+
+def content_hash(activity: Dict) -> str:
+    content = json.dumps([activity.get(field) for field in CONTENT_FIELDS], sort_keys=True)
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+async def ensure_indexes(activity_collection):
+    # Partial so pre-slug documents don't collide on a null slug
+    await activity_collection.create_index(
+        [("slug", ASCENDING)], unique=True, partialFilterExpression={"slug": {"$type": "string"}}
+    )
+
+
+async def _existing(activity_collection, activities: List[Dict], batch_size: int) -> Dict[str, Dict]:
+    """Existing documents for the seed, by slug; legacy documents without a slug are matched by title."""
+    by_slug = {}
+    for start in range(0, len(activities), batch_size):
+        chunk = activities[start:start + batch_size]
+        async for doc in activity_collection.find(
+            {"slug": {"$in": [a["slug"] for a in chunk]}},
+            {"_id": 1, "slug": 1, "content_hash": 1}
+        ):
+            by_slug[doc["slug"]] = doc
+
+        legacy_titles = {a["title"]: a["slug"] for a in chunk if a["slug"] not in by_slug}
+        if legacy_titles:
+            async for doc in activity_collection.find(
+                {"slug": {"$exists": False}, "title": {"$in": list(legacy_titles)}},
+                {"_id": 1, "title": 1}
+            ):
+                by_slug.setdefault(legacy_titles[doc["title"]], doc)
+    return by_slug
+
+
+async def seed_activity_dataset(
+    activity_collection,
+    path: Optional[Path] = None,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+) -> Dict:
+    """Upsert the seed file into ``activity_dataset``; returns inserted/updated/unchanged counts."""
+    seed = load_seed_file(str(path or seed_file_path()))
+    activities = seed["activities"]
+    existing = await _existing(activity_collection, activities, batch_size)
+
+    now = datetime.utcnow()
+    operations = []
+    inserted = updated = unchanged = 0
+    for activity in activities:
+        digest = content_hash(activity)
+        current = existing.get(activity["slug"])
+        if current and current.get("content_hash") == digest:
+            unchanged += 1
+            continue
+
+        fields = {field: activity[field] for field in CONTENT_FIELDS}
+        fields.update({"slug": activity["slug"], "content_hash": digest, "dataset_version": seed["version"]})
+        if current:
+            updated += 1
+            operations.append(UpdateOne({"_id": current["_id"]}, {"$set": fields}))
+        else:
+            inserted += 1
+            operations.append(UpdateOne(
+                {"slug": activity["slug"]},
+                {
+                    "$set": fields,
+                    "$setOnInsert": {
+                        "id": str(uuid.uuid4()),
+                        "is_active": True,
+                        "random_key": random.random(),
+                        "created_at": now
+                    }
+                },
+                upsert=True
+            ))
+
+    if not dry_run:
+        for start in range(0, len(operations), batch_size):
+            await activity_collection.bulk_write(operations[start:start + batch_size], ordered=False)
+
+    return {
+        "version": seed["version"],
+        "total": len(activities),
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": unchanged,
+        "dry_run": dry_run
+    }
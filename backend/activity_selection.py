@@ -0,0 +1,197 @@
+"""Daily global activity selection.
+
+Every dataset activity carries a ``random_key`` in [0, 1); a pick is a single
+indexed ``find_one`` for the first key at or after a random point, instead of
+loading the whole dataset into Python. Picks can be weighted by category and
+difficulty and avoid anything used within the last ``horizon`` days.
+
+Weights are configured as ``name=weight`` lists, e.g.
+``ACTIVITY_CATEGORY_WEIGHTS=physical=3,wellness=2,learning=1``; categories or
+difficulties left out keep weight 1.
+"""
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+REPEAT_HORIZON_DAYS = int(os.environ.get("ACTIVITY_REPEAT_HORIZON_DAYS", 30))
+# Upper bound on one schedule() call, which builds every pick in memory
+MAX_SCHEDULE_DAYS = 366
+
+
+def parse_weights(spec: Optional[str]) -> Dict[str, float]:
+    weights = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, weight = item.split("=", 1)
+            weights[name.strip()] = float(weight)
+    return weights
+
+
+async def ensure_indexes(activity_collection):
+    await activity_collection.create_index([("is_active", ASCENDING), ("random_key", ASCENDING)])
+    await activity_collection.create_index(
+        [("is_active", ASCENDING), ("category", ASCENDING), ("difficulty", ASCENDING), ("random_key", ASCENDING)]
+    )
+
+
+async def backfill_random_keys(activity_collection) -> int:
+    updates = [
+        UpdateOne({"_id": doc["_id"]}, {"$set": {"random_key": random.random()}})
+        async for doc in activity_collection.find({"random_key": {"$exists": False}}, {"_id": 1})
+    ]
+    if not updates:
+        return 0
+    return (await activity_collection.bulk_write(updates, ordered=False)).modified_count
+
+
+def daily_activity_doc(date_str: str, activity: Dict, rng: random.Random) -> Dict:
+    """Build a daily_global_activities document for a picked dataset activity."""
+    # Random time between 05:00 and 00:00 GMT (19 hour window)
+    base_time = datetime.strptime(f"{date_str} 05:00:00", "%Y-%m-%d %H:%M:%S")
+    selected_time = base_time + timedelta(hours=rng.randint(0, 19), minutes=rng.randint(0, 59))
+
+    return {
+        "id": str(uuid.uuid4()),
+        "activity_id": activity["id"],
+        "date": date_str,
+        "selected_at": selected_time,
+        "activity_title": activity["title"],
+        "activity_description": activity["description"],
+        "is_active": True,
+        "participant_count": 0
+    }
+
+
+class ActivitySelector:
+    def __init__(
+        self,
+        activity_collection,
+        daily_collection,
+        category_weights: Optional[Dict[str, float]] = None,
+        difficulty_weights: Optional[Dict[str, float]] = None,
+        horizon_days: int = REPEAT_HORIZON_DAYS,
+        rng: Optional[random.Random] = None,
+    ):
+        self.activities = activity_collection
+        self.daily = daily_collection
+        self.category_weights = category_weights if category_weights is not None else parse_weights(
+            os.environ.get("ACTIVITY_CATEGORY_WEIGHTS"))
+        self.difficulty_weights = difficulty_weights if difficulty_weights is not None else parse_weights(
+            os.environ.get("ACTIVITY_DIFFICULTY_WEIGHTS"))
+        self.horizon_days = horizon_days
+        self.rng = rng or random.Random()
+
+    async def recent_activity_ids(self, before_date: str) -> List[str]:
+        """Activities picked in the ``horizon_days`` before ``before_date``, newest first."""
+        if self.horizon_days <= 0:
+            return []
+        recent = await self.daily.find(
+            {"date": {"$lt": before_date}},
+            {"_id": 0, "activity_id": 1}
+        ).sort("date", -1).limit(self.horizon_days).to_list(length=self.horizon_days)
+        return [doc["activity_id"] for doc in recent]
+
+    def _weighted_choice(self, values: List[str], weights: Dict[str, float]) -> Optional[str]:
+        if not weights or not values:
+            return None
+        return self.rng.choices(values, weights=[weights.get(value, 1.0) for value in values])[0]
+
+    async def _random_key_pick(self, query: Dict) -> Optional[Dict]:
+        point = self.rng.random()
+        activity = await self.activities.find_one(
+            {**query, "random_key": {"$gte": point}}, sort=[("random_key", ASCENDING)]
+        )
+        if activity is None:
+            # Wrap around to the start of the key space
+            activity = await self.activities.find_one(
+                {**query, "random_key": {"$lt": point}}, sort=[("random_key", ASCENDING)]
+            )
+        return activity
+
+    async def _sample_pick(self, query: Dict) -> Optional[Dict]:
+        sampled = await self.activities.aggregate([{"$match": query}, {"$sample": {"size": 1}}]).to_list(length=1)
+        return sampled[0] if sampled else None
+
+    async def pick(self, exclude_ids: Set[str], categories: List[str], difficulties: List[str]) -> Optional[Dict]:
+        category = self._weighted_choice(categories, self.category_weights)
+        difficulty = self._weighted_choice(difficulties, self.difficulty_weights)
+
+        base = {"is_active": True}
+        if exclude_ids:
+            base["id"] = {"$nin": list(exclude_ids)}
+
+        # Relax constraints until something matches: weights, then the repeat horizon
+        attempts = []
+        if category and difficulty:
+            attempts.append({**base, "category": category, "difficulty": difficulty})
+        if category:
+            attempts.append({**base, "category": category})
+        if difficulty:
+            attempts.append({**base, "difficulty": difficulty})
+        attempts += [base, {"is_active": True}]
+
+        for query in attempts:
+            activity = await self._random_key_pick(query)
+            if activity is None:
+                # Documents without random_key (not yet backfilled) are still reachable
+                activity = await self._sample_pick(query)
+            if activity is not None:
+                return activity
+        return None
+
+    async def _dimensions(self):
+        categories = await self.activities.distinct("category", {"is_active": True}) if self.category_weights else []
+        difficulties = await self.activities.distinct("difficulty", {"is_active": True}) if self.difficulty_weights else []
+        return categories, difficulties
+
+    async def select(self, date_str: str) -> Optional[Dict]:
+        """Pick the dataset activity for one day."""
+        categories, difficulties = await self._dimensions()
+        recent = set(await self.recent_activity_ids(date_str))
+        return await self.pick(recent, categories, difficulties)
+
+    async def schedule(self, start_date: str, days: int) -> Dict:
+        """Pre-generate picks for ``days`` consecutive days from ``start_date`` in one pass.
+
+        Existing days are left untouched; returns created and skipped counts.
+        """
+        categories, difficulties = await self._dimensions()
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        dates = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+        existing = {
+            doc["date"]: doc["activity_id"]
+            async for doc in self.daily.find({"date": {"$in": dates}}, {"_id": 0, "date": 1, "activity_id": 1})
+        }
+
+        # Recently-used ring, carried forward as the schedule is built
+        ring = list(reversed(await self.recent_activity_ids(start_date)))
+        docs = []
+        for date_str in dates:
+            if date_str in existing:
+                activity_id = existing[date_str]
+            else:
+                window = set(ring[-self.horizon_days:]) if self.horizon_days > 0 else set()
+                activity = await self.pick(window, categories, difficulties)
+                if activity is None:
+                    break
+                docs.append(daily_activity_doc(date_str, activity, self.rng))
+                activity_id = activity["id"]
+            ring.append(activity_id)
+
+        created = len(docs)
+        if docs:
+            try:
+                await self.daily.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                # Days created concurrently by another worker keep their pick
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+                created = e.details.get("nInserted", 0)
+
+        return {"created": created, "skipped": days - created, "start_date": start_date, "days": days}
@@ -0,0 +1,77 @@
+"""One-time startup bootstrap shared by all workers.
+
+Index builds, backfills, migrations and dataset seeding only need to run
+once per deploy, not once per uvicorn worker. The first worker to take the
+bootstrap lease runs them and records a version in the ``migrations``
+collection; the others wait for that marker. The version is a
+``fingerprint`` of the steps' source and the seed files they load, so a
+deploy that changes either reruns the (idempotent) steps without anyone
+bumping a constant.
+"""
+import asyncio
+import hashlib
+import inspect
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Union
+
+import mongo
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP_ID = "bootstrap"
+
+POLL_SECONDS = float(os.environ.get("BOOTSTRAP_POLL_SECONDS", 1))
+
+
+def fingerprint(*code, files: Iterable[Union[str, Path]] = ()) -> str:
+    """Version string for the bootstrap: a hash of the source of ``code`` (modules, functions) and ``files``."""
+    digest = hashlib.blake2b(digest_size=8)
+    for obj in code:
+        digest.update(inspect.getsource(obj).encode())
+    for path in files:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+async def _keep_lease(lock):
+    while True:
+        await asyncio.sleep(lock.ttl.total_seconds() / 3)
+        await lock.acquire()
+
+
+async def run_once(db, lock, steps: Callable[[], Awaitable[None]], version: str) -> bool:
+    """Run ``steps`` unless this version already ran; True if this worker ran them.
+
+    Waiting workers take over if the runner dies (its lease expires) before
+    recording the marker.
+    """
+    while True:
+        if await db.migrations.find_one({"_id": BOOTSTRAP_ID, "version": version}):
+            return False
+
+        if await lock.acquire():
+            # Re-check: another worker may have finished between our read and the lease
+            if await db.migrations.find_one({"_id": BOOTSTRAP_ID, "version": version}):
+                await lock.release()
+                return False
+
+            logger.info(f"Running startup bootstrap {version} as {lock.owner}")
+            lease = asyncio.create_task(_keep_lease(lock))
+            try:
+                # The long background budget covers the steps only, not waiting on another worker
+                with mongo.background_timeout():
+                    await steps()
+                await db.migrations.update_one(
+                    {"_id": BOOTSTRAP_ID},
+                    {"$set": {"version": version, "completed_at": datetime.utcnow(), "owner": lock.owner}},
+                    upsert=True
+                )
+            finally:
+                lease.cancel()
+                await lock.release()
+            return True
+
+        await asyncio.sleep(POLL_SECONDS)
@@ -0,0 +1,84 @@
+"""UTC datetime storage.
+
+All timestamps are stored as BSON datetimes in UTC (naive ``datetime``
+objects, as pymongo returns them) so range queries on ``created_at``,
+``expires_at`` and ``completed_at`` are index-served and nothing needs
+parsing per request. ``migrate_string_timestamps`` converts the ISO strings
+older admin routes wrote, in bulk.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional, Union
+
+from pymongo import UpdateOne
+
+# (collection, field, filter, naive_is_local) for fields that historically held
+# ISO strings. Follows and follow notifications were written with utcnow(); the
+# global-challenge admin routes (challenges, drop notifications, read_at) used
+# server-local now().
+STRING_TIMESTAMP_FIELDS = [
+    ("global_challenges", "created_at", {}, True),
+    ("global_challenges", "expires_at", {}, True),
+    ("follows", "created_at", {}, False),
+    ("notifications", "created_at", {"type": "new_follower"}, False),
+    ("notifications", "created_at", {"type": {"$ne": "new_follower"}}, True),
+    ("notifications", "read_at", {}, True),
+]
+
+MIGRATION_ID = "normalize_datetimes_v1"
+
+
+def utcnow() -> datetime:
+    return datetime.utcnow()
+
+
+def to_utc(value: Union[str, datetime, None], naive_is_local: bool = False) -> Optional[datetime]:
+    """Convert an ISO string or datetime to a naive UTC datetime.
+
+    Naive input is taken as UTC unless ``naive_is_local`` is set (the old
+    global-challenge admin routes wrote ``datetime.now()`` in server-local time).
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        if not naive_is_local:
+            return value
+        value = value.astimezone()
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def migrate_string_timestamps(db, batch_size: int = 1000) -> Dict[str, int]:
+    """Convert string timestamps to BSON datetimes; returns converted counts per collection.field."""
+    converted = {}
+    for collection_name, field, extra_filter, naive_is_local in STRING_TIMESTAMP_FIELDS:
+        collection = db[collection_name]
+        count = 0
+        batch = []
+        async for doc in collection.find({**extra_filter, field: {"$type": "string"}}, {"_id": 1, field: 1}):
+            try:
+                value = to_utc(doc[field], naive_is_local=naive_is_local)
+            except ValueError:
+                continue
+            batch.append(UpdateOne({"_id": doc["_id"], field: doc[field]}, {"$set": {field: value}}))
+            if len(batch) >= batch_size:
+                count += (await collection.bulk_write(batch, ordered=False)).modified_count
+                batch = []
+        if batch:
+            count += (await collection.bulk_write(batch, ordered=False)).modified_count
+        key = f"{collection_name}.{field}"
+        converted[key] = converted.get(key, 0) + count
+    return converted
+
+
+async def migrate_once(db) -> Optional[Dict[str, int]]:
+    """Run the migration unless it's already recorded as done; returns counts when it ran."""
+    if await db.migrations.find_one({"_id": MIGRATION_ID}):
+        return None
+    converted = await migrate_string_timestamps(db)
+    await db.migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"completed_at": utcnow(), "converted": converted}},
+        upsert=True
+    )
+    return converted
@@ -0,0 +1,132 @@
+"""Projection-based group reads.
+
+Group documents carry the member list, reveal history and point tables, but
+most endpoints only need a handful of fields. Each method here fetches just
+what one kind of request needs; membership is checked server-side with an
+``$elemMatch`` projection so the member array isn't shipped either.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+SUMMARY_FIELDS = (
+    "id", "name", "description", "category", "is_public", "created_by", "created_at",
+    "member_count", "max_members", "admin_id", "invite_code", "current_challenge",
+    "submission_day", "current_week_start", "activities_submitted_this_week",
+    "activities_needed", "submission_phase_active",
+)
+SUMMARY_PROJECTION = {"_id": 0, **{field: 1 for field in SUMMARY_FIELDS}}
+
+ADMIN_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "admin_id": 1,
+    "current_week_start": 1,
+}
+
+WEEK_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "current_week_start": 1,
+    "submission_phase_active": 1,
+    "activities_submitted_this_week": 1,
+}
+
+CURRENT_DAY_PROJECTION = {"_id": 0, "id": 1, "current_day_activity": 1}
+
+POINTS_PROJECTION = {"_id": 0, "id": 1, "current_week_points": 1}
+
+DEFAULT_MAX_MEMBERS = 7
+
+# join() outcomes
+JOINED = "joined"
+NOT_FOUND = "not_found"
+ALREADY_MEMBER = "already_member"
+FULL = "full"
+
+REVEAL_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "current_week_start": 1,
+    "daily_reveals.day_number": 1,
+    "daily_reveals.activity_id": 1,
+}
+
+
+class GroupRepository:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def _find(self, group_id: str, projection: Dict) -> Optional[Dict]:
+        return await self.collection.find_one({"id": group_id}, projection)
+
+    async def summary(self, group_id: str) -> Optional[Dict]:
+        return await self._find(group_id, SUMMARY_PROJECTION)
+
+    async def summaries(self, query: Dict, limit: int = 0) -> List[Dict]:
+        cursor = self.collection.find(query, SUMMARY_PROJECTION)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=None)
+
+    async def for_admin(self, group_id: str) -> Optional[Dict]:
+        """Fields needed to authorize admin actions."""
+        return await self._find(group_id, ADMIN_PROJECTION)
+
+    async def for_week(self, group_id: str, user_id: Optional[str] = None) -> Optional[Dict]:
+        """Submission-phase state, plus ``is_member`` when ``user_id`` is given."""
+        if user_id is None:
+            return await self._find(group_id, WEEK_PROJECTION)
+        return await self.membership(group_id, user_id, WEEK_PROJECTION)
+
+    async def current_day_activity(self, group_id: str) -> Optional[Dict]:
+        return await self._find(group_id, CURRENT_DAY_PROJECTION)
+
+    async def points(self, group_id: str) -> Optional[Dict]:
+        return await self._find(group_id, POINTS_PROJECTION)
+
+    async def for_reveal(self, group_id: str) -> Optional[Dict]:
+        """Week start and which days/activities were already revealed."""
+        return await self._find(group_id, REVEAL_PROJECTION)
+
+    async def membership(self, group_id: str, user_id: str, projection: Optional[Dict] = None) -> Optional[Dict]:
+        """The group (``projection`` fields, default id/name) with ``is_member`` set; None if it doesn't exist."""
+        return await self._membership({"id": group_id}, user_id, projection)
+
+    async def _membership(self, query: Dict, user_id: str, projection: Optional[Dict]) -> Optional[Dict]:
+        fields = dict(projection or {"_id": 0, "id": 1, "name": 1})
+        fields["members"] = {"$elemMatch": {"$eq": user_id}}
+        group = await self.collection.find_one(query, fields)
+        if group is not None:
+            group["is_member"] = bool(group.pop("members", None))
+        return group
+
+    async def join(self, query: Dict, user_id: str) -> Tuple[str, Optional[Dict]]:
+        """Add ``user_id`` to the group matching ``query`` in one conditional update.
+
+        The filter carries the membership and capacity checks, so concurrent
+        joins can neither exceed ``max_members`` nor add a member twice.
+        Returns ``(outcome, summary)``; the summary is None only for NOT_FOUND.
+        """
+        group = await self.collection.find_one_and_update(
+            {
+                **query,
+                "members": {"$ne": user_id},
+                "$expr": {"$lt": [{"$size": "$members"}, {"$ifNull": ["$max_members", DEFAULT_MAX_MEMBERS]}]}
+            },
+            {
+                "$addToSet": {"members": user_id},
+                "$inc": {"member_count": 1},
+                "$set": {f"current_week_points.{user_id}": 0}
+            },
+            projection=SUMMARY_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if group is not None:
+            return JOINED, group
+
+        # The guard failed; find out why
+        group = await self._membership(query, user_id, SUMMARY_PROJECTION)
+        if group is None:
+            return NOT_FOUND, None
+        return (ALREADY_MEMBER if group.pop("is_member") else FULL), group
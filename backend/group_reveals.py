@@ -0,0 +1,194 @@
+"""Group daily activity reveals.
+
+``batch_reveal`` reveals the next activity for many groups in one pass: it
+streams eligible groups, loads the chunk's weekly submissions with a single
+``$in`` query, and applies group and submission updates with ``bulk_write``
+per chunk instead of one request (and several round trips) per group.
+"""
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# UTC hour at which scheduled group reveals fire each day
+GROUP_REVEAL_HOUR = int(os.environ.get("GROUP_REVEAL_HOUR", 9))
+
+ACTIVITIES_PER_WEEK = 7
+
+GROUP_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "current_week_start": 1,
+    "daily_reveals.day_number": 1,
+    "daily_reveals.activity_id": 1,
+    "daily_reveals.revealed_at": 1,
+}
+
+
+async def ensure_indexes(db):
+    await db.groups.create_index("next_reveal_at", sparse=True)
+    await db.weekly_activity_submissions.create_index([("group_id", 1), ("week_start", 1)])
+
+
+def next_reveal_time(after: datetime) -> datetime:
+    """Next scheduled reveal slot (GROUP_REVEAL_HOUR UTC) strictly after ``after``."""
+    slot = after.replace(hour=GROUP_REVEAL_HOUR, minute=0, second=0, microsecond=0)
+    return slot if slot > after else slot + timedelta(days=1)
+
+
+def build_reveal(activity: Dict, day_number: int, now: datetime) -> Dict:
+    return {
+        "day_number": day_number,
+        "activity_id": activity["id"],
+        "activity_title": activity["activity_title"],
+        "activity_description": activity["activity_description"],
+        "revealed_at": now,
+        "submitted_by": activity["submitted_by"]
+    }
+
+
+def reveal_updates(group_id: str, reveal: Dict, remaining_after: int) -> Tuple[Tuple[Dict, Dict], Tuple[Dict, Dict]]:
+    """(filter, update) pairs for the group and submission; guarded so a day is never revealed twice."""
+    group_update = {
+        "$push": {"daily_reveals": reveal},
+        "$set": {"current_day_activity": reveal}
+    }
+    if remaining_after > 0:
+        group_update["$set"]["next_reveal_at"] = next_reveal_time(reveal["revealed_at"])
+    else:
+        group_update["$unset"] = {"next_reveal_at": ""}
+
+    return (
+        ({"id": group_id, "daily_reveals.day_number": {"$ne": reveal["day_number"]}}, group_update),
+        (
+            {"id": reveal["activity_id"], "is_revealed": False},
+            {"$set": {"is_revealed": True, "reveal_date": reveal["revealed_at"]}}
+        ),
+    )
+
+
+async def batch_reveal(
+    db,
+    now: Optional[datetime] = None,
+    due_only: bool = True,
+    group_ids: Optional[List[str]] = None,
+    chunk_size: int = 500,
+    dry_run: bool = False,
+    rng: Optional[random.Random] = None,
+) -> Dict:
+    """Reveal the next unrevealed activity for every eligible group.
+
+    ``due_only`` limits the pass to groups whose ``next_reveal_at`` has passed
+    (the scheduler's mode); otherwise every group with a full week of
+    submissions that hasn't had a reveal today is eligible.
+    """
+    now = now or datetime.utcnow()
+    rng = rng or random.Random()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    query: Dict = {"current_week_start": {"$ne": None}}
+    if due_only:
+        query["next_reveal_at"] = {"$lte": now}
+    if group_ids:
+        query["id"] = {"$in": group_ids}
+
+    metrics = {
+        "dry_run": dry_run,
+        "groups_scanned": 0,
+        "groups_revealed": 0,
+        "skipped_not_ready": 0,
+        "skipped_revealed_today": 0,
+        "skipped_exhausted": 0,
+        "chunks": 0,
+        "group_writes": 0,
+        "submission_writes": 0,
+        "conflicts": 0,
+        "preview": [],
+    }
+    started = time.perf_counter()
+
+    async def flush(chunk: List[Dict]):
+        metrics["chunks"] += 1
+        submissions_by_group: Dict[str, List[Dict]] = {}
+        async for submission in db.weekly_activity_submissions.find(
+            {
+                "group_id": {"$in": [group["id"] for group in chunk]},
+                "week_start": {"$in": list({group["current_week_start"] for group in chunk})}
+            },
+            {"_id": 0, "id": 1, "group_id": 1, "week_start": 1, "activity_title": 1,
+             "activity_description": 1, "submitted_by": 1, "is_revealed": 1}
+        ):
+            submissions_by_group.setdefault(submission["group_id"], []).append(submission)
+
+        operations_groups: List[UpdateOne] = []
+        # activity_id -> submission update, applied only once the group side landed
+        operations_submissions: Dict[str, UpdateOne] = {}
+        for group in chunk:
+            reveals = group.get("daily_reveals", [])
+            if not due_only and any((r.get("revealed_at") or datetime.min) >= today_start for r in reveals):
+                metrics["skipped_revealed_today"] += 1
+                continue
+
+            week = [s for s in submissions_by_group.get(group["id"], []) if s["week_start"] == group["current_week_start"]]
+            if len(week) < ACTIVITIES_PER_WEEK:
+                metrics["skipped_not_ready"] += 1
+                continue
+
+            revealed_ids = {r.get("activity_id") for r in reveals}
+            available = [s for s in week if s["id"] not in revealed_ids and not s.get("is_revealed")]
+            if not available:
+                metrics["skipped_exhausted"] += 1
+                if not dry_run:
+                    operations_groups.append(UpdateOne({"id": group["id"]}, {"$unset": {"next_reveal_at": ""}}))
+                continue
+
+            reveal = build_reveal(rng.choice(available), len(reveals) + 1, now)
+            group_op, submission_op = reveal_updates(group["id"], reveal, len(available) - 1)
+            operations_groups.append(UpdateOne(*group_op))
+            operations_submissions[reveal["activity_id"]] = UpdateOne(*submission_op)
+            metrics["groups_revealed"] += 1
+            if len(metrics["preview"]) < 20:
+                metrics["preview"].append({
+                    "group_id": group["id"],
+                    "day_number": reveal["day_number"],
+                    "activity_title": reveal["activity_title"]
+                })
+
+        if dry_run:
+            return
+        if operations_groups:
+            result = await db.groups.bulk_write(operations_groups, ordered=False)
+            metrics["group_writes"] += result.modified_count
+            if result.modified_count < len(operations_groups) and operations_submissions:
+                # Some guarded updates lost to a concurrent reveal of the same day; keep only the ones that landed
+                landed = set()
+                async for group in db.groups.find(
+                    {"daily_reveals.activity_id": {"$in": list(operations_submissions)}},
+                    {"_id": 0, "daily_reveals.activity_id": 1}
+                ):
+                    landed.update(r.get("activity_id") for r in group.get("daily_reveals", []))
+                metrics["conflicts"] += len([a for a in operations_submissions if a not in landed])
+                operations_submissions = {a: op for a, op in operations_submissions.items() if a in landed}
+        if operations_submissions:
+            result = await db.weekly_activity_submissions.bulk_write(list(operations_submissions.values()), ordered=False)
+            metrics["submission_writes"] += result.modified_count
+
+    chunk: List[Dict] = []
+    async for group in db.groups.find(query, GROUP_PROJECTION).batch_size(chunk_size):
+        metrics["groups_scanned"] += 1
+        chunk.append(group)
+        if len(chunk) >= chunk_size:
+            await flush(chunk)
+            chunk = []
+            logger.info(f"Batch reveal progress: {metrics['groups_scanned']} scanned, {metrics['groups_revealed']} revealed")
+    if chunk:
+        await flush(chunk)
+
+    metrics["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return metrics
@@ -0,0 +1,28 @@
+"""Production server settings: ``gunicorn -c gunicorn.conf.py server:app``."""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8001')}"
+
+# Async workers are CPU-bound per process, so one per core (WEB_CONCURRENCY overrides)
+workers = int(os.environ.get("WEB_CONCURRENCY", 0)) or multiprocessing.cpu_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# On SIGTERM workers stop accepting and get this long to finish in-flight requests
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 30))
+timeout = int(os.environ.get("WORKER_TIMEOUT", 60))
+keepalive = int(os.environ.get("KEEPALIVE_TIMEOUT", 5))
+
+# Recycle workers periodically; jitter keeps them from restarting together
+max_requests = int(os.environ.get("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", 1000))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def child_exit(server, worker):
+    # Multiprocess Prometheus metrics: drop the dead worker's live gauges
+    import metrics
+
+    metrics.mark_process_dead(worker.pid)
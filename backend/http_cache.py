@@ -0,0 +1,48 @@
+"""Conditional GETs for read endpoints.
+
+``cached_response`` renders the payload once, derives a strong ETag from the
+rendered body, and answers ``If-None-Match`` with a bodiless 304. The tag
+always covers the full body: nginx revalidates stale cache entries with it,
+and a 304 there keeps serving the cached body.
+
+``Cache-Control`` is set per endpoint: shareable responses (the day's
+activity, the current challenge, global leaderboards) get ``public`` with an
+``s-maxage`` that the nginx ``proxy_cache`` in front honours, kept to a few
+seconds where the body carries live counters; per-group data is
+``private, no-cache`` so browsers always revalidate but skip the download
+when nothing changed.
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+import serialization
+
+SHARED_LEADERBOARD = "public, max-age=15, s-maxage=30, stale-while-revalidate=30"
+SHARED_SHORT = "public, max-age=5, s-maxage=5"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def etag(data: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def matches(request: Request, tag: str) -> bool:
+    """``If-None-Match`` check (weak comparison, as RFC 9110 requires for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = tag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == bare for candidate in header.split(","))
+
+
+def cached_response(request: Request, content: Any, cache_control: str) -> Response:
+    body = serialization.dumps(content)
+    tag = etag(body)
+    headers = {"ETag": tag, "Cache-Control": cache_control}
+    if matches(request, tag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
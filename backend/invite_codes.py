@@ -0,0 +1,88 @@
+"""Invite codes.
+
+Codes are stored upper-case under a unique index, so a join looks one up
+with a single indexed equality match after normalizing the input. New codes
+are not pre-checked: the document is inserted with a fresh code and the
+insert retried on a duplicate-key error, which costs nothing in the common
+case and stays correct under concurrent creates.
+"""
+import os
+import secrets
+import string
+from typing import Dict, Optional
+
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+ALPHABET = string.ascii_uppercase + string.digits
+
+DEFAULT_LENGTH = 6
+MAX_ATTEMPTS = 8
+
+
+def parse_lengths(spec: Optional[str]) -> Dict[str, int]:
+    lengths = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            namespace, length = item.split("=", 1)
+            lengths[namespace.strip()] = int(length)
+    return lengths
+
+
+# Per-namespace code length, e.g. INVITE_CODE_LENGTHS="group=8"
+CODE_LENGTHS = {"group": DEFAULT_LENGTH, **parse_lengths(os.environ.get("INVITE_CODE_LENGTHS"))}
+
+
+def normalize(code: str) -> str:
+    return code.strip().upper()
+
+
+def generate(namespace: str = "group", extra_length: int = 0) -> str:
+    length = CODE_LENGTHS.get(namespace, DEFAULT_LENGTH) + extra_length
+    return "".join(secrets.choice(ALPHABET) for _ in range(length))
+
+
+async def ensure_indexes(collection, namespace: str = "group", field: str = "invite_code"):
+    """Build the unique code index, first cleaning up legacy codes if it doesn't exist yet."""
+    if f"{field}_1" in await collection.index_information():
+        return
+    await normalize_existing(collection, namespace, field)
+    # Partial so legacy documents without a code don't collide on null
+    await collection.create_index(
+        [(field, ASCENDING)], unique=True, partialFilterExpression={field: {"$type": "string"}}
+    )
+
+
+async def normalize_existing(collection, namespace: str = "group", field: str = "invite_code") -> int:
+    """Upper-case legacy codes and reissue duplicates so the unique index can build; returns codes changed."""
+    changed = 0
+    seen = set()
+    async for doc in collection.find({field: {"$type": "string"}}, {"_id": 1, field: 1}).sort("_id", ASCENDING):
+        code = normalize(doc[field])
+        if code in seen:
+            code = generate(namespace)
+            while code in seen or await collection.find_one({field: code}, {"_id": 1}):
+                code = generate(namespace)
+        seen.add(code)
+        if code != doc[field]:
+            await collection.update_one({"_id": doc["_id"]}, {"$set": {field: code}})
+            changed += 1
+    return changed
+
+
+async def insert_with_code(collection, doc: Dict, namespace: str = "group", field: str = "invite_code") -> str:
+    """Insert ``doc`` with a newly generated unique code in ``field``; returns the code.
+
+    After half the attempts collide the code grows by a character, so a
+    crowded namespace degrades into longer codes rather than failures.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        doc[field] = generate(namespace, extra_length=attempt // (MAX_ATTEMPTS // 2))
+        try:
+            await collection.insert_one(doc)
+            return doc[field]
+        except DuplicateKeyError as e:
+            if field not in (e.details or {}).get("keyPattern", {}):
+                raise
+            doc.pop("_id", None)
+    raise RuntimeError(f"Could not generate a unique {namespace} invite code after {MAX_ATTEMPTS} attempts")
@@ -0,0 +1,190 @@
+"""Prometheus metrics.
+
+``MetricsMiddleware`` records per-route request counts, latency, in-flight
+requests and multipart upload sizes; ``MongoCommandMetrics`` is a pymongo
+``CommandListener`` timing every command per collection and operation. Caches
+and the job scheduler report through ``cache_observer`` and
+``record_job_run``.
+
+Under gunicorn set ``PROMETHEUS_MULTIPROC_DIR`` so ``/metrics`` aggregates
+all workers instead of whichever one answered the scrape.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from pymongo import monitoring
+from starlette.routing import Match
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+UPLOAD_BUCKETS = tuple(1024 * 4 ** i for i in range(9))  # 1 KiB .. 64 MiB
+
+HTTP_REQUESTS = Counter(
+    "actify_http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "actify_http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "actify_http_requests_in_flight", "HTTP requests being served", ["method"], multiprocess_mode="livesum"
+)
+UPLOAD_BYTES = Histogram(
+    "actify_upload_bytes", "Multipart request body size", ["route"], buckets=UPLOAD_BUCKETS
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "actify_mongo_command_duration_seconds", "MongoDB command latency",
+    ["collection", "command", "outcome"], buckets=MONGO_BUCKETS
+)
+CACHE_EVENTS = Counter(
+    "actify_cache_events_total", "Cache lookups by result", ["cache", "result"]
+)
+JOB_RUNS = Counter(
+    "actify_job_runs_total", "Scheduled job runs", ["job", "outcome"]
+)
+JOB_DURATION = Histogram(
+    "actify_job_duration_seconds", "Scheduled job run time", ["job"], buckets=LATENCY_BUCKETS + (30, 60, 300)
+)
+
+# Driver housekeeping that would only add noise
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue", "buildinfo", "buildInfo"}
+
+
+def command_collection(event) -> str:
+    """Collection a command monitoring event targets ("" when it has none)."""
+    if event.command_name == "getMore":
+        return str(event.command.get("collection", ""))
+    value = event.command.get(event.command_name)
+    return value if isinstance(value, str) else ""
+
+
+def render() -> Tuple[bytes, str]:
+    """Exposition body and content type for ``/metrics``."""
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """gunicorn ``child_exit`` hook: drop a dead worker's live gauges."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
+
+
+def cache_observer(cache: str) -> Callable[[str], None]:
+    def observe(result: str):
+        CACHE_EVENTS.labels(cache, result).inc()
+    return observe
+
+
+def record_job_run(job: str, duration_seconds: float, ok: bool):
+    JOB_RUNS.labels(job, "ok" if ok else "error").inc()
+    JOB_DURATION.labels(job).observe(duration_seconds)
+
+
+def route_template(scope, routes: Iterable) -> str:
+    """The matched route's path template (not the raw path, to keep label cardinality bounded)."""
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, routes: Iterable, skip_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.routes = routes
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+        received = {"bytes": 0}
+        is_multipart = any(
+            name == b"content-type" and value.startswith(b"multipart/form-data")
+            for name, value in scope.get("headers", [])
+        )
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                received["bytes"] += len(message.get("body", b""))
+            return message
+
+        async def recording_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.labels(method).inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive if is_multipart else receive, recording_send)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.labels(method).dec()
+            route = route_template(scope, self.routes)
+            HTTP_REQUESTS.labels(method, route, str(status["code"])).inc()
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            if is_multipart:
+                UPLOAD_BYTES.labels(route).observe(received["bytes"])
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times MongoDB commands by collection and command name.
+
+    Completion events don't carry the command document, so the collection
+    is remembered per request id from the started event (events arrive on
+    driver threads, hence the lock).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        with self._lock:
+            self._collections[event.request_id] = command_collection(event)
+
+    def _finish(self, event, outcome: str):
+        with self._lock:
+            collection: Optional[str] = self._collections.pop(event.request_id, None)
+        if collection is None:
+            return
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name, outcome).observe(
+            event.duration_micros / 1_000_000
+        )
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+mongo_commands = MongoCommandMetrics()
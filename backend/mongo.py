@@ -0,0 +1,124 @@
+"""MongoDB client configuration.
+
+Pool size, connect/socket/server-selection timeouts and a client-wide
+``timeoutMS`` come from the environment. ``timeoutMS`` bounds every
+operation (pymongo sends the remaining budget as ``maxTimeMS`` on finds and
+aggregates), so a slow query fails fast instead of holding a request and a
+pooled connection indefinitely. Background work (startup bootstrap,
+scheduled jobs, admin bulk operations) runs under the longer
+``background_timeout()``.
+"""
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable
+
+import pymongo
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+TIMEOUT_MS = _env_int("MONGO_TIMEOUT_MS", 10000)
+
+CLIENT_OPTIONS = {
+    "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 100),
+    "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 0),
+    "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS", 60000),
+    "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", 5000),
+    "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+}
+if TIMEOUT_MS > 0:
+    # Also covers waiting for a pooled connection and socket reads
+    CLIENT_OPTIONS["timeoutMS"] = TIMEOUT_MS
+else:
+    # Legacy per-stage timeouts, only consulted without timeoutMS
+    CLIENT_OPTIONS["waitQueueTimeoutMS"] = _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000)
+    CLIENT_OPTIONS["socketTimeoutMS"] = _env_int("MONGO_SOCKET_TIMEOUT_MS", 30000)
+
+BACKGROUND_TIMEOUT_SECONDS = float(os.environ.get("MONGO_BACKGROUND_TIMEOUT_SECONDS", 600))
+
+# Feed and ranking list reads tolerate replication lag; on a standalone server this is just the primary
+FEED_READ_PREFERENCE = os.environ.get("MONGO_FEED_READ_PREFERENCE", "secondaryPreferred")
+FEED_MAX_STALENESS_SECONDS = _env_int("MONGO_FEED_MAX_STALENESS_SECONDS", -1)
+
+
+def feed_read_preference():
+    mode = read_pref_mode_from_name(FEED_READ_PREFERENCE)
+    return make_read_preference(mode, None, max_staleness=FEED_MAX_STALENESS_SECONDS)
+
+
+def background_timeout():
+    """Context manager raising the per-operation budget for long-running background work.
+
+    The budget is an absolute deadline held in a context variable, which tasks
+    created inside inherit; enter it around one unit of work, never around
+    something that spawns long-lived tasks.
+    """
+    return pymongo.timeout(BACKGROUND_TIMEOUT_SECONDS)
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters per server, from pymongo's CMAP events.
+
+    Events arrive on driver threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools: Dict[str, Dict] = defaultdict(lambda: defaultdict(int))
+
+    def _bump(self, event, **changes):
+        address = "%s:%s" % event.address
+        with self._lock:
+            pool = self._pools[address]
+            for key, delta in changes.items():
+                pool[key] += delta
+
+    def pool_created(self, event):
+        self._bump(event, pools_created=1)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump(event, pools_cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._bump(event, open=1, connections_created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(event, open=-1, connections_closed=1)
+
+    def connection_check_out_started(self, event):
+        self._bump(event, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._bump(event, waiting=-1, checkout_failures=1, **{f"checkout_failures_{event.reason}": 1})
+
+    def connection_checked_out(self, event):
+        self._bump(event, waiting=-1, in_use=1, checkouts=1)
+
+    def connection_checked_in(self, event):
+        self._bump(event, in_use=-1)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {address: dict(pool) for address, pool in self._pools.items()}
+
+
+pool_stats = PoolStats()
+
+
+def create_client(url: str, listeners: Iterable = ()) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(url, event_listeners=[pool_stats, *listeners], **CLIENT_OPTIONS)
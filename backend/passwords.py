@@ -0,0 +1,129 @@
+"""Password hashing for ACTIFY.
+
+Hashes are produced with scrypt (memory-hard, stdlib ``hashlib``) and are
+computed on a bounded thread pool so a login never blocks the event loop.
+Legacy unsalted SHA-256 hex digests are still accepted and flagged for
+rehashing so they get upgraded on the user's next successful login.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+SCHEME = "scrypt"
+
+# Cost parameters (n=2**14, r=8 uses ~16MB and ~50-100ms per hash)
+SCRYPT_N = int(os.environ.get("PASSWORD_SCRYPT_N", 2 ** 14))
+SCRYPT_R = int(os.environ.get("PASSWORD_SCRYPT_R", 8))
+SCRYPT_P = int(os.environ.get("PASSWORD_SCRYPT_P", 1))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# hashlib.scrypt releases the GIL, so threads scale with cores
+MAX_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="password-hash")
+    return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Caps queued hashing work so a login flood can't pile up unbounded futures
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(MAX_WORKERS * 4)
+    return _semaphore
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii")
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=128 * r * (n + p + 2),
+        dklen=KEY_BYTES,
+    )
+
+
+def hash_password_sync(password: str) -> str:
+    """Hash a password; returns ``scrypt$n$r$p$salt$key``."""
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"{SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64encode(salt)}${_b64encode(key)}"
+
+
+def legacy_sha256(password: str) -> str:
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def is_legacy_hash(stored: str) -> bool:
+    return len(stored) == 64 and not stored.startswith(f"{SCHEME}$")
+
+
+def needs_rehash(stored: str) -> bool:
+    """True for legacy hashes or scrypt hashes with outdated cost parameters."""
+    if is_legacy_hash(stored):
+        return True
+    try:
+        _, n, r, p, _, _ = stored.split("$")
+    except ValueError:
+        return True
+    return (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+def verify_password_sync(password: str, stored: str) -> bool:
+    if not stored:
+        return False
+    if is_legacy_hash(stored):
+        return hmac.compare_digest(legacy_sha256(password), stored)
+    try:
+        scheme, n, r, p, salt, key = stored.split("$")
+    except ValueError:
+        return False
+    if scheme != SCHEME:
+        return False
+    candidate = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    return hmac.compare_digest(candidate, base64.b64decode(key))
+
+
+async def _run(func, *args):
+    loop = asyncio.get_running_loop()
+    async with _get_semaphore():
+        return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password off the event loop."""
+    return await _run(hash_password_sync, password)
+
+
+async def verify_password(password: str, stored: str) -> Tuple[bool, bool]:
+    """Verify a password off the event loop.
+
+    Returns ``(valid, needs_rehash)``; callers should store a fresh hash when
+    both are true.
+    """
+    valid = await _run(verify_password_sync, password, stored)
+    return valid, valid and needs_rehash(stored)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
@@ -0,0 +1,217 @@
+"""Token-bucket rate limiting for ACTIFY.
+
+Budgets are configured per route via ``RATE_LIMIT_<ROUTE>`` environment
+variables in ``<requests>/<seconds>`` form (e.g. ``RATE_LIMIT_LOGIN=10/60``).
+Buckets live in process memory by default; set ``RATE_LIMIT_REDIS_URL`` to
+share them across workers. Behind the nginx front end set
+``RATE_LIMIT_TRUST_PROXY=true`` so clients are keyed by the address nginx saw
+rather than by the proxy's loopback address.
+"""
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGETS = {
+    "login": "10/60",
+    "users": "5/300",
+    "vote": "60/60",
+    "comment": "20/60",
+}
+
+# (method, path pattern, route name) checked by RateLimitMiddleware
+ROUTE_PATTERNS = [
+    ("POST", re.compile(r"^/api/login$"), "login"),
+    ("POST", re.compile(r"^/api/users$"), "users"),
+    ("POST", re.compile(r"^/api/global-submissions/[^/]+/vote$"), "vote"),
+    ("POST", re.compile(r"^/api/global-submissions/[^/]+/comment$"), "comment"),
+]
+
+
+@dataclass(frozen=True)
+class Budget:
+    capacity: float
+    refill_per_second: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "Budget":
+        requests, seconds = spec.split("/")
+        return cls(capacity=float(requests), refill_per_second=float(requests) / float(seconds))
+
+
+def load_budgets() -> Dict[str, Budget]:
+    return {
+        route: Budget.parse(os.environ.get(f"RATE_LIMIT_{route.upper()}", default))
+        for route, default in DEFAULT_BUDGETS.items()
+    }
+
+
+class InMemoryBackend:
+    """Per-process buckets, LRU-bounded so key churn can't grow memory forever."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(self, key: str, budget: Budget, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (budget.capacity, now))
+        tokens = min(budget.capacity, tokens + (now - updated) * budget.refill_per_second)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        retry_after = 0.0 if allowed else (cost - tokens) / budget.refill_per_second
+        return allowed, retry_after
+
+
+# Atomic refill-and-take; returns {allowed, retry_after_ms}
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) / 1000 * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+local retry_after = 0
+if allowed == 0 then
+  retry_after = math.ceil((cost - tokens) / rate * 1000)
+end
+return {allowed, retry_after}
+"""
+
+
+class RedisBackend:
+    """Buckets shared across workers; fails open if Redis is unreachable."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def consume(self, key: str, budget: Budget, cost: float = 1.0) -> Tuple[bool, float]:
+        try:
+            allowed, retry_after_ms = await self._script(
+                keys=[f"ratelimit:{key}"],
+                args=[budget.capacity, budget.refill_per_second, int(time.time() * 1000), cost],
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {e}")
+            return True, 0.0
+        return bool(allowed), retry_after_ms / 1000
+
+    async def close(self):
+        await self._redis.close()
+
+
+class RateLimiter:
+    def __init__(self, budgets: Optional[Dict[str, Budget]] = None, backend=None):
+        self.budgets = budgets if budgets is not None else load_budgets()
+        self.backend = backend or InMemoryBackend()
+
+    async def check(self, route: str, key: str) -> Tuple[bool, float]:
+        budget = self.budgets.get(route)
+        if budget is None:
+            return True, 0.0
+        return await self.backend.consume(f"{route}:{key}", budget)
+
+    async def hit(self, route: str, key: str):
+        """Consume a token or raise 429 (for keys only known inside a handler, e.g. username)."""
+        allowed, retry_after = await self.check(route, key)
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+            )
+
+
+def create_rate_limiter() -> RateLimiter:
+    redis_url = os.environ.get("RATE_LIMIT_REDIS_URL")
+    if redis_url:
+        try:
+            return RateLimiter(backend=RedisBackend(redis_url))
+        except ImportError:
+            logger.warning("RATE_LIMIT_REDIS_URL set but redis is not installed, using in-memory rate limits")
+    return RateLimiter()
+
+
+def client_ip(scope) -> str:
+    """Peer address, or the proxy-reported one when ``RATE_LIMIT_TRUST_PROXY=true``.
+
+    Only the proxy's own view is trusted: ``X-Real-IP`` (nginx sets it to
+    ``$remote_addr``) or else the rightmost ``X-Forwarded-For`` hop. Earlier
+    hops come from the client and can be anything.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if os.environ.get("RATE_LIMIT_TRUST_PROXY", "false").lower() != "true":
+        return peer
+    headers = dict(scope.get("headers") or [])
+    real_ip = headers.get(b"x-real-ip")
+    if real_ip:
+        return real_ip.decode().strip()
+    forwarded = headers.get(b"x-forwarded-for")
+    if forwarded:
+        return forwarded.decode().split(",")[-1].strip() or peer
+    return peer
+
+
+class RateLimitMiddleware:
+    """ASGI middleware shedding over-budget requests per client IP before they reach Mongo."""
+
+    def __init__(self, app, limiter: RateLimiter, routes: List = ROUTE_PATTERNS):
+        self.app = app
+        self.limiter = limiter
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            route = self._match(scope["method"], scope["path"])
+            if route:
+                allowed, retry_after = await self.limiter.check(route, f"ip:{client_ip(scope)}")
+                if not allowed:
+                    await self._reject(send, retry_after)
+                    return
+        await self.app(scope, receive, send)
+
+    def _match(self, method: str, path: str) -> Optional[str]:
+        for route_method, pattern, route in self.routes:
+            if method == route_method and pattern.match(path):
+                return route
+        return None
+
+    async def _reject(self, send, retry_after: float):
+        body = json.dumps({"detail": "Too many requests, please try again later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, int(retry_after + 0.999))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,186 @@
+"""In-process async job scheduler.
+
+Each job is an async callable ``job(now) -> Optional[datetime]`` returning
+when it next needs to run (``None`` means "check again after the idle
+tick"). Only the worker holding the Mongo leader lock runs jobs, so starting
+the scheduler in every uvicorn worker is safe; the lease is renewed in the
+background while a job runs, so long jobs don't hand leadership over mid-run.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+import mongo
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[datetime], Awaitable[Optional[datetime]]]
+# (job name, duration in seconds, succeeded)
+JobListener = Callable[[str, float, bool], None]
+
+TICK_SECONDS = float(os.environ.get("SCHEDULER_TICK_SECONDS", 60))
+LOCK_TTL_SECONDS = float(os.environ.get("SCHEDULER_LOCK_TTL_SECONDS", 30))
+
+
+class LeaderLock:
+    """Lease-based lock document; the holder must renew it before ``ttl`` elapses."""
+
+    def __init__(self, collection, name: str, ttl_seconds: float = LOCK_TTL_SECONDS):
+        self.collection = collection
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    async def acquire(self) -> bool:
+        """Acquire or renew the lease; False if another live owner holds it."""
+        now = datetime.utcnow()
+        try:
+            await self.collection.find_one_and_update(
+                {"_id": self.name, "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": self.owner, "expires_at": now + self.ttl, "renewed_at": now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return True
+        except DuplicateKeyError:
+            # The lock exists, is unexpired and belongs to someone else
+            return False
+
+    async def release(self):
+        await self.collection.delete_one({"_id": self.name, "owner": self.owner})
+
+
+@dataclass
+class Job:
+    name: str
+    func: JobFunc
+    next_fire_at: datetime = field(default_factory=datetime.utcnow)
+    runs: int = 0
+    failures: int = 0
+    last_run_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+
+
+class Scheduler:
+    def __init__(self, lock: LeaderLock, tick_seconds: float = TICK_SECONDS, on_job_run: Optional[JobListener] = None):
+        self.lock = lock
+        self.on_job_run = on_job_run
+        self.tick = timedelta(seconds=tick_seconds)
+        self.jobs: Dict[str, Job] = {}
+        self.is_leader = False
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def add_job(self, name: str, func: JobFunc):
+        self.jobs[name] = Job(name=name, func=func)
+
+    def wake(self, name: Optional[str] = None):
+        """Re-run a job (or just re-evaluate fire times) now, e.g. after an API write moved a deadline."""
+        if name in self.jobs:
+            self.jobs[name].next_fire_at = datetime.utcnow()
+        self._wakeup.set()
+
+    async def run_due(self, now: datetime):
+        for job in self.jobs.values():
+            if job.next_fire_at > now:
+                continue
+            if not self.is_leader:
+                # Lease lost while an earlier job ran; the new leader runs the rest
+                break
+            started = datetime.utcnow()
+            ok = True
+            heartbeat = asyncio.create_task(self._renew_while_running())
+            try:
+                # A fresh background budget per run (the deadline is absolute, so it can't
+                # span the scheduler's lifetime); lease renewal keeps the client timeout
+                with mongo.background_timeout():
+                    next_fire_at = await job.func(now)
+            except Exception:
+                ok = False
+                job.failures += 1
+                logger.exception(f"Scheduled job {job.name} failed")
+                next_fire_at = None
+            finally:
+                heartbeat.cancel()
+            job.runs += 1
+            job.last_run_at = started
+            job.last_duration_ms = (datetime.utcnow() - started).total_seconds() * 1000
+            if self.on_job_run:
+                self.on_job_run(job.name, job.last_duration_ms / 1000, ok)
+            job.next_fire_at = min(next_fire_at or now + self.tick, now + self.tick)
+
+    async def _renew_while_running(self):
+        """Keep the lease alive while a job outlives the renewal interval."""
+        interval = self.lock.ttl.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                renewed = await self.lock.acquire()
+            except Exception:
+                logger.exception("Scheduler lease renewal failed")
+                continue
+            if not renewed:
+                logger.warning("Scheduler lease lost during a job run")
+                self.is_leader = False
+                return
+
+    async def run_forever(self):
+        while True:
+            try:
+                self.is_leader = await self.lock.acquire()
+                if self.is_leader:
+                    await self.run_due(datetime.utcnow())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Scheduler loop error")
+
+            # Sleep until the earliest job, but wake in time to renew the lease
+            now = datetime.utcnow()
+            wake_at = min([job.next_fire_at for job in self.jobs.values()] + [now + self.tick])
+            delay = (wake_at - now).total_seconds()
+            delay = min(max(delay, 0.05), self.lock.ttl.total_seconds() / 3)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            await self.lock.release()
+
+    def status(self) -> Dict:
+        return {
+            "owner": self.lock.owner,
+            "is_leader": self.is_leader,
+            "jobs": {
+                job.name: {
+                    "next_fire_at": job.next_fire_at,
+                    "last_run_at": job.last_run_at,
+                    "last_duration_ms": job.last_duration_ms,
+                    "runs": job.runs,
+                    "failures": job.failures
+                }
+                for job in self.jobs.values()
+            }
+        }
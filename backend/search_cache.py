@@ -0,0 +1,112 @@
+"""Typeahead cache for user search.
+
+Candidate lists are cached per normalized query for a short TTL, concurrent
+identical queries share one Mongo round trip, and a cached broader query
+whose candidate list was complete answers narrower ones ("jo" -> "joh")
+without touching Mongo. Ranking by follows stays per-request, so cached
+entries are shared across users.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from singleflight import SingleFlight
+from user_search import CANDIDATE_POOL, FUZZY_ENABLED, MIN_QUERY_LENGTH, normalize
+
+CACHE_TTL_SECONDS = float(os.environ.get("USER_SEARCH_CACHE_TTL", 30))
+CACHE_MAX_ENTRIES = int(os.environ.get("USER_SEARCH_CACHE_MAX_ENTRIES", 10_000))
+
+
+def matches_prefix(user: Dict, q: str) -> bool:
+    username = normalize(user.get("username", ""))
+    full_name = normalize(user.get("full_name", ""))
+    return (
+        username.startswith(q)
+        or full_name.startswith(q)
+        or any(token.startswith(q) for token in full_name.split())
+    )
+
+
+class SearchResultCache:
+    def __init__(
+        self,
+        ttl: float = CACHE_TTL_SECONDS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        pool_size: int = CANDIDATE_POOL,
+        observer: Optional[Callable[[str], None]] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.pool_size = pool_size
+        # q -> (expires_at, candidates, complete)
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict], bool]]" = OrderedDict()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.narrowed_hits = 0
+        self.misses = 0
+        # Called with "hit", "narrowed_hit" or "miss" per lookup (e.g. a metrics counter)
+        self.observer = observer or (lambda result: None)
+
+    def _get(self, q: str, now: float) -> Optional[Tuple[List[Dict], bool]]:
+        entry = self._entries.get(q)
+        if entry is None:
+            return None
+        expires_at, candidates, complete = entry
+        if expires_at < now:
+            del self._entries[q]
+            return None
+        self._entries.move_to_end(q)
+        return candidates, complete
+
+    def _put(self, q: str, candidates: List[Dict], now: float):
+        # Fuzzy results aren't prefix-closed, so only prefix-only lists can answer narrower queries
+        complete = len(candidates) < self.pool_size and not FUZZY_ENABLED
+        self._entries[q] = (now + self.ttl, candidates, complete)
+        self._entries.move_to_end(q)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _from_broader(self, q: str, now: float) -> Optional[List[Dict]]:
+        for length in range(len(q) - 1, MIN_QUERY_LENGTH - 1, -1):
+            cached = self._get(q[:length], now)
+            if cached and cached[1]:
+                return [user for user in cached[0] if matches_prefix(user, q)]
+        return None
+
+    async def candidates(self, q: str, loader: Callable[[str], Awaitable[List[Dict]]]) -> List[Dict]:
+        q = normalize(q)
+        now = time.monotonic()
+
+        cached = self._get(q, now)
+        if cached is not None:
+            self.hits += 1
+            self.observer("hit")
+            return cached[0]
+
+        narrowed = self._from_broader(q, now)
+        if narrowed is not None:
+            self.narrowed_hits += 1
+            self.observer("narrowed_hit")
+            self._put(q, narrowed, now)
+            return narrowed
+
+        async def load():
+            self.misses += 1
+            self.observer("miss")
+            result = await loader(q)
+            self._put(q, result, time.monotonic())
+            return result
+
+        return await self._flight.do(q, load)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "narrowed_hits": self.narrowed_hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,95 @@
+"""JSON serialization fast path.
+
+A handler returning ``[Model(**doc) for doc in docs]`` under a
+``response_model`` pays for validation twice (once building the models, once
+in FastAPI's response validation) and again for ``jsonable_encoder`` before
+``json.dumps``. Documents read straight from Mongo are already in the stored
+shape, so ``model_response`` just trims each one to the model's fields
+(filling defaults, dropping ``_id`` and anything private like ``password``)
+and renders it once with orjson, which encodes datetimes natively in the
+same ISO format pydantic emits. The ``response_model`` stays on the route for
+the OpenAPI schema.
+
+``FastJSONResponse`` is also the app's default response class, but only
+handlers that return one themselves (directly or via ``model_response``) get
+the orjson-only path with the ObjectId-aware ``default``. A plain dict or
+list return still goes through FastAPI's ``jsonable_encoder`` first, which
+handles datetimes (hence no ``isoformat()`` loops) but not ObjectId, so
+those handlers project ``_id`` away.
+"""
+import copy
+import functools
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def default(value: Any) -> Any:
+    """orjson fallback for types it doesn't encode natively."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=default, option=OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+Field = Tuple[str, Any, Optional[Callable[[], Any]]]
+
+
+@functools.lru_cache(maxsize=None)
+def _fields(model: Type[BaseModel]) -> Tuple[Field, ...]:
+    """(name, static default, factory) per field; factories run per document, never here."""
+    fields = []
+    for name, field in model.model_fields.items():
+        if field.is_required():
+            fields.append((name, None, None))
+        elif field.default_factory is not None:
+            fields.append((name, None, field.default_factory))
+        elif isinstance(field.default, (list, dict, set)):
+            # Mutable defaults are copied per document, as pydantic does per instance
+            fields.append((name, None, functools.partial(copy.copy, field.default)))
+        else:
+            fields.append((name, field.default, None))
+    return tuple(fields)
+
+
+def _shape(fields: Tuple[Field, ...], doc: Dict) -> Dict:
+    shaped = {}
+    for name, default, factory in fields:
+        if name in doc:
+            shaped[name] = doc[name]
+        else:
+            shaped[name] = factory() if factory is not None else default
+    return shaped
+
+
+def shape(model: Type[BaseModel], doc: Dict) -> Dict:
+    """``doc`` restricted to ``model``'s fields, defaults filled in; no validation (trusted documents only)."""
+    return _shape(_fields(model), doc)
+
+
+def shape_many(model: Type[BaseModel], docs: Iterable[Dict]) -> List[Dict]:
+    fields = _fields(model)
+    return [_shape(fields, doc) for doc in docs]
+
+
+def model_response(model: Type[BaseModel], docs: Union[Dict, Iterable[Dict]], status_code: int = 200) -> FastJSONResponse:
+    """Render one document or a list of documents as ``model`` without building model instances."""
+    content = shape(model, docs) if isinstance(docs, dict) else shape_many(model, docs)
+    return FastJSONResponse(content, status_code=status_code)
@@ -1,8 +1,9 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Request
+from fastapi.responses import JSONResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+import asyncio
 import os
 import logging
 from pathlib import Path
@@ -10,16 +11,39 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timedelta
-import hashlib
 import base64
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+import activity_dataset
+import activity_selection
+import bootstrap
+import datetimes
+import group_repository as group_repo
+from group_repository import GroupRepository
+import group_reveals
+import http_cache
+import invite_codes
+import metrics
+import mongo
+import passwords
+import rate_limit
+import scheduler
+import serialization
+import tracing
+import user_search
+import week_rollover
+from search_cache import SearchResultCache
+from serialization import FastJSONResponse
+from singleflight import SingleFlight
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = mongo.create_client(mongo_url, listeners=[metrics.mongo_commands, tracing.mongo_listener])
 db = client[os.environ['DB_NAME']]
+# Feed/ranking list reads; may be served by secondaries
+feed_db = client.get_database(os.environ['DB_NAME'], read_preference=mongo.feed_read_preference())
 
 # Collections
 users_collection = db.users
@@ -33,9 +57,45 @@ global_votes_collection = db.global_votes
 daily_global_activities_collection = db.daily_global_activities
 global_activity_completions_collection = db.global_activity_completions
 activity_dataset_collection = db.activity_dataset
+group_repository = GroupRepository(db.groups)
 
 # Create the main app
-app = FastAPI(title="ACTIFY API", version="1.0.0")
+app = FastAPI(title="ACTIFY API", version="1.0.0", default_response_class=FastJSONResponse)
+
+# Token-bucket limits for login/signup/vote/comment
+rate_limiter = rate_limit.create_rate_limiter()
+
+# Typeahead results shared across users (ranking by follows stays per-request)
+user_search_cache = SearchResultCache(observer=metrics.cache_observer("user_search"))
+
+# Coalesces concurrent lazy creation of a day's global activity
+daily_activity_flight = SingleFlight()
+
+# Indexed random-key picks with category/difficulty weights and a no-repeat horizon
+activity_selector = activity_selection.ActivitySelector(activity_dataset_collection, daily_global_activities_collection)
+
+# How often the pre-warmer makes sure today's and tomorrow's picks exist
+DAILY_ACTIVITY_PREWARM_SECONDS = int(os.environ.get("DAILY_ACTIVITY_PREWARM_SECONDS", 3600))
+
+# Per-worker readiness, reported by /api/ready
+readiness = {"bootstrapped": False, "draining": False, "startup_task": None}
+READY_PING_TIMEOUT_SECONDS = float(os.environ.get("READY_PING_TIMEOUT_SECONDS", 2))
+bootstrap_lock = scheduler.LeaderLock(db.scheduler_locks, "actify-bootstrap", ttl_seconds=60)
+
+# Background jobs (challenge activation, group reveals, daily picks); one leader across workers
+job_scheduler = scheduler.Scheduler(
+    scheduler.LeaderLock(db.scheduler_locks, "actify-scheduler"), on_job_run=metrics.record_job_run
+)
+
+# Photos are stored base64-encoded inline (4/3 the size) in documents capped at 16 MB
+MAX_PHOTO_BYTES = int(os.environ.get("MAX_PHOTO_BYTES", 10 * 1024 * 1024))
+
+async def read_photo(photo: UploadFile) -> bytes:
+    """Uploaded photo bytes, or 413 when it's too large to store inline"""
+    content = await photo.read(MAX_PHOTO_BYTES + 1)
+    if len(content) > MAX_PHOTO_BYTES:
+        raise HTTPException(status_code=413, detail=f"Photo too large (max {MAX_PHOTO_BYTES // (1024 * 1024)} MB)")
+    return content
 
 # NEW: Follow model
 class Follow(BaseModel):
@@ -124,6 +184,26 @@ class GroupResponse(BaseModel):
     weekly_rankings: List[dict] = []
     current_week_points: dict = {}  # member_id: points
 
+class GroupSummary(BaseModel):
+    """Group card for list endpoints; no member list, reveal history or point tables"""
+    id: str
+    name: str
+    description: str
+    category: str = "fitness"
+    is_public: bool = False
+    created_by: str
+    created_at: datetime
+    member_count: int
+    max_members: int = 7
+    admin_id: str
+    invite_code: str
+    current_challenge: str = "Weekly Activity Challenge"
+    submission_day: Optional[str] = None
+    current_week_start: Optional[datetime] = None
+    activities_submitted_this_week: int = 0
+    activities_needed: int = 7
+    submission_phase_active: bool = False
+
 class WeeklyActivitySubmission(BaseModel):
     id: str
     group_id: str
@@ -230,9 +310,6 @@ class GlobalActivityCompletion(BaseModel):
     votes: int = 0
 
 # Utility functions
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
-
 def generate_avatar_color() -> str:
     colors = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FCEA2B", "#FF9F43", "#6C5CE7", "#FD79A8"]
     return colors[len(colors) % 8]
@@ -256,9 +333,27 @@ async def create_notification(user_id: str, notification_type: str, title: str,
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
+@api_router.get("/ready")
+async def readiness_check():
+    """Readiness probe: Mongo answers a ping and the startup bootstrap has finished"""
+    checks = {"bootstrapped": readiness["bootstrapped"], "draining": readiness["draining"]}
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), timeout=READY_PING_TIMEOUT_SECONDS)
+        checks["mongo"] = True
+    except Exception:
+        checks["mongo"] = False
+    
+    ready = checks["mongo"] and checks["bootstrapped"] and not checks["draining"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", **checks}
+    )
+
 # User Authentication Routes
 @api_router.post("/users", response_model=UserResponse)
 async def create_user(user_data: UserCreate):
+    await rate_limiter.hit("users", f"user:{user_data.username.lower()}")
+    
     # Check if user exists
     existing = await db.users.find_one({"$or": [{"username": user_data.username}, {"email": user_data.email}]})
     if existing:
@@ -269,8 +364,9 @@ async def create_user(user_data: UserCreate):
         "id": user_id,
         "username": user_data.username,
         "email": user_data.email,
-        "password": hash_password(user_data.password),
+        "password": await passwords.hash_password(user_data.password),
         "full_name": user_data.full_name,
+        **user_search.search_fields(user_data.username, user_data.full_name),
         "created_at": datetime.utcnow(),
         "avatar_color": generate_avatar_color(),
         "groups": [],
@@ -296,10 +392,23 @@ async def create_user(user_data: UserCreate):
 
 @api_router.post("/login")
 async def login(login_data: LoginRequest):
+    await rate_limiter.hit("login", f"user:{login_data.username.lower()}")
+    
     user = await db.users.find_one({"username": login_data.username})
-    if not user or user["password"] != hash_password(login_data.password):
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    valid, needs_rehash = await passwords.verify_password(login_data.password, user.get("password", ""))
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    # Transparently upgrade legacy SHA-256 (or outdated scrypt) hashes
+    if needs_rehash:
+        await db.users.update_one(
+            {"id": user["id"], "password": user["password"]},
+            {"$set": {"password": await passwords.hash_password(login_data.password)}}
+        )
+    
     # Create session
     session_id = str(uuid.uuid4())
     session_doc = {
@@ -317,25 +426,15 @@ async def login(login_data: LoginRequest):
     }
 
 @api_router.get("/users/search")
-async def search_users(q: str = ""):
-    """Search users by username or full name"""
+async def search_users(q: str = "", user_id: Optional[str] = None):
+    """Search users by username or full name prefix (followed users ranked first)"""
     try:
         if not q or len(q) < 2:
             return []
         
-        # Search by username or full name (case insensitive)
-        users_cursor = db.users.find(
-            {
-                "$or": [
-                    {"username": {"$regex": q, "$options": "i"}},
-                    {"full_name": {"$regex": q, "$options": "i"}}
-                ]
-            },
-            {"_id": 0, "password": 0, "email": 0}
-        ).limit(10)
-        
-        users = await users_cursor.to_list(length=10)
-        return users
+        return await user_search.search_users(
+            users_collection, follows_collection, q, user_id=user_id, cache=user_search_cache
+        )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -356,16 +455,6 @@ async def create_group(
     is_public: bool = Form(False),  # Default to private
     user_id: str = Form(...)
 ):
-    import random
-    import string
-    
-    # Generate unique invite code
-    invite_code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    
-    # Ensure invite code is unique
-    while await db.groups.find_one({"invite_code": invite_code}):
-        invite_code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    
     group_doc = {
         "id": str(uuid.uuid4()),
         "name": name,
@@ -374,7 +463,6 @@ async def create_group(
         "is_public": is_public,
         "created_by": user_id,
         "admin_id": user_id,  # Creator is initial admin
-        "invite_code": invite_code,
         "created_at": datetime.utcnow(),
         "members": [user_id],  # Creator is first member
         "member_count": 1,
@@ -397,7 +485,8 @@ async def create_group(
         "current_week_points": {user_id: 0}
     }
     
-    result = await db.groups.insert_one(group_doc)
+    # Unique invite code assigned on insert (retried on collision)
+    await invite_codes.insert_with_code(db.groups, group_doc, namespace="group")
     
     # Add group to user's groups
     await db.users.update_one(
@@ -407,16 +496,27 @@ async def create_group(
     
     return GroupResponse(**group_doc)
 
-@api_router.get("/groups", response_model=List[GroupResponse])
+@api_router.get("/groups", response_model=List[GroupSummary])
 async def get_groups(limit: int = 20):
-    groups = await db.groups.find({"is_public": True}).limit(limit).to_list(length=None)
-    return [GroupResponse(**group) for group in groups]
+    groups = await group_repository.summaries({"is_public": True}, limit=limit)
+    return serialization.model_response(GroupSummary, groups)
 
-@api_router.get("/users/{user_id}/groups", response_model=List[GroupResponse])
+@api_router.get("/users/{user_id}/groups", response_model=List[GroupSummary])
 async def get_user_groups(user_id: str):
     """Get all groups where the user is a member"""
-    groups = await db.groups.find({"members": user_id}).to_list(length=None)
-    return [GroupResponse(**group) for group in groups]
+    groups = await group_repository.summaries({"members": user_id})
+    return serialization.model_response(GroupSummary, groups)
+
+async def add_group_member(query: dict, user_id: str):
+    """Atomically join the group matching ``query``; returns (outcome, group summary)"""
+    outcome, group = await group_repository.join(query, user_id)
+    if outcome == group_repo.JOINED:
+        # Guarded on the group id so a retried join doesn't double-count
+        await db.users.update_one(
+            {"id": user_id, "groups": {"$ne": group["id"]}},
+            {"$push": {"groups": group["id"]}, "$inc": {"stats.total_groups_joined": 1}}
+        )
+    return outcome, group
 
 # Weekly Activity Challenge System Endpoints
 
@@ -426,34 +526,18 @@ async def join_group_by_invite_code_global(
     user_id: str = Form(...)
 ):
     """Join a group using invite code (finds group by code)"""
-    # Find group by invite code
-    group = await db.groups.find_one({"invite_code": invite_code.upper()})
-    if not group:
+    # Find group by invite code and join it in one conditional update
+    outcome, group = await add_group_member({"invite_code": invite_codes.normalize(invite_code)}, user_id)
+    if outcome == group_repo.NOT_FOUND:
         raise HTTPException(status_code=404, detail="Invalid invite code")
     
-    if len(group["members"]) >= group.get("max_members", 7):
+    if outcome == group_repo.FULL:
         raise HTTPException(status_code=400, detail="Group is full (max 7 members)")
     
-    if user_id in group["members"]:
+    if outcome == group_repo.ALREADY_MEMBER:
         raise HTTPException(status_code=400, detail="User already in group")
     
-    # Add user to group
-    await db.groups.update_one(
-        {"id": group["id"]},
-        {
-            "$push": {"members": user_id},
-            "$inc": {"member_count": 1},
-            "$set": {f"current_week_points.{user_id}": 0}
-        }
-    )
-    
-    # Add group to user's groups list
-    await db.users.update_one(
-        {"id": user_id},
-        {"$push": {"groups": group["id"]}}
-    )
-    
-    return {"success": True, "message": "Successfully joined group", "group": group}
+    return {"success": True, "message": "Successfully joined group", "group": GroupSummary(**group)}
 
 @api_router.post("/groups/{group_id}/join-by-code")
 async def join_group_by_invite_code(
@@ -462,26 +546,16 @@ async def join_group_by_invite_code(
     user_id: str = Form(...)
 ):
     """Join a group using invite code"""
-    group = await db.groups.find_one({"id": group_id, "invite_code": invite_code})
-    if not group:
+    outcome, group = await add_group_member({"id": group_id, "invite_code": invite_codes.normalize(invite_code)}, user_id)
+    if outcome == group_repo.NOT_FOUND:
         raise HTTPException(status_code=404, detail="Invalid invite code")
     
-    if len(group["members"]) >= group.get("max_members", 7):
+    if outcome == group_repo.FULL:
         raise HTTPException(status_code=400, detail="Group is full (max 7 members)")
     
-    if user_id in group["members"]:
+    if outcome == group_repo.ALREADY_MEMBER:
         raise HTTPException(status_code=400, detail="User already in group")
     
-    # Add user to group
-    await db.groups.update_one(
-        {"id": group_id},
-        {
-            "$push": {"members": user_id},
-            "$inc": {"member_count": 1},
-            f"$set": {f"current_week_points.{user_id}": 0}
-        }
-    )
-    
     return {"success": True, "message": "Successfully joined group"}
 
 @api_router.post("/groups/{group_id}/set-submission-day")
@@ -491,7 +565,7 @@ async def set_submission_day(
     admin_id: str = Form(...)
 ):
     """Admin sets the weekly submission day"""
-    group = await db.groups.find_one({"id": group_id})
+    group = await group_repository.for_admin(group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
@@ -511,7 +585,7 @@ async def start_weekly_submissions(
     admin_id: str = Form(...)
 ):
     """Admin starts the weekly submission phase"""
-    group = await db.groups.find_one({"id": group_id})
+    group = await group_repository.for_admin(group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
@@ -519,7 +593,13 @@ async def start_weekly_submissions(
         raise HTTPException(status_code=403, detail="Only group admin can start submissions")
     
     # Start new week
-    week_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    now = datetime.utcnow()
+    week_start = week_rollover.day_start(now)
+    
+    if group.get("current_week_start") and group["current_week_start"] < week_start:
+        # Archive the previous week's rankings and reset week state
+        await week_rollover.batch_rollover(db, now, due_only=False, group_ids=[group_id])
+        return {"success": True, "message": "Weekly submission phase started"}
     
     await db.groups.update_one(
         {"id": group_id},
@@ -528,7 +608,8 @@ async def start_weekly_submissions(
                 "submission_phase_active": True,
                 "current_week_start": week_start,
                 "activities_submitted_this_week": 0
-            }
+            },
+            "$unset": {"next_reveal_at": ""}
         }
     )
     
@@ -542,7 +623,7 @@ async def submit_weekly_activity(
     user_id: str = Form(...)
 ):
     """Submit an activity idea for the weekly challenge"""
-    group = await db.groups.find_one({"id": group_id})
+    group = await group_repository.for_week(group_id, user_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
@@ -552,7 +633,7 @@ async def submit_weekly_activity(
     if group.get("activities_submitted_this_week", 0) >= 7:
         raise HTTPException(status_code=400, detail="All 7 activities already submitted")
     
-    if user_id not in group["members"]:
+    if not group["is_member"]:
         raise HTTPException(status_code=403, detail="User not in group")
     
     # Create activity submission
@@ -575,48 +656,37 @@ async def submit_weekly_activity(
     new_count = group["activities_submitted_this_week"] + 1
     update_data = {"$set": {"activities_submitted_this_week": new_count}}
     
-    # If we've reached 7 submissions, end submission phase
+    # If we've reached 7 submissions, end submission phase and schedule the daily reveals
     if new_count >= 7:
         update_data["$set"]["submission_phase_active"] = False
+        update_data["$set"]["next_reveal_at"] = group_reveals.next_reveal_time(datetime.utcnow())
     
     await db.groups.update_one({"id": group_id}, update_data)
+    if new_count >= 7:
+        job_scheduler.wake()
     
     return {"success": True, "submission_count": new_count, "remaining": 7 - new_count}
 
 @api_router.get("/groups/{group_id}/weekly-activities")
-async def get_weekly_activities(group_id: str):
+async def get_weekly_activities(request: Request, group_id: str):
     """Get this week's submitted activities for a group"""
-    group = await db.groups.find_one({"id": group_id})
+    group = await group_repository.for_week(group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
-    if not group.get("current_week_start"):
-        return []
-    
-    activities = await db.weekly_activity_submissions.find({
-        "group_id": group_id,
-        "week_start": group["current_week_start"]
-    }).to_list(length=None)
+    activities = []
+    if group.get("current_week_start"):
+        activities = await db.weekly_activity_submissions.find({
+            "group_id": group_id,
+            "week_start": group["current_week_start"]
+        }, {"_id": 0}).sort("submission_order", 1).to_list(length=None)
     
-    # Convert MongoDB documents to JSON-serializable format
-    serialized_activities = []
-    for activity in activities:
-        activity.pop('_id', None)  # Remove MongoDB ObjectId
-        # Convert datetime to ISO string if needed
-        if 'created_at' in activity and hasattr(activity['created_at'], 'isoformat'):
-            activity['created_at'] = activity['created_at'].isoformat()
-        if 'week_start' in activity and hasattr(activity['week_start'], 'isoformat'):
-            activity['week_start'] = activity['week_start'].isoformat()
-        if 'reveal_date' in activity and activity['reveal_date'] and hasattr(activity['reveal_date'], 'isoformat'):
-            activity['reveal_date'] = activity['reveal_date'].isoformat()
-        serialized_activities.append(activity)
-    
-    return serialized_activities
+    return http_cache.cached_response(request, activities, http_cache.PRIVATE_REVALIDATE)
 
 @api_router.get("/groups/{group_id}/current-day-activity")
 async def get_current_day_activity(group_id: str):
     """Get today's revealed activity for the group"""
-    group = await db.groups.find_one({"id": group_id})
+    group = await group_repository.current_day_activity(group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
@@ -631,11 +701,11 @@ async def complete_daily_activity(
     user_id: str = Form(...)
 ):
     """Submit proof of completing today's activity"""
-    group = await db.groups.find_one({"id": group_id})
+    group = await group_repository.membership(group_id, user_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
-    if user_id not in group["members"]:
+    if not group["is_member"]:
         raise HTTPException(status_code=403, detail="User not in group")
     
     # Check if user already completed this activity
@@ -660,7 +730,7 @@ async def complete_daily_activity(
     completion_order = completion_count + 1
     
     # Save proof image (in production, save to cloud storage)
-    proof_url = f"data:image/jpeg;base64,{completion_proof.file.read().hex()}"
+    proof_url = f"data:image/jpeg;base64,{base64.b64encode(await read_photo(completion_proof)).decode('utf-8')}"
     
     # Create completion record
     completion_doc = {
@@ -692,9 +762,9 @@ async def complete_daily_activity(
     }
 
 @api_router.get("/groups/{group_id}/weekly-rankings")
-async def get_weekly_rankings(group_id: str):
+async def get_weekly_rankings(request: Request, group_id: str):
     """Get current week's rankings for the group"""
-    group = await db.groups.find_one({"id": group_id})
+    group = await group_repository.points(group_id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
@@ -720,22 +790,25 @@ async def get_weekly_rankings(group_id: str):
     for i, ranking in enumerate(member_rankings):
         ranking["rank"] = i + 1
     
-    return {"rankings": member_rankings}
+    return http_cache.cached_response(request, {"rankings": member_rankings}, http_cache.PRIVATE_REVALIDATE)
 
-@api_router.post("/groups/{group_id}/reveal-daily-activity")
-async def reveal_daily_activity(
-    group_id: str,
-    admin_id: str = Form(...),
-    day_number: int = Form(...)  # 1-7, which day of the week
-):
-    """Admin triggers daily activity reveal (or automated system)"""
-    group = await db.groups.find_one({"id": group_id})
-    if not group:
-        raise HTTPException(status_code=404, detail="Group not found")
+@api_router.get("/groups/{group_id}/weekly-rankings/history", response_model=List[WeeklyRanking])
+async def get_weekly_rankings_history(group_id: str, weeks: int = 4):
+    """Archived rankings for the group's most recent finished weeks"""
+    week_starts = await db.weekly_rankings.distinct("week_start", {"group_id": group_id})
+    recent = sorted(week_starts, reverse=True)[:weeks]
+    rankings = await db.weekly_rankings.find(
+        {"group_id": group_id, "week_start": {"$in": recent}}, {"_id": 0}
+    ).sort([("week_start", -1), ("rank_position", 1)]).to_list(length=None)
+    return serialization.model_response(WeeklyRanking, rankings)
+
+async def reveal_group_activity(group: dict, day_number: int) -> Optional[dict]:
+    """Reveal a random unrevealed activity for the group's day; None if that day is already revealed"""
+    import random
     
     # Check if we have enough activities to reveal
     activities = await db.weekly_activity_submissions.find({
-        "group_id": group_id,
+        "group_id": group["id"],
         "week_start": group["current_week_start"]
     }).to_list(length=None)
     
@@ -745,7 +818,7 @@ async def reveal_daily_activity(
     # Check if activity for this day already revealed
     revealed_today = any(r.get("day_number") == day_number for r in group.get("daily_reveals", []))
     if revealed_today:
-        return {"message": "Activity already revealed for this day"}
+        return None
     
     # Randomly select an activity that hasn't been revealed yet
     revealed_activity_ids = [r.get("activity_id") for r in group.get("daily_reveals", [])]
@@ -754,76 +827,74 @@ async def reveal_daily_activity(
     if not available_activities:
         raise HTTPException(status_code=400, detail="All activities already revealed")
     
-    import random
     selected_activity = random.choice(available_activities)
     
-    # Mark activity as revealed and update group
-    reveal_data = {
-        "day_number": day_number,
-        "activity_id": selected_activity["id"],
-        "activity_title": selected_activity["activity_title"], 
-        "activity_description": selected_activity["activity_description"],
-        "revealed_at": datetime.utcnow(),
-        "submitted_by": selected_activity["submitted_by"]
-    }
-    
-    # Update group with daily reveal and current day activity
-    await db.groups.update_one(
-        {"id": group_id},
-        {
-            "$push": {"daily_reveals": reveal_data},
-            "$set": {"current_day_activity": reveal_data}
-        }
+    # Mark activity as revealed and update group (also schedules the next day's reveal)
+    reveal_data = group_reveals.build_reveal(selected_activity, day_number, datetime.utcnow())
+    group_update, submission_update = group_reveals.reveal_updates(
+        group["id"], reveal_data, len(available_activities) - 1
     )
+    result = await db.groups.update_one(*group_update)
+    if result.modified_count == 0:
+        # Revealed concurrently by another request or the batch job
+        return None
     
     # Mark the activity submission as revealed
-    await db.weekly_activity_submissions.update_one(
-        {"id": selected_activity["id"]},
-        {"$set": {"is_revealed": True, "reveal_date": datetime.utcnow()}}
-    )
+    await db.weekly_activity_submissions.update_one(*submission_update)
+    
+    return reveal_data
+
+@api_router.post("/groups/{group_id}/reveal-daily-activity")
+async def reveal_daily_activity(
+    group_id: str,
+    admin_id: str = Form(...),
+    day_number: int = Form(...)  # 1-7, which day of the week
+):
+    """Admin triggers daily activity reveal (or automated system)"""
+    group = await group_repository.for_reveal(group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    
+    reveal_data = await reveal_group_activity(group, day_number)
+    if reveal_data is None:
+        return {"message": "Activity already revealed for this day"}
     
     return {
         "success": True,
         "revealed_activity": reveal_data,
         "day_number": day_number,
-        "message": f"Day {day_number} activity revealed: {selected_activity['activity_title']}"
+        "message": f"Day {day_number} activity revealed: {reveal_data['activity_title']}"
     }
 
 @api_router.get("/groups/{group_id}", response_model=GroupResponse)
-async def get_group(group_id: str):
+async def get_group(request: Request, group_id: str):
     group = await db.groups.find_one({"id": group_id})
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
-    return GroupResponse(**group)
+    return http_cache.cached_response(
+        request, serialization.shape(GroupResponse, group), http_cache.PRIVATE_REVALIDATE
+    )
 
 @api_router.post("/groups/{group_id}/join")
 async def join_group(group_id: str, user_id: str = Form(...)):
-    # Check if group exists
-    group = await db.groups.find_one({"id": group_id})
-    if not group:
+    outcome, group = await add_group_member({"id": group_id}, user_id)
+    if outcome == group_repo.NOT_FOUND:
         raise HTTPException(status_code=404, detail="Group not found")
     
     # Check if user already in group
-    if user_id in group.get("members", []):
+    if outcome == group_repo.ALREADY_MEMBER:
         raise HTTPException(status_code=400, detail="Already a member of this group")
     
-    # Add user to group
-    await db.groups.update_one(
-        {"id": group_id},
-        {"$push": {"members": user_id}, "$inc": {"member_count": 1}}
-    )
+    if outcome == group_repo.FULL:
+        raise HTTPException(status_code=400, detail="Group is full (max 7 members)")
     
-    # Add group to user's groups
-    await db.users.update_one(
-        {"id": user_id},
-        {"$push": {"groups": group_id}, "$inc": {"stats.total_groups_joined": 1}}
-    )
+    members = await db.groups.find_one({"id": group_id}, {"_id": 0, "members": 1})
     
     # Get user info for notification
     user = await db.users.find_one({"id": user_id})
     
     # Notify all group members (except the new member)
-    for member_id in group["members"]:
+    for member_id in members["members"]:
         if member_id != user_id:
             await create_notification(
                 member_id,
@@ -844,15 +915,15 @@ async def create_submission(
     user_id: str = Form(...),
     photo: Optional[UploadFile] = File(None)
 ):
-    # Verify user is member of group
-    group = await db.groups.find_one({"id": group_id})
-    if not group or user_id not in group.get("members", []):
+    # Verify user is member of group (the member list is needed for notifications below)
+    group = await db.groups.find_one({"id": group_id, "members": user_id}, {"_id": 0, "members": 1})
+    if not group:
         raise HTTPException(status_code=403, detail="Not a member of this group")
     
     # Process photo if provided
     photo_data = None
     if photo:
-        content = await photo.read()
+        content = await read_photo(photo)
         photo_data = base64.b64encode(content).decode('utf-8')
     
     # Get user info
@@ -896,7 +967,7 @@ async def create_submission(
 @api_router.get("/groups/{group_id}/submissions", response_model=List[SubmissionResponse])
 async def get_group_submissions(group_id: str, limit: int = 20):
     submissions = await db.submissions.find({"group_id": group_id}).sort("created_at", -1).limit(limit).to_list(length=None)
-    return [SubmissionResponse(**submission) for submission in submissions]
+    return serialization.model_response(SubmissionResponse, submissions)
 
 @api_router.get("/submissions/feed", response_model=List[SubmissionResponse])
 async def get_activity_feed(user_id: str, limit: int = 50):
@@ -910,11 +981,11 @@ async def get_activity_feed(user_id: str, limit: int = 50):
         return []
     
     # Get submissions from user's groups
-    submissions = await db.submissions.find(
+    submissions = await feed_db.submissions.find(
         {"group_id": {"$in": user_groups}}
     ).sort("created_at", -1).limit(limit).to_list(length=None)
     
-    return [SubmissionResponse(**submission) for submission in submissions]
+    return serialization.model_response(SubmissionResponse, submissions)
 
 # Notification Routes
 @api_router.get("/notifications/{user_id}", response_model=List[NotificationResponse])
@@ -923,7 +994,7 @@ async def get_notifications(user_id: str, limit: int = 50):
         {"user_id": user_id}
     ).sort("created_at", -1).limit(limit).to_list(length=None)
     
-    return [NotificationResponse(**notification) for notification in notifications]
+    return serialization.model_response(NotificationResponse, notifications)
 
 @api_router.put("/notifications/{notification_id}/read")
 async def mark_notification_read(notification_id: str):
@@ -939,7 +1010,7 @@ async def mark_notification_read(notification_id: str):
 
 # Rankings Routes
 @api_router.get("/rankings/weekly")
-async def get_weekly_rankings(limit: int = 10):
+async def get_weekly_rankings(request: Request, limit: int = 10):
     # Get submissions from last 7 days
     week_ago = datetime.utcnow() - timedelta(days=7)
     
@@ -950,7 +1021,7 @@ async def get_weekly_rankings(limit: int = 10):
         {"$limit": limit}
     ]
     
-    rankings = await db.submissions.aggregate(pipeline).to_list(length=None)
+    rankings = await feed_db.submissions.aggregate(pipeline).to_list(length=None)
     
     result = []
     for i, ranking in enumerate(rankings):
@@ -962,17 +1033,17 @@ async def get_weekly_rankings(limit: int = 10):
             "period": "weekly"
         })
     
-    return result
+    return http_cache.cached_response(request, result, http_cache.SHARED_LEADERBOARD)
 
 @api_router.get("/rankings/alltime")
-async def get_alltime_rankings(limit: int = 10):
+async def get_alltime_rankings(request: Request, limit: int = 10):
     pipeline = [
         {"$group": {"_id": "$user_id", "count": {"$sum": 1}, "username": {"$first": "$username"}}},
         {"$sort": {"count": -1}},
         {"$limit": limit}
     ]
     
-    rankings = await db.submissions.aggregate(pipeline).to_list(length=None)
+    rankings = await feed_db.submissions.aggregate(pipeline).to_list(length=None)
     
     result = []
     for i, ranking in enumerate(rankings):
@@ -984,11 +1055,11 @@ async def get_alltime_rankings(limit: int = 10):
             "period": "all-time"
         })
     
-    return result
+    return http_cache.cached_response(request, result, http_cache.SHARED_LEADERBOARD)
 
 # Global Challenge Routes
 @api_router.get("/global-challenges/current")
-async def get_current_global_challenge():
+async def get_current_global_challenge(request: Request):
     # Get the most recent active global challenge
     challenge = await db.global_challenges.find_one(
         {"is_active": True}, 
@@ -996,21 +1067,22 @@ async def get_current_global_challenge():
     )
     
     if not challenge:
-        return {"challenge": None, "status": "no_active_challenge"}
+        return http_cache.cached_response(
+            request, {"challenge": None, "status": "no_active_challenge"}, http_cache.SHARED_SHORT
+        )
     
     now = datetime.utcnow()
     
-    # Parse datetime strings
-    created_at = datetime.fromisoformat(challenge["created_at"].replace('Z', '+00:00')) if isinstance(challenge["created_at"], str) else challenge["created_at"]
-    expires_at = datetime.fromisoformat(challenge["expires_at"].replace('Z', '+00:00')) if isinstance(challenge["expires_at"], str) else challenge["expires_at"]
+    promptness_expired = now > (challenge["created_at"] + timedelta(minutes=challenge["promptness_window_minutes"]))
+    challenge = serialization.shape(GlobalChallenge, challenge)
     
-    promptness_expired = now > (created_at + timedelta(minutes=challenge["promptness_window_minutes"]))
-    
-    return {
-        "challenge": GlobalChallenge(**challenge),
+    # The ETag hashes the whole body: a version-only tag would let nginx revalidate
+    # a stale entry with a 304 and keep serving the time_remaining from its first fill
+    return http_cache.cached_response(request, {
+        "challenge": challenge,
         "promptness_expired": promptness_expired,
-        "time_remaining": max(0, int((expires_at - now).total_seconds()))
-    }
+        "time_remaining": max(0, int((challenge["expires_at"] - now).total_seconds()))
+    }, http_cache.SHARED_SHORT)
 
 @api_router.post("/global-challenges")
 async def create_global_challenge(
@@ -1063,7 +1135,7 @@ async def create_global_submission(
     # Process photo if provided
     photo_data = None
     if photo:
-        content = await photo.read()
+        content = await read_photo(photo)
         photo_data = base64.b64encode(content).decode('utf-8')
     
     # Get user info
@@ -1141,34 +1213,36 @@ async def get_global_feed(
         submissions_query["user_id"] = {"$in": following_ids}
     
     # Get submissions for this challenge
-    submissions = await db.global_submissions.find(
+    submissions = await feed_db.global_submissions.find(
         submissions_query
     ).sort("created_at", -1).limit(limit).to_list(length=None)
     
     # Get total participation count (always global, not filtered by friends)
-    total_participants = await db.global_submissions.count_documents(
+    total_participants = await feed_db.global_submissions.count_documents(
         {"challenge_id": target_challenge_id}
     )
     
     # Get friends participation count if friends_only is enabled
     friends_participants = 0
     if friends_only:
-        friends_participants = await db.global_submissions.count_documents(
+        friends_participants = await feed_db.global_submissions.count_documents(
             submissions_query
         )
     
-    return {
+    return FastJSONResponse({
         "status": "unlocked",
-        "challenge": GlobalChallenge(**current_challenge),
-        "submissions": [GlobalSubmission(**sub) for sub in submissions],
+        "challenge": serialization.shape(GlobalChallenge, current_challenge),
+        "submissions": serialization.shape_many(GlobalSubmission, submissions),
         "total_participants": total_participants,
         "friends_participants": friends_participants if friends_only else total_participants,
         "user_submitted": True,
         "friends_only": friends_only
-    }
+    })
 
 @api_router.post("/global-submissions/{submission_id}/vote")
 async def vote_global_submission(submission_id: str, user_id: str = Form(...)):
+    await rate_limiter.hit("vote", f"user:{user_id}")
+    
     # Check if submission exists
     submission = await db.global_submissions.find_one({"id": submission_id})
     if not submission:
@@ -1213,6 +1287,8 @@ async def comment_global_submission(
     comment: str = Form(...),
     user_id: str = Form(...)
 ):
+    await rate_limiter.hit("comment", f"user:{user_id}")
+    
     # Check if submission exists
     submission = await db.global_submissions.find_one({"id": submission_id})
     if not submission:
@@ -1242,203 +1318,105 @@ async def comment_global_submission(
 # Global Activity System Routes
 
 @api_router.post("/admin/initialize-activity-dataset")
-async def initialize_activity_dataset():
-    """Initialize the activity dataset with 300 activities (admin function)"""
-    activities = [
-        # Physical Activities (100 activities)
-        ("Take a 15-minute walk", "Go for a brisk 15-minute walk around your neighborhood or a nearby park", "physical", "easy", 15),
-        ("Do 10 push-ups", "Complete 10 push-ups with proper form. Modify as needed.", "physical", "easy", 5),
-        ("Stretch for 5 minutes", "Do a gentle stretching routine focusing on major muscle groups", "physical", "easy", 5),
-        ("Climb stairs for 5 minutes", "Use stairs in your building or find a public staircase", "physical", "easy", 5),
-        ("Do 20 jumping jacks", "Perform 20 jumping jacks at a moderate pace", "physical", "easy", 3),
-        ("Hold a plank for 30 seconds", "Maintain a plank position for 30 seconds with proper form", "physical", "easy", 2),
-        ("Do 15 squats", "Complete 15 bodyweight squats with good form", "physical", "easy", 5),
-        ("Take a 30-minute walk", "Enjoy a longer walk, perhaps exploring a new route", "physical", "medium", 30),
-        ("Do a 10-minute yoga session", "Follow a short yoga routine or do some basic poses", "physical", "medium", 10),
-        ("Complete 25 push-ups", "Challenge yourself with 25 push-ups, take breaks as needed", "physical", "medium", 8),
-        
-        # Wellness Activities (50 activities)
-        ("Meditate for 10 minutes", "Sit quietly and practice mindfulness or guided meditation", "wellness", "easy", 10),
-        ("Write in a gratitude journal", "Write down 3-5 things you're grateful for today", "wellness", "easy", 10),
-        ("Practice deep breathing", "Do 5 minutes of focused breathing exercises", "wellness", "easy", 5),
-        ("Take a cold shower", "End your shower with 30 seconds of cold water", "wellness", "easy", 5),
-        ("Drink an extra glass of water", "Stay hydrated by drinking one additional glass of water", "wellness", "easy", 2),
-        ("Step outside for fresh air", "Spend at least 5 minutes outdoors breathing fresh air", "wellness", "easy", 5),
-        ("Listen to calming music", "Put on relaxing music and listen mindfully for 10 minutes", "wellness", "easy", 10),
-        ("Do a digital detox hour", "Spend one hour without any screens or digital devices", "wellness", "medium", 60),
-        ("Practice positive affirmations", "Say 5 positive affirmations about yourself", "wellness", "easy", 5),
-        ("Take a relaxing bath", "Enjoy a warm, relaxing bath with minimal distractions", "wellness", "medium", 20),
-        
-        # Learning Activities (50 activities)
-        ("Read for 20 minutes", "Read a book, article, or educational material", "learning", "easy", 20),
-        ("Learn 5 new words", "Look up and memorize 5 words you don't know", "learning", "easy", 15),
-        ("Watch an educational video", "Watch a 10-minute educational or documentary video", "learning", "easy", 10),
-        ("Practice a new skill", "Spend 15 minutes practicing something you want to learn", "learning", "medium", 15),
-        ("Write in a journal", "Reflect on your day or thoughts by writing for 10 minutes", "learning", "easy", 10),
-        ("Listen to a podcast", "Listen to an educational or interesting podcast episode", "learning", "easy", 30),
-        ("Learn basic phrases in a new language", "Use an app or website to learn 10 basic phrases", "learning", "medium", 20),
-        ("Research a topic you're curious about", "Spend 20 minutes researching something interesting", "learning", "easy", 20),
-        ("Practice mental math", "Do 10 mental math problems without a calculator", "learning", "easy", 10),
-        ("Organize your digital files", "Spend 15 minutes organizing photos, documents, or emails", "learning", "easy", 15),
-        
-        # Social Activities (30 activities)
-        ("Call a friend or family member", "Have a meaningful conversation with someone you care about", "social", "easy", 15),
-        ("Send a thoughtful text", "Send an encouraging or appreciative message to someone", "social", "easy", 5),
-        ("Write a thank you note", "Write a handwritten note expressing gratitude", "social", "easy", 10),
-        ("Compliment a stranger", "Give a genuine compliment to someone you encounter", "social", "easy", 2),
-        ("Help someone today", "Offer assistance to a friend, neighbor, or stranger", "social", "medium", 20),
-        ("Share something positive on social media", "Post something uplifting or inspiring", "social", "easy", 5),
-        ("Have lunch with a colleague", "Connect with a coworker over a meal or coffee", "social", "medium", 60),
-        ("Join a community event", "Participate in a local event or gathering", "social", "medium", 120),
-        ("Volunteer for 30 minutes", "Offer your time to help a cause you care about", "social", "medium", 30),
-        ("Practice active listening", "Really focus on listening to someone without distractions", "social", "easy", 15),
-        
-        # Creative Activities (30 activities)
-        ("Draw or sketch for 15 minutes", "Create art with whatever materials you have", "creative", "easy", 15),
-        ("Write a short story or poem", "Express yourself through creative writing", "creative", "medium", 20),
-        ("Take artistic photos", "Capture 5 creative or beautiful photos", "creative", "easy", 15),
-        ("Try a new recipe", "Cook or bake something you've never made before", "creative", "medium", 45),
-        ("Rearrange a room", "Change the layout or decor of a space in your home", "creative", "medium", 30),
-        ("Create a playlist", "Curate music for a specific mood or activity", "creative", "easy", 15),
-        ("Make something with your hands", "Craft, build, or create something tangible", "creative", "medium", 30),
-        ("Sing or hum your favorite song", "Express yourself through music for 5 minutes", "creative", "easy", 5),
-        ("Design something on paper", "Sketch an idea, plan, or design concept", "creative", "easy", 15),
-        ("Write a letter to your future self", "Compose a message to yourself to read later", "creative", "easy", 15),
-        
-        # Productivity Activities (30 activities)
-        ("Clean and organize one space", "Tidy up a desk, drawer, or small area", "productivity", "easy", 15),
-        ("Plan tomorrow's schedule", "Spend 10 minutes planning your next day", "productivity", "easy", 10),
-        ("Complete a task you've been postponing", "Tackle something you've been putting off", "productivity", "medium", 30),
-        ("Declutter 10 items", "Choose 10 things to donate, recycle, or throw away", "productivity", "easy", 15),
-        ("Update your calendar", "Review and organize your upcoming appointments", "productivity", "easy", 10),
-        ("Backup important files", "Ensure your important data is safely backed up", "productivity", "easy", 20),
-        ("Review your goals", "Spend 15 minutes reflecting on your personal goals", "productivity", "easy", 15),
-        ("Prepare healthy snacks", "Pre-prepare some nutritious snacks for later", "productivity", "easy", 20),
-        ("Update your resume or LinkedIn", "Improve your professional profile", "productivity", "medium", 30),
-        ("Research something for work or life", "Look into something that could benefit you", "productivity", "easy", 20),
-        
-        # Extended list continues...
-        ("Do 50 jumping jacks", "Challenge yourself with 50 jumping jacks", "physical", "medium", 5),
-        ("Walk up 5 flights of stairs", "Find stairs and walk up 5 flights", "physical", "easy", 10),
-        ("Do lunges for 2 minutes", "Perform alternating lunges for 2 minutes", "physical", "easy", 3),
-        ("Try a new walking route", "Explore a different path in your neighborhood", "physical", "easy", 20),
-        ("Do wall push-ups", "Complete 15 wall push-ups as a modified exercise", "physical", "easy", 5),
-        ("Practice balance exercises", "Stand on one foot or do balance poses for 5 minutes", "physical", "easy", 5),
-        ("Do calf raises", "Complete 20 calf raises", "physical", "easy", 3),
-        ("Try dancing", "Dance to your favorite song for one full song", "physical", "easy", 4),
-        ("Do mountain climbers", "Perform mountain climbers for 30 seconds", "physical", "medium", 2),
-        ("Walk backwards for 2 minutes", "Carefully walk backwards for coordination", "physical", "easy", 3),
-    ]
-    
-    # Add more activities to reach 300 total
-    additional_activities = []
-    base_activities = [
-        ("Take a mindful walk", "Walk slowly and notice your surroundings", "wellness", "easy", 15),
-        ("Do breathing exercises", "Practice 4-7-8 breathing technique", "wellness", "easy", 10),
-        ("Organize your workspace", "Clean and arrange your work area", "productivity", "easy", 15),
-        ("Learn something new online", "Spend 15 minutes learning on a free platform", "learning", "easy", 15),
-        ("Practice gratitude", "Think of 5 things you're grateful for", "wellness", "easy", 5),
-        ("Take photos of nature", "Capture 3 beautiful nature photos", "creative", "easy", 15),
-        ("Do desk exercises", "Stretch and exercise at your desk", "physical", "easy", 10),
-        ("Call someone you haven't talked to in a while", "Reconnect with an old friend", "social", "easy", 20),
-        ("Try a new healthy snack", "Eat something nutritious you haven't tried", "wellness", "easy", 5),
-        ("Write down your thoughts", "Free-write for 10 minutes", "creative", "easy", 10),
-    ]
-    
-    # Multiply base activities to reach 300
-    for i in range(20):
-        for base_title, base_desc, category, difficulty, time in base_activities:
-            activities.append((
-                f"{base_title} (Variation {i+1})",
-                f"{base_desc} - Daily variation #{i+1}",
-                category,
-                difficulty,
-                time
-            ))
-    
-    # Create activity documents
-    activity_docs = []
-    for i, (title, description, category, difficulty, time_minutes) in enumerate(activities[:300]):
-        activity_doc = {
-            "id": str(uuid.uuid4()),
-            "title": title,
-            "description": description,
-            "category": category,
-            "difficulty": difficulty,
-            "estimated_time_minutes": time_minutes,
-            "is_active": True,
-            "created_at": datetime.utcnow()
-        }
-        activity_docs.append(activity_doc)
-    
-    # Clear existing activities and insert new ones
-    await activity_dataset_collection.delete_many({})
-    await activity_dataset_collection.insert_many(activity_docs)
+async def initialize_activity_dataset(dry_run: bool = False):
+    """Seed the activity dataset from the versioned seed file (admin function, idempotent)"""
+    with mongo.background_timeout():
+        result = await activity_dataset.seed_activity_dataset(activity_dataset_collection, dry_run=dry_run)
     
     return {
         "success": True,
-        "message": f"Initialized {len(activity_docs)} activities in the dataset",
-        "count": len(activity_docs)
+        "message": f"Activity dataset v{result['version']}: {result['inserted']} inserted, "
+                   f"{result['updated']} updated, {result['unchanged']} unchanged",
+        "count": result["total"],
+        **result
     }
 
 @api_router.get("/daily-global-activity/current")
-async def get_current_daily_global_activity():
+async def get_current_daily_global_activity(request: Request):
     """Get today's global activity"""
     today = datetime.utcnow().strftime("%Y-%m-%d")
     
-    daily_activity = await daily_global_activities_collection.find_one({"date": today})
-    
-    if not daily_activity:
-        # Create today's activity if it doesn't exist
-        await select_daily_global_activity(today)
-        daily_activity = await daily_global_activities_collection.find_one({"date": today})
+    daily_activity = await ensure_daily_global_activity(today)
     
     if daily_activity:
-        # Remove MongoDB ObjectId and convert datetime
         daily_activity.pop('_id', None)
-        if 'selected_at' in daily_activity and hasattr(daily_activity['selected_at'], 'isoformat'):
-            daily_activity['selected_at'] = daily_activity['selected_at'].isoformat()
-        
-        return daily_activity
+        # Short-lived: the body carries the live participant_count users see move as they complete
+        return http_cache.cached_response(request, daily_activity, http_cache.SHARED_SHORT)
     
     return {"error": "No daily activity available"}
 
+async def ensure_daily_global_activity(date_str: str):
+    """Get the day's global activity, creating it once even under concurrent requests"""
+    daily_activity = await daily_global_activities_collection.find_one({"date": date_str})
+    if daily_activity:
+        return daily_activity
+    
+    # Concurrent callers in this worker share one selection; the unique date index covers other workers
+    daily_activity = await daily_activity_flight.do(date_str, lambda: select_daily_global_activity(date_str))
+    
+    # Each caller gets its own copy since handlers mutate the document for serialization
+    return dict(daily_activity) if daily_activity else None
+
 async def select_daily_global_activity(date_str: str):
     """Select and schedule today's global activity"""
-    import random
-    
     # Check if activity already exists for this date
     existing = await daily_global_activities_collection.find_one({"date": date_str})
     if existing:
         return existing
     
-    # Get random activity from dataset
-    activities = await activity_dataset_collection.find({"is_active": True}).to_list(length=None)
-    if not activities:
+    selected_activity = await activity_selector.select(date_str)
+    if not selected_activity:
+        # Empty dataset: seed it from the bundled seed file on first use
+        await activity_dataset.seed_activity_dataset(activity_dataset_collection)
+        selected_activity = await activity_selector.select(date_str)
+    if not selected_activity:
         raise HTTPException(status_code=500, detail="No activities in dataset")
     
-    selected_activity = random.choice(activities)
+    daily_activity_doc = activity_selection.daily_activity_doc(date_str, selected_activity, activity_selector.rng)
     
-    # Generate random time between 05:00 and 00:00 GMT (19 hour window)
-    base_time = datetime.strptime(f"{date_str} 05:00:00", "%Y-%m-%d %H:%M:%S")
-    random_hours = random.randint(0, 19)
-    random_minutes = random.randint(0, 59)
-    selected_time = base_time + timedelta(hours=random_hours, minutes=random_minutes)
-    
-    daily_activity_doc = {
-        "id": str(uuid.uuid4()),
-        "activity_id": selected_activity["id"],
-        "date": date_str,
-        "selected_at": selected_time,
-        "activity_title": selected_activity["title"],
-        "activity_description": selected_activity["description"],
-        "is_active": True,
-        "participant_count": 0
-    }
-    
-    await daily_global_activities_collection.insert_one(daily_activity_doc)
+    try:
+        await daily_global_activities_collection.insert_one(daily_activity_doc)
+    except DuplicateKeyError:
+        # Another worker won the race; everyone uses its pick
+        return await daily_global_activities_collection.find_one({"date": date_str})
     return daily_activity_doc
 
+@api_router.post("/admin/daily-global-activity/schedule")
+async def schedule_daily_global_activities(days: int = Form(30), start_date: Optional[str] = Form(None)):
+    """Pre-generate daily global activities for the next N days (admin function)"""
+    if not 1 <= days <= activity_selection.MAX_SCHEDULE_DAYS:
+        raise HTTPException(status_code=400, detail=f"days must be between 1 and {activity_selection.MAX_SCHEDULE_DAYS}")
+    if start_date:
+        try:
+            datetime.strptime(start_date, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="start_date must be YYYY-MM-DD")
+    start_date = start_date or datetime.utcnow().strftime("%Y-%m-%d")
+    with mongo.background_timeout():
+        result = await activity_selector.schedule(start_date, days)
+    return {"success": True, **result}
+
+async def dedupe_daily_global_activities():
+    """Remove duplicate picks for the same date (keeping the first) so the unique index can build"""
+    duplicates = await daily_global_activities_collection.aggregate([
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": "$date", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ]).to_list(length=None)
+    
+    extra_ids = [doc_id for duplicate in duplicates for doc_id in duplicate["ids"][1:]]
+    if extra_ids:
+        await daily_global_activities_collection.delete_many({"_id": {"$in": extra_ids}})
+    return len(extra_ids)
+
+async def backfill_follower_notifications():
+    """Give new_follower notifications written without a title one, so they pass NotificationResponse"""
+    result = await db.notifications.update_many(
+        {"type": "new_follower", "title": {"$exists": False}},
+        {"$set": {"title": "New Follower!"}}
+    )
+    return result.modified_count
+
 @api_router.post("/daily-global-activity/complete")
 async def complete_daily_global_activity(
     user_id: str = Form(...),
@@ -1470,7 +1448,7 @@ async def complete_daily_global_activity(
     # Process photo if provided
     photo_url = None
     if photo:
-        content = await photo.read()
+        content = await read_photo(photo)
         photo_url = f"data:image/jpeg;base64,{base64.b64encode(content).decode('utf-8')}"
     
     # Create completion record
@@ -1496,14 +1474,12 @@ async def complete_daily_global_activity(
     
     # Remove MongoDB ObjectId for response
     completion_doc.pop('_id', None)
-    if 'completed_at' in completion_doc and hasattr(completion_doc['completed_at'], 'isoformat'):
-        completion_doc['completed_at'] = completion_doc['completed_at'].isoformat()
     
-    return {
+    return FastJSONResponse({
         "success": True,
         "completion": completion_doc,
         "message": "Global activity completed! You can now view friends' submissions."
-    }
+    })
 
 @api_router.get("/daily-global-activity/feed")
 async def get_daily_global_activity_feed(
@@ -1515,15 +1491,10 @@ async def get_daily_global_activity_feed(
     today = datetime.utcnow().strftime("%Y-%m-%d")
     
     # Get today's activity
-    daily_activity = await daily_global_activities_collection.find_one({"date": today})
+    daily_activity = await daily_global_activities_collection.find_one({"date": today}, {"_id": 0})
     if not daily_activity:
         return {"status": "no_activity", "message": "No global activity for today"}
     
-    # Clean up daily_activity first
-    daily_activity.pop('_id', None)
-    if 'selected_at' in daily_activity and hasattr(daily_activity['selected_at'], 'isoformat'):
-        daily_activity['selected_at'] = daily_activity['selected_at'].isoformat()
-    
     # Check if user has completed today's activity
     user_completion = await global_activity_completions_collection.find_one({
         "activity_id": daily_activity["id"],
@@ -1531,11 +1502,11 @@ async def get_daily_global_activity_feed(
     })
     
     if not user_completion:
-        return {
+        return FastJSONResponse({
             "status": "locked",
             "activity": daily_activity,
             "message": "Submit your activity to view friends' posts"
-        }
+        })
     
     # Build query for completions
     completions_query = {"activity_id": daily_activity["id"]}
@@ -1549,32 +1520,26 @@ async def get_daily_global_activity_feed(
             completions_query["user_id"] = {"$in": following_ids}
         else:
             # No friends, return empty feed
-            return {
+            return FastJSONResponse({
                 "status": "unlocked",
                 "activity": daily_activity,
                 "completions": [],
                 "friends_count": 0,
                 "message": "No friends have completed this activity yet"
-            }
+            })
     
     # Get completions
-    completions = await global_activity_completions_collection.find(
-        completions_query
+    completions = await feed_db.global_activity_completions.find(
+        completions_query, {"_id": 0}
     ).sort("completed_at", -1).limit(limit).to_list(length=None)
     
-    # Clean up MongoDB data
-    for completion in completions:
-        completion.pop('_id', None)
-        if 'completed_at' in completion and hasattr(completion['completed_at'], 'isoformat'):
-            completion['completed_at'] = completion['completed_at'].isoformat()
-    
-    return {
+    return FastJSONResponse({
         "status": "unlocked",
         "activity": daily_activity,
         "completions": completions,
         "friends_count": len(completions),
         "user_has_completed": True
-    }
+    })
 
 @api_router.post("/groups/{group_id}/complete-daily-activity")
 async def complete_group_daily_activity(
@@ -1585,11 +1550,13 @@ async def complete_group_daily_activity(
 ):
     """Submit completion of today's group activity"""
     # Get group info
-    group = await db.groups.find_one({"id": group_id})
+    group = await group_repository.membership(group_id, user_id, {
+        "_id": 0, "id": 1, "name": 1, "current_day_activity": 1, f"current_week_points.{user_id}": 1
+    })
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
-    if user_id not in group["members"]:
+    if not group["is_member"]:
         raise HTTPException(status_code=403, detail="User not in group")
     
     # Get today's revealed activity for this group
@@ -1618,7 +1585,7 @@ async def complete_group_daily_activity(
     # Process photo if provided
     photo_url = None
     if photo:
-        content = await photo.read()
+        content = await read_photo(photo)
         photo_url = f"data:image/jpeg;base64,{base64.b64encode(content).decode('utf-8')}"
     
     # Calculate points (3 points for 1st, 2 for 2nd, 1 for 3rd+)
@@ -1661,15 +1628,13 @@ async def complete_group_daily_activity(
     
     # Remove MongoDB ObjectId for response
     completion_doc.pop('_id', None)
-    if 'completed_at' in completion_doc and hasattr(completion_doc['completed_at'], 'isoformat'):
-        completion_doc['completed_at'] = completion_doc['completed_at'].isoformat()
     
-    return {
+    return FastJSONResponse({
         "success": True,
         "completion": completion_doc,
         "points_earned": points_earned,
         "message": f"Group activity completed! You earned {points_earned} points. You can now view members' posts."
-    }
+    })
 
 @api_router.get("/groups/{group_id}/daily-activity-feed")
 async def get_group_daily_activity_feed(
@@ -1679,11 +1644,13 @@ async def get_group_daily_activity_feed(
 ):
     """Get feed of today's group activity completions"""
     # Get group info
-    group = await db.groups.find_one({"id": group_id})
+    group = await group_repository.membership(group_id, user_id, {
+        "_id": 0, "id": 1, "name": 1, "current_day_activity": 1
+    })
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
-    if user_id not in group["members"]:
+    if not group["is_member"]:
         raise HTTPException(status_code=403, detail="User not in group")
     
     # Get today's revealed activity for this group
@@ -1715,19 +1682,22 @@ async def get_group_daily_activity_feed(
         }
     
     # Get group members' completions for today
-    group_completions = await db.daily_activity_completions.find({
+    group_completions = await feed_db.daily_activity_completions.find({
         "group_id": group_id,
         "completed_at": {"$gte": today_start, "$lt": today_end}
-    }).sort("completed_at", -1).limit(limit).to_list(length=None)
-    
-    # Get user info for each completion
+    }, {"_id": 0}).sort("completed_at", -1).limit(limit).to_list(length=None)
+    
+    # Attach user info to each completion (one lookup for all completers)
+    completer_ids = list({completion["completed_by"] for completion in group_completions})
+    users_by_id = {
+        user_info["id"]: user_info
+        async for user_info in db.users.find(
+            {"id": {"$in": completer_ids}},
+            {"_id": 0, "id": 1, "username": 1, "full_name": 1, "avatar_color": 1}
+        )
+    }
     for completion in group_completions:
-        completion.pop('_id', None)
-        if 'completed_at' in completion and hasattr(completion['completed_at'], 'isoformat'):
-            completion['completed_at'] = completion['completed_at'].isoformat()
-        
-        # Get user info
-        user_info = await db.users.find_one({"id": completion["completed_by"]})
+        user_info = users_by_id.get(completion["completed_by"])
         if user_info:
             completion["user_info"] = {
                 "username": user_info["username"],
@@ -1735,14 +1705,14 @@ async def get_group_daily_activity_feed(
                 "avatar_color": user_info["avatar_color"]
             }
     
-    return {
+    return FastJSONResponse({
         "status": "unlocked",
         "activity": current_day_activity,
         "completions": group_completions,
         "group_name": group["name"],
         "members_completed": len(group_completions),
         "user_has_completed": True
-    }
+    })
 
 # Achievement Routes
 @api_router.get("/achievements/{user_id}", response_model=List[Achievement])
@@ -1796,6 +1766,10 @@ async def get_user_achievements(user_id: str):
 # Include the router in the main app
 app.include_router(api_router)
 
+# Shed abusive per-IP traffic before it reaches the handlers; added before CORS
+# so CORS wraps it and 429s carry the headers browsers need to read them
+app.add_middleware(rate_limit.RateLimitMiddleware, limiter=rate_limiter)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -1805,6 +1779,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request Mongo breakdown for slow and N+1 requests (SLOW_REQUEST_MS, N_PLUS_ONE_THRESHOLD)
+app.add_middleware(tracing.TracingMiddleware, route_resolver=lambda scope: metrics.route_template(scope, app.routes))
+# Outermost, so rate-limited and CORS-rejected requests are measured too
+app.add_middleware(metrics.MetricsMiddleware, routes=app.routes)
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (served on the backend port only; nginx proxies just /api)"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -1812,9 +1797,78 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def bootstrap_database():
+    """Index builds, backfills, migrations and seeding; run by one worker per deploy"""
+    await user_search.ensure_indexes(users_collection)
+    await follows_collection.create_index([("follower_id", 1), ("following_id", 1)])
+    backfilled = await user_search.backfill_search_fields(users_collection)
+    if backfilled:
+        logger.info(f"Backfilled search fields for {backfilled} users")
+    
+    removed = await dedupe_daily_global_activities()
+    if removed:
+        logger.info(f"Removed {removed} duplicate daily global activities")
+    await daily_global_activities_collection.create_index("date", unique=True)
+    await activity_dataset.ensure_indexes(activity_dataset_collection)
+    await activity_selection.ensure_indexes(activity_dataset_collection)
+    await activity_selection.backfill_random_keys(activity_dataset_collection)
+    
+    await group_reveals.ensure_indexes(db)
+    await invite_codes.ensure_indexes(db.groups, namespace="group")
+    await week_rollover.ensure_indexes(db)
+    await global_challenges_collection.create_index([("is_active", 1), ("created_at", 1)])
+    await global_challenges_collection.create_index([("is_active", 1), ("expires_at", 1)])
+    await global_activity_completions_collection.create_index([("activity_id", 1), ("completed_at", -1)])
+    await db.daily_activity_completions.create_index([("group_id", 1), ("completed_at", -1)])
+    await db.notifications.create_index([("user_id", 1), ("created_at", -1)])
+    backfilled = await backfill_follower_notifications()
+    if backfilled:
+        logger.info(f"Added titles to {backfilled} follower notifications")
+    
+    # One-time conversion of legacy string timestamps (recorded in the migrations collection)
+    converted = await datetimes.migrate_once(db)
+    if converted:
+        logger.info(f"Converted legacy string timestamps: {converted}")
+    
+    seeded = await activity_dataset.seed_activity_dataset(activity_dataset_collection)
+    if seeded["inserted"] or seeded["updated"]:
+        logger.info(f"Seeded activity dataset: {seeded}")
+
+def bootstrap_version() -> str:
+    """Changes whenever the bootstrap steps, the modules they call or the activity seed file change"""
+    return bootstrap.fingerprint(
+        bootstrap_database, dedupe_daily_global_activities,
+        user_search, activity_dataset, activity_selection, group_reveals, invite_codes, week_rollover, datetimes,
+        files=[activity_dataset.seed_file_path()]
+    )
+
+async def run_startup():
+    # No background_timeout() here: pymongo.timeout() is an absolute deadline that tasks
+    # created inside inherit, so bootstrap steps and each scheduled job enter their own
+    try:
+        await bootstrap.run_once(db, bootstrap_lock, bootstrap_database, bootstrap_version())
+    except Exception:
+        # Stay unready; the orchestrator restarts the container
+        logger.exception("Startup bootstrap failed")
+        return
+    readiness["bootstrapped"] = True
+    
+    if os.environ.get("SCHEDULER_ENABLED", "true").lower() == "true":
+        job_scheduler.start()
+
+@app.on_event("startup")
+async def start_background_services():
+    # Bootstrap in the background so the worker can answer /api/ready (503) meanwhile
+    readiness["startup_task"] = asyncio.create_task(run_startup())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    readiness["draining"] = True
+    if readiness["startup_task"]:
+        readiness["startup_task"].cancel()
+    await job_scheduler.stop()
     client.close()
+    passwords.shutdown()
 
 # NEW: Follow/Unfollow Endpoints
 @app.post("/api/users/{user_id}/follow")
@@ -1848,7 +1902,7 @@ async def follow_user(
             "id": str(uuid.uuid4()),
             "follower_id": follower_id,
             "following_id": user_id,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.utcnow()
         }
         
         await follows_collection.insert_one(follow_data)
@@ -1858,9 +1912,11 @@ async def follow_user(
             "id": str(uuid.uuid4()),
             "user_id": user_id,
             "type": "new_follower",
+            "title": "New Follower!",
             "message": f"{follower['username']} started following you!",
+            "data": {"follower_id": follower_id},
             "read": False,
-            "created_at": datetime.utcnow().isoformat()
+            "created_at": datetime.utcnow()
         }
         await notifications_collection.insert_one(notification_data)
         
@@ -1903,7 +1959,7 @@ async def get_following(user_id: str):
         # Get user details for each followed user
         following_users = await users_collection.find(
             {"id": {"$in": following_ids}},
-            {"_id": 0, "password": 0, "email": 0}
+            user_search.PUBLIC_PROJECTION
         ).to_list(None)
         
         return following_users
@@ -1924,7 +1980,7 @@ async def get_followers(user_id: str):
         # Get user details for each follower
         followers = await users_collection.find(
             {"id": {"$in": follower_ids}},
-            {"_id": 0, "password": 0, "email": 0}
+            user_search.PUBLIC_PROJECTION
         ).to_list(None)
         
         return followers
@@ -1957,13 +2013,10 @@ async def create_scheduled_challenge(
     """Create a global challenge (admin function)"""
     try:
         challenge_id = str(uuid.uuid4())
-        now = datetime.now()
+        now = datetimes.utcnow()
         
-        # Parse start time or use now
-        if start_time:
-            start_datetime = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-        else:
-            start_datetime = now
+        # Parse start time (naive times are UTC) or use now
+        start_datetime = datetimes.to_utc(start_time) if start_time else now
             
         # Calculate expiration time
         expires_at = start_datetime + timedelta(hours=duration_hours)
@@ -1971,24 +2024,26 @@ async def create_scheduled_challenge(
         challenge_data = {
             "id": challenge_id,
             "prompt": prompt,
-            "created_at": start_datetime.isoformat(),
-            "expires_at": expires_at.isoformat(),
+            "created_at": start_datetime,
+            "expires_at": expires_at,
             "promptness_window_minutes": promptness_window_minutes,
             "is_active": start_datetime <= now <= expires_at
         }
         
-        global_challenges_collection.insert_one(challenge_data)
+        await global_challenges_collection.insert_one(challenge_data)
         
         # Deactivate any other active challenges
         if challenge_data["is_active"]:
-            global_challenges_collection.update_many(
+            await global_challenges_collection.update_many(
                 {"id": {"$ne": challenge_id}, "is_active": True},
                 {"$set": {"is_active": False}}
             )
         
         # Send notifications to all users about the new global challenge
         if send_notifications and challenge_data["is_active"]:
-            send_global_challenge_notifications(challenge_id, prompt)
+            await send_global_challenge_notifications(challenge_id, prompt)
+        
+        job_scheduler.wake("challenge_schedule")
         
         # Remove MongoDB ObjectId for JSON response
         challenge_data.pop('_id', None)
@@ -1998,11 +2053,11 @@ async def create_scheduled_challenge(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def send_global_challenge_notifications(challenge_id: str, prompt: str):
+async def send_global_challenge_notifications(challenge_id: str, prompt: str):
     """Send notifications to all users about a new global challenge"""
     try:
         # Get all active users (you might want to limit this or batch it for scale)
-        users = list(users_collection.find({}, {"id": 1, "username": 1}).limit(1000))
+        users = await users_collection.find({}, {"id": 1, "username": 1}).limit(1000).to_list(length=1000)
         
         notifications_to_insert = []
         for user in users:
@@ -2014,7 +2069,7 @@ def send_global_challenge_notifications(challenge_id: str, prompt: str):
                 "message": f"🌍 New Global Challenge: {prompt[:50]}{'...' if len(prompt) > 50 else ''}",
                 "title": "New Global Challenge!",
                 "read": False,
-                "created_at": datetime.now().isoformat(),
+                "created_at": datetimes.utcnow(),
                 "action_url": "/feed",  # Deep link to home/today screen
                 "metadata": {
                     "challenge_id": challenge_id,
@@ -2026,7 +2081,7 @@ def send_global_challenge_notifications(challenge_id: str, prompt: str):
         
         # Batch insert notifications
         if notifications_to_insert:
-            notifications_collection.insert_many(notifications_to_insert)
+            await notifications_collection.insert_many(notifications_to_insert)
             print(f"Sent {len(notifications_to_insert)} global challenge notifications")
         
     except Exception as e:
@@ -2051,12 +2106,12 @@ def get_user_notifications(user_id: str, limit: int = 50):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.patch("/api/notifications/{notification_id}/read")
-def mark_notification_read(notification_id: str):
+async def mark_notification_read(notification_id: str):
     """Mark a notification as read"""
     try:
-        result = notifications_collection.update_one(
+        result = await notifications_collection.update_one(
             {"id": notification_id},
-            {"$set": {"read": True, "read_at": datetime.now().isoformat()}}
+            {"$set": {"read": True, "read_at": datetimes.utcnow()}}
         )
         
         if result.modified_count == 0:
@@ -2071,23 +2126,23 @@ def mark_notification_read(notification_id: str):
 async def list_all_challenges():
     """List all global challenges (admin function)"""
     try:
-        challenges = list(global_challenges_collection.find({}, {"_id": 0}).sort("created_at", -1))
+        challenges = await global_challenges_collection.find({}, {"_id": 0}).sort("created_at", -1).to_list(length=None)
         return challenges
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/admin/global-challenges/{challenge_id}/activate")
-def activate_challenge(challenge_id: str):
+async def activate_challenge(challenge_id: str):
     """Manually activate a challenge (admin function)"""
     try:
         # Deactivate all other challenges
-        global_challenges_collection.update_many(
+        await global_challenges_collection.update_many(
             {"is_active": True},
             {"$set": {"is_active": False}}
         )
         
         # Activate the specified challenge
-        result = global_challenges_collection.update_one(
+        result = await global_challenges_collection.update_one(
             {"id": challenge_id},
             {"$set": {"is_active": True}}
         )
@@ -2101,7 +2156,7 @@ def activate_challenge(challenge_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/admin/global-challenges/auto-schedule")
-def auto_schedule_challenges():
+async def auto_schedule_challenges():
     """Auto-schedule predefined challenges for the next week"""
     try:
         # Predefined challenge prompts
@@ -2118,7 +2173,7 @@ def auto_schedule_challenges():
             "Photo of you enjoying movement outdoors! 🌳"
         ]
         
-        now = datetime.now()
+        now = datetimes.utcnow()
         created_challenges = []
         
         # Create challenges for the next 7 days (one per day)
@@ -2132,16 +2187,18 @@ def auto_schedule_challenges():
             challenge_data = {
                 "id": challenge_id,
                 "prompt": prompt,
-                "created_at": start_time.isoformat(),
-                "expires_at": expires_at.isoformat(),
+                "created_at": start_time,
+                "expires_at": expires_at,
                 "promptness_window_minutes": 5,
                 "is_active": False,  # Will be activated when the time comes
                 "auto_scheduled": True
             }
             
-            global_challenges_collection.insert_one(challenge_data)
+            await global_challenges_collection.insert_one(challenge_data)
             created_challenges.append({k: v for k, v in challenge_data.items() if k != '_id'})  # Remove ObjectId
         
+        job_scheduler.wake("challenge_schedule")
+        
         return {
             "success": True, 
             "challenges_created": len(created_challenges),
@@ -2152,46 +2209,169 @@ def auto_schedule_challenges():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def apply_challenge_schedule(now: datetime) -> dict:
+    """Activate/expire global challenges whose start or expiry time has passed"""
+    # Deactivate expired challenges
+    expired_result = await global_challenges_collection.update_many(
+        {
+            "is_active": True,
+            "expires_at": {"$lt": now}
+        },
+        {"$set": {"is_active": False}}
+    )
+    
+    # Activate challenges that should start now
+    activated_result = await global_challenges_collection.update_many(
+        {
+            "is_active": False,
+            "created_at": {"$lte": now},
+            "expires_at": {"$gt": now}
+        },
+        {"$set": {"is_active": True}}
+    )
+    
+    return {
+        "expired_challenges": expired_result.modified_count,
+        "activated_challenges": activated_result.modified_count,
+        "timestamp": now
+    }
+
+async def next_challenge_boundary(now: datetime) -> Optional[datetime]:
+    """Earliest upcoming challenge start or active challenge expiry"""
+    next_start = await global_challenges_collection.find_one(
+        {"is_active": False, "created_at": {"$gt": now}},
+        {"_id": 0, "created_at": 1},
+        sort=[("created_at", 1)]
+    )
+    next_expiry = await global_challenges_collection.find_one(
+        {"is_active": True, "expires_at": {"$gt": now}},
+        {"_id": 0, "expires_at": 1},
+        sort=[("expires_at", 1)]
+    )
+    boundaries = [
+        value
+        for value in (next_start and next_start["created_at"], next_expiry and next_expiry["expires_at"])
+        if value
+    ]
+    return min(boundaries) if boundaries else None
+
 @app.post("/api/admin/update-challenge-status")
 async def update_challenge_status():
-    """Update challenge status based on current time (called periodically)"""
+    """Update challenge status based on current time (also run by the scheduler)"""
     try:
-        now = datetime.now()
-        now_iso = now.isoformat()
-        
-        # Deactivate expired challenges
-        expired_result = global_challenges_collection.update_many(
-            {
-                "is_active": True,
-                "expires_at": {"$lt": now_iso}
-            },
-            {"$set": {"is_active": False}}
-        )
-        
-        # Activate challenges that should start now
-        activated_result = global_challenges_collection.update_many(
-            {
-                "is_active": False,
-                "created_at": {"$lte": now_iso},
-                "expires_at": {"$gt": now_iso}
-            },
-            {"$set": {"is_active": True}}
-        )
+        result = await apply_challenge_schedule(datetimes.utcnow())
         
         # Get current active challenge
-        active_challenge = global_challenges_collection.find_one({"is_active": True})
+        active_challenge = await global_challenges_collection.find_one({"is_active": True})
         
         return {
             "success": True,
-            "expired_challenges": expired_result.modified_count,
-            "activated_challenges": activated_result.modified_count,
-            "current_active_challenge": active_challenge["prompt"] if active_challenge else None,
-            "timestamp": now_iso
+            **result,
+            "current_active_challenge": active_challenge["prompt"] if active_challenge else None
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/admin/migrations/normalize-datetimes")
+async def normalize_datetimes():
+    """Convert legacy ISO-string timestamps to UTC datetimes (admin function, idempotent)"""
+    with mongo.background_timeout():
+        converted = await datetimes.migrate_string_timestamps(db)
+    return {"success": True, "converted": converted}
+
+# Scheduled jobs
+async def challenge_schedule_job(now: datetime) -> Optional[datetime]:
+    result = await apply_challenge_schedule(now)
+    if result["expired_challenges"] or result["activated_challenges"]:
+        logger.info(f"Challenge schedule applied: {result}")
+    
+    return await next_challenge_boundary(now)
+
+async def group_reveal_job(now: datetime) -> Optional[datetime]:
+    """Reveal the next activity for every group whose next_reveal_at has passed"""
+    result = await group_reveals.batch_reveal(db, now, due_only=True)
+    if result["groups_scanned"]:
+        result.pop("preview")
+        logger.info(f"Scheduled group reveals: {result}")
+    
+    # Due groups that can't be revealed would otherwise be rescanned every tick
+    await db.groups.update_many(
+        {"next_reveal_at": {"$lte": now}},
+        {"$unset": {"next_reveal_at": ""}}
+    )
+    
+    upcoming = await db.groups.find_one(
+        {"next_reveal_at": {"$gt": now}},
+        {"_id": 0, "next_reveal_at": 1},
+        sort=[("next_reveal_at", 1)]
+    )
+    return upcoming["next_reveal_at"] if upcoming else None
+
+async def daily_activity_job(now: datetime) -> Optional[datetime]:
+    """Pre-create today's and tomorrow's global activity so midnight traffic never pays for selection"""
+    for day in (now, now + timedelta(days=1)):
+        await ensure_daily_global_activity(day.strftime("%Y-%m-%d"))
+    return now + timedelta(seconds=DAILY_ACTIVITY_PREWARM_SECONDS)
+
+async def week_rollover_job(now: datetime) -> Optional[datetime]:
+    """Archive and reset the week for groups whose submission day starts today"""
+    result = await week_rollover.batch_rollover(db, now, due_only=True)
+    if result["groups_scanned"]:
+        result.pop("preview")
+        logger.info(f"Scheduled week rollover: {result}")
+    return week_rollover.next_rollover_time(now)
+
+job_scheduler.add_job("challenge_schedule", challenge_schedule_job)
+job_scheduler.add_job("week_rollover", week_rollover_job)
+job_scheduler.add_job("group_reveals", group_reveal_job)
+job_scheduler.add_job("daily_global_activity", daily_activity_job)
+
+@app.post("/api/admin/reveals/batch")
+async def batch_reveal_group_activities(
+    dry_run: bool = Form(False),
+    due_only: bool = Form(False),
+    group_ids: Optional[str] = Form(None),  # Comma-separated, defaults to all groups
+    chunk_size: int = Form(500)
+):
+    """Reveal the next activity for all eligible groups in one pass (admin function)"""
+    ids = [group_id.strip() for group_id in group_ids.split(",") if group_id.strip()] if group_ids else None
+    with mongo.background_timeout():
+        result = await group_reveals.batch_reveal(
+            db, due_only=due_only, group_ids=ids, chunk_size=chunk_size, dry_run=dry_run
+        )
+    return {"success": True, **result}
+
+@app.post("/api/admin/weeks/rollover")
+async def rollover_group_weeks(
+    dry_run: bool = Form(False),
+    due_only: bool = Form(True),
+    group_ids: Optional[str] = Form(None),  # Comma-separated, defaults to all groups
+    chunk_size: int = Form(500)
+):
+    """Archive rankings and reset week state for eligible groups in one pass (admin function)"""
+    ids = [group_id.strip() for group_id in group_ids.split(",") if group_id.strip()] if group_ids else None
+    with mongo.background_timeout():
+        result = await week_rollover.batch_rollover(
+            db, due_only=due_only, group_ids=ids, chunk_size=chunk_size, dry_run=dry_run
+        )
+    return {"success": True, **result}
+
+@app.get("/api/admin/scheduler")
+async def get_scheduler_status():
+    """Scheduler leadership and per-job run status (admin function)"""
+    return job_scheduler.status()
+
+@app.get("/api/admin/db/pool")
+async def get_db_pool_stats():
+    """Mongo connection pool counters for this worker and the configured client options (admin function)"""
+    return {
+        "pid": os.getpid(),
+        "options": mongo.CLIENT_OPTIONS,
+        "feed_read_preference": mongo.FEED_READ_PREFERENCE,
+        "pools": mongo.pool_stats.snapshot()
+    }
+
 # NEW: Challenge Statistics Endpoint
 @app.get("/api/global-challenges/{challenge_id}/stats")
 async def get_challenge_stats(challenge_id: str):
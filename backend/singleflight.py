@@ -0,0 +1,33 @@
+"""In-process request coalescing.
+
+``SingleFlight.do(key, fn)`` runs ``fn`` once per key at a time; concurrent
+callers with the same key await the in-flight call instead of repeating it.
+The call keeps running if the callers waiting on it are cancelled.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            # The call runs as its own task, so the caller that started it being
+            # cancelled (e.g. a client disconnect) doesn't fail the other waiters
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # Shield so a cancelled waiter only stops waiting
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved when every waiter has gone away
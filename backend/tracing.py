@@ -0,0 +1,209 @@
+"""Per-request Mongo tracing.
+
+``TracingMiddleware`` opens a ``RequestTrace`` for each HTTP request in a
+context variable; ``MongoTraceListener`` (a pymongo ``CommandListener``)
+appends every command issued while it is active with its collection, filter
+shape, duration and document count. Motor runs commands on executor threads
+with the caller's context copied, so listener callbacks see the trace of the
+request that issued them.
+
+Requests slower than ``SLOW_REQUEST_MS`` are logged as structured JSON with
+the per-command breakdown, as are requests repeating the same query shape
+``N_PLUS_ONE_THRESHOLD`` or more times (a loop of ``find_one`` calls).
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import structlog
+from pymongo import monitoring
+
+from metrics import IGNORED_COMMANDS, command_collection
+
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", 500))
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", 5))
+# Log every traced request, not just slow/N+1 ones (debugging only)
+TRACE_LOG_ALL = os.environ.get("TRACE_LOG_ALL", "false").lower() == "true"
+MAX_OPS_PER_TRACE = 200
+
+trace_logger = structlog.wrap_logger(
+    logging.getLogger("actify.trace"),
+    processors=[
+        structlog.processors.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso", utc=True),
+        structlog.processors.JSONRenderer(),
+    ],
+)
+
+
+def shape(value: Any) -> Any:
+    """Query shape: keys and operators kept, literal values replaced by "?"."""
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        shapes = []
+        for item in value:
+            item_shape = shape(item)
+            if item_shape not in shapes:
+                shapes.append(item_shape)
+        return shapes if any(isinstance(item, (dict, list)) for item in shapes) else "?"
+    return "?"
+
+
+def command_filter(command_name: str, command: Dict) -> Any:
+    if command_name in ("find", "count", "distinct", "findAndModify"):
+        return command.get("filter", command.get("query"))
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline") or [{}]
+        return pipeline[0].get("$match")
+    if command_name == "update":
+        return (command.get("updates") or [{}])[0].get("q")
+    if command_name == "delete":
+        return (command.get("deletes") or [{}])[0].get("q")
+    return None
+
+
+def reply_count(command_name: str, reply: Dict) -> Optional[int]:
+    cursor = reply.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if "n" in reply:
+        return reply["n"]
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") else 0
+    return None
+
+
+class RequestTrace:
+    def __init__(self, request_id: str, method: str, path: str):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.ops: List[Dict] = []
+        self.dropped_ops = 0
+        self._pending: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+
+    def start_op(self, request_id: int, op: Dict):
+        with self._lock:
+            if len(self.ops) >= MAX_OPS_PER_TRACE:
+                self.dropped_ops += 1
+                return
+            self.ops.append(op)
+            self._pending[request_id] = op
+
+    def finish_op(self, request_id: int, duration_micros: int, docs: Optional[int], error: Optional[str] = None):
+        with self._lock:
+            op = self._pending.pop(request_id, None)
+        if op is None:
+            return
+        op["duration_ms"] = round(duration_micros / 1000, 2)
+        op["docs"] = docs
+        if error:
+            op["error"] = error
+
+    def repeated_shapes(self) -> List[Dict]:
+        counts = Counter(
+            (op["collection"], op["command"], repr(op["filter"]))
+            for op in self.ops if op["command"] in ("find", "count", "aggregate", "findAndModify")
+        )
+        return [
+            {"collection": collection, "command": command, "filter": filter_shape, "count": count}
+            for (collection, command, filter_shape), count in counts.items()
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+    def summary(self, status: int, route: str) -> Dict:
+        duration_ms = (time.perf_counter() - self.started) * 1000
+        db_ms = sum(op.get("duration_ms", 0) for op in self.ops)
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration_ms, 1),
+            "db_ms": round(db_ms, 1),
+            "db_ops": len(self.ops) + self.dropped_ops,
+            "ops": self.ops,
+        }
+
+
+current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+class MongoTraceListener(monitoring.CommandListener):
+    def started(self, event):
+        trace = current_trace.get()
+        if trace is None or event.command_name in IGNORED_COMMANDS:
+            return
+        trace.start_op(event.request_id, {
+            "collection": command_collection(event) or None,
+            "command": event.command_name,
+            "filter": shape(command_filter(event.command_name, event.command)),
+        })
+
+    def succeeded(self, event):
+        trace = current_trace.get()
+        if trace is not None:
+            trace.finish_op(event.request_id, event.duration_micros, reply_count(event.command_name, event.reply))
+
+    def failed(self, event):
+        trace = current_trace.get()
+        if trace is not None:
+            trace.finish_op(event.request_id, event.duration_micros, None, error=str(event.failure.get("errmsg", "")))
+
+
+mongo_listener = MongoTraceListener()
+
+
+class TracingMiddleware:
+    """Opens a trace per request, echoes ``X-Request-ID`` and logs slow or N+1 requests."""
+
+    def __init__(self, app, route_resolver=None):
+        self.app = app
+        # (scope) -> route template, for grouping log lines
+        self.route_resolver = route_resolver or (lambda scope: scope["path"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1") or uuid.uuid4().hex
+        trace = RequestTrace(request_id, scope["method"], scope["path"])
+        status = {"code": 500}
+
+        async def traced_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        token = current_trace.set(trace)
+        try:
+            await self.app(scope, receive, traced_send)
+        finally:
+            current_trace.reset(token)
+            self._report(trace, status["code"], scope)
+
+    def _report(self, trace: RequestTrace, status: int, scope):
+        repeated = trace.repeated_shapes()
+        elapsed_ms = (time.perf_counter() - trace.started) * 1000
+        if not (TRACE_LOG_ALL or repeated or elapsed_ms >= SLOW_REQUEST_MS):
+            return
+
+        summary = trace.summary(status, self.route_resolver(scope))
+        if repeated:
+            trace_logger.warning("n_plus_one_query", repeated=repeated, **summary)
+        elif elapsed_ms >= SLOW_REQUEST_MS:
+            trace_logger.warning("slow_request", threshold_ms=SLOW_REQUEST_MS, **summary)
+        else:
+            trace_logger.info("request_trace", **summary)
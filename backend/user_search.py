@@ -0,0 +1,157 @@
+"""Indexed user search for ACTIFY.
+
+Users carry normalized lowercase search fields (``username_lower``,
+``full_name_lower`` and ``name_tokens``) so typeahead queries become anchored
+prefix scans on indexes instead of unanchored case-insensitive regexes over
+the whole collection. Fuzzy matching over character trigrams is opt-in via
+``USER_SEARCH_FUZZY=true`` since its multikey index is comparatively large.
+"""
+import os
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+
+from pymongo import ASCENDING, UpdateOne
+
+FUZZY_ENABLED = os.environ.get("USER_SEARCH_FUZZY", "false").lower() == "true"
+CANDIDATE_POOL = 50
+MIN_QUERY_LENGTH = 2
+
+SEARCH_FIELDS = ("username_lower", "full_name_lower", "name_tokens", "name_trigrams")
+
+# Fields never returned from search/follow listings
+PUBLIC_PROJECTION = {"_id": 0, "password": 0, "email": 0, **{field: 0 for field in SEARCH_FIELDS}}
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+
+def trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def search_fields(username: str, full_name: str) -> Dict:
+    """Search fields to store on a user document."""
+    username_lower = normalize(username)
+    full_name_lower = normalize(full_name)
+    fields = {
+        "username_lower": username_lower,
+        "full_name_lower": full_name_lower,
+        "name_tokens": sorted(set(full_name_lower.split()) | {username_lower}),
+    }
+    if FUZZY_ENABLED:
+        fields["name_trigrams"] = sorted(set(trigrams(username_lower)) | set(trigrams(full_name_lower)))
+    return fields
+
+
+async def ensure_indexes(users_collection):
+    await users_collection.create_index([("username_lower", ASCENDING)])
+    await users_collection.create_index([("full_name_lower", ASCENDING)])
+    await users_collection.create_index([("name_tokens", ASCENDING)])
+    if FUZZY_ENABLED:
+        await users_collection.create_index([("name_trigrams", ASCENDING)])
+
+
+async def backfill_search_fields(users_collection, batch_size: int = 1000) -> int:
+    """Populate search fields on users created before they existed."""
+    missing = {"username_lower": {"$exists": False}}
+    if FUZZY_ENABLED:
+        missing = {"$or": [missing, {"name_trigrams": {"$exists": False}}]}
+
+    updated = 0
+    batch = []
+    async for user in users_collection.find(missing, {"_id": 1, "username": 1, "full_name": 1}):
+        fields = search_fields(user.get("username", ""), user.get("full_name", ""))
+        batch.append(UpdateOne({"_id": user["_id"]}, {"$set": fields}))
+        if len(batch) >= batch_size:
+            updated += (await users_collection.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        updated += (await users_collection.bulk_write(batch, ordered=False)).modified_count
+    return updated
+
+
+def _prefix(q: str) -> Dict:
+    # Anchored, case-sensitive regex on a lowercase field is served as an index range scan
+    return {"$regex": f"^{re.escape(q)}"}
+
+
+async def find_candidates(users_collection, q: str, limit: int = CANDIDATE_POOL) -> List[Dict]:
+    """Users whose username, full name or any name word starts with ``q``."""
+    q = normalize(q)
+    if len(q) < MIN_QUERY_LENGTH:
+        return []
+
+    candidates = await users_collection.find(
+        {"$or": [
+            {"username_lower": _prefix(q)},
+            {"full_name_lower": _prefix(q)},
+            {"name_tokens": _prefix(q)},
+        ]},
+        PUBLIC_PROJECTION
+    ).limit(limit).to_list(length=limit)
+
+    if FUZZY_ENABLED and len(candidates) < limit and len(q) >= 3:
+        seen = {user["id"] for user in candidates}
+        grams = trigrams(q)
+        fuzzy = await users_collection.find(
+            {"name_trigrams": {"$in": grams}, "id": {"$nin": list(seen)}},
+            {field: 0 for field in PUBLIC_PROJECTION if field != "name_trigrams"}
+        ).limit(limit * 4).to_list(length=limit * 4)
+
+        # Keep the closest matches by trigram overlap
+        wanted = set(grams)
+        fuzzy.sort(key=lambda user: len(wanted & set(user.get("name_trigrams", []))), reverse=True)
+        for user in fuzzy[:limit - len(candidates)]:
+            if len(wanted & set(user.pop("name_trigrams", []))) * 2 >= len(wanted):
+                candidates.append(user)
+
+    return candidates
+
+
+def rank(candidates: Iterable[Dict], q: str, followed_ids: Optional[Set[str]] = None, limit: int = 10) -> List[Dict]:
+    """Followed users first, then exact, username-prefix and name matches, shortest first."""
+    q = normalize(q)
+    followed_ids = followed_ids or set()
+
+    def score(user):
+        username = normalize(user.get("username", ""))
+        full_name = normalize(user.get("full_name", ""))
+        if username == q:
+            match = 0
+        elif username.startswith(q):
+            match = 1
+        elif full_name.startswith(q):
+            match = 2
+        elif any(token.startswith(q) for token in full_name.split()):
+            match = 3
+        else:
+            match = 4
+        return (user.get("id") not in followed_ids, match, len(username), username)
+
+    return sorted(candidates, key=score)[:limit]
+
+
+async def followed_among(follows_collection, user_id: Optional[str], candidate_ids: List[str]) -> Set[str]:
+    """Which candidates ``user_id`` follows, without loading their whole follow list."""
+    if not user_id or not candidate_ids:
+        return set()
+    follows = await follows_collection.find(
+        {"follower_id": user_id, "following_id": {"$in": candidate_ids}},
+        {"_id": 0, "following_id": 1}
+    ).to_list(length=len(candidate_ids))
+    return {follow["following_id"] for follow in follows}
+
+
+async def search_users(users_collection, follows_collection, q: str, user_id: Optional[str] = None, limit: int = 10, cache=None) -> List[Dict]:
+    if cache is not None:
+        candidates = await cache.candidates(q, lambda nq: find_candidates(users_collection, nq))
+    else:
+        candidates = await find_candidates(users_collection, q)
+    followed = await followed_among(follows_collection, user_id, [user["id"] for user in candidates])
+    return rank(candidates, q, followed, limit)
@@ -0,0 +1,209 @@
+"""Weekly group rollover.
+
+At a group's ``submission_day`` boundary the finished week is archived:
+per-member results are snapshotted into ``weekly_rankings`` (one
+``WeeklyRanking`` document per member and week) and the group document is
+reset in a single guarded update, so ``daily_reveals`` and the embedded
+ranking history stop growing week over week.
+"""
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# Past weeks kept inline on the group (winner summaries only); full results live in weekly_rankings
+EMBEDDED_RANKINGS_KEEP = 4
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+GROUP_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "members": 1,
+    "submission_day": 1,
+    "current_week_start": 1,
+    "current_week_points": 1,
+}
+
+
+async def ensure_indexes(db):
+    await db.weekly_rankings.create_index(
+        [("group_id", 1), ("week_start", 1), ("member_id", 1)], unique=True
+    )
+    await db.weekly_rankings.create_index([("member_id", 1), ("week_start", -1)])
+    await db.groups.create_index([("submission_day", 1), ("current_week_start", 1)])
+
+
+def day_start(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def submission_day_values(now: datetime) -> List[str]:
+    """Stored spellings of today's weekday (admins send e.g. "Monday")."""
+    name = WEEKDAYS[now.weekday()]
+    return [name.capitalize(), name, name.upper()]
+
+
+def rank_members(group: Dict, completed: Dict[str, int]) -> List[Dict]:
+    """Members ordered by points, with 1-based rank positions."""
+    points = group.get("current_week_points") or {}
+    member_ids = list(dict.fromkeys(list(group.get("members", [])) + list(points)))
+    ranked = sorted(member_ids, key=lambda member_id: points.get(member_id, 0), reverse=True)
+    return [
+        {
+            "member_id": member_id,
+            "total_points": points.get(member_id, 0),
+            "activities_completed": completed.get(member_id, 0),
+            "rank_position": position,
+        }
+        for position, member_id in enumerate(ranked, start=1)
+    ]
+
+
+def rollover_updates(group: Dict, rankings: List[Dict], new_week_start: datetime, now: datetime) -> Tuple[List[Dict], Tuple[Dict, Dict]]:
+    """WeeklyRanking documents for the finished week and the guarded (filter, update) resetting the group."""
+    week_start = group["current_week_start"]
+    ranking_docs = [
+        {
+            "id": str(uuid.uuid4()),
+            "group_id": group["id"],
+            "week_start": week_start,
+            "created_at": now,
+            **ranking
+        }
+        for ranking in rankings
+    ]
+    summary = {
+        "week_start": week_start,
+        "winner_id": rankings[0]["member_id"] if rankings and rankings[0]["total_points"] > 0 else None,
+        "top_points": rankings[0]["total_points"] if rankings else 0,
+    }
+    group_update = {
+        "$set": {
+            "current_week_start": new_week_start,
+            "activities_submitted_this_week": 0,
+            "submission_phase_active": True,
+            "daily_reveals": [],
+            "current_day_activity": None,
+            "current_week_points": {member_id: 0 for member_id in group.get("members", [])},
+        },
+        "$push": {"weekly_rankings": {"$each": [summary], "$slice": -EMBEDDED_RANKINGS_KEEP}},
+        "$unset": {"next_reveal_at": ""},
+    }
+    # Guarded on the week being archived so a concurrent rollover or restart can't double-apply
+    return ranking_docs, ({"id": group["id"], "current_week_start": week_start}, group_update)
+
+
+async def completions_by_member(db, groups: List[Dict]) -> Dict[str, Dict[str, int]]:
+    """group_id -> member_id -> completions since that group's week start."""
+    if not groups:
+        return {}
+    pipeline = [
+        {"$match": {"$or": [
+            {"group_id": group["id"], "completed_at": {"$gte": group["current_week_start"]}}
+            for group in groups
+        ]}},
+        {"$group": {"_id": {"group_id": "$group_id", "member_id": "$completed_by"}, "count": {"$sum": 1}}},
+    ]
+    completed: Dict[str, Dict[str, int]] = {}
+    async for row in db.daily_activity_completions.aggregate(pipeline):
+        completed.setdefault(row["_id"]["group_id"], {})[row["_id"]["member_id"]] = row["count"]
+    return completed
+
+
+async def batch_rollover(
+    db,
+    now: Optional[datetime] = None,
+    due_only: bool = True,
+    group_ids: Optional[List[str]] = None,
+    chunk_size: int = 500,
+    dry_run: bool = False,
+) -> Dict:
+    """Archive and reset the week for every eligible group.
+
+    ``due_only`` limits the pass to groups whose ``submission_day`` is today
+    and whose week started before today (the scheduler's mode); otherwise any
+    group with a week older than today rolls over.
+    """
+    now = now or datetime.utcnow()
+    new_week_start = day_start(now)
+
+    query: Dict = {"current_week_start": {"$lt": new_week_start}}
+    if due_only:
+        query["submission_day"] = {"$in": submission_day_values(now)}
+    if group_ids:
+        query["id"] = {"$in": group_ids}
+
+    metrics = {
+        "dry_run": dry_run,
+        "groups_scanned": 0,
+        "groups_rolled_over": 0,
+        "rankings_archived": 0,
+        "chunks": 0,
+        "conflicts": 0,
+        "preview": [],
+    }
+    started = time.perf_counter()
+
+    async def flush(chunk: List[Dict]):
+        metrics["chunks"] += 1
+        completed = await completions_by_member(db, chunk)
+
+        ranking_docs: List[Dict] = []
+        operations: List[UpdateOne] = []
+        for group in chunk:
+            rankings = rank_members(group, completed.get(group["id"], {}))
+            docs, group_op = rollover_updates(group, rankings, new_week_start, now)
+            ranking_docs.extend(docs)
+            operations.append(UpdateOne(*group_op))
+            if len(metrics["preview"]) < 20:
+                metrics["preview"].append({
+                    "group_id": group["id"],
+                    "week_start": group["current_week_start"],
+                    "rankings": rankings[:3]
+                })
+
+        if dry_run:
+            metrics["groups_rolled_over"] += len(operations)
+            metrics["rankings_archived"] += len(ranking_docs)
+            return
+
+        # Archive first: a crash between the two writes leaves the week in place to be retried
+        if ranking_docs:
+            try:
+                result = await db.weekly_rankings.insert_many(ranking_docs, ordered=False)
+                metrics["rankings_archived"] += len(result.inserted_ids)
+            except BulkWriteError as e:
+                # Already archived by an earlier, interrupted run
+                if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                    raise
+                metrics["rankings_archived"] += e.details["nInserted"]
+        if operations:
+            result = await db.groups.bulk_write(operations, ordered=False)
+            metrics["groups_rolled_over"] += result.modified_count
+            metrics["conflicts"] += len(operations) - result.modified_count
+
+    chunk: List[Dict] = []
+    async for group in db.groups.find(query, GROUP_PROJECTION).batch_size(chunk_size):
+        metrics["groups_scanned"] += 1
+        chunk.append(group)
+        if len(chunk) >= chunk_size:
+            await flush(chunk)
+            chunk = []
+            logger.info(f"Week rollover progress: {metrics['groups_scanned']} scanned, {metrics['groups_rolled_over']} rolled over")
+    if chunk:
+        await flush(chunk)
+
+    metrics["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return metrics
+
+
+def next_rollover_time(now: datetime) -> datetime:
+    """Submission days are whole UTC days, so the next boundary is the next midnight."""
+    return day_start(now) + timedelta(days=1)
@@ -1,322 +1,408 @@
+#!/usr/bin/env python3
+"""
+ACTIFY API Integration Harness
+Runs independent scenarios concurrently against the API, each creating its
+own users and groups through the public endpoints (usernames are prefixed
+``itest_<run>`` so leftovers are easy to spot), and reports pass/fail per
+scenario plus per-endpoint latency.
 
-import requests
-import sys
+Targets a running backend (--base-url, pooled HTTP/1.1 keep-alive client)
+or the app in-process through httpx's ASGI transport (--in-process, uses
+backend/.env). With --baseline, endpoints whose p95 regressed by more than
+--max-slowdown fail the run, so the suite doubles as a latency check.
+
+A run signs up ~17 users from one address, well over the default per-IP
+signup budget (RATE_LIMIT_USERS=5/300). --in-process lifts the RATE_LIMIT_*
+budgets it doesn't find already set; start a backend targeted with
+--base-url with e.g. RATE_LIMIT_USERS=1000/60.
+
+Requires httpx.
+"""
+
+import argparse
+import asyncio
 import json
+import os
+import sys
+import time
+import traceback
+import uuid
+from collections import defaultdict
 from datetime import datetime
+from pathlib import Path
 
-class ActifyAPITester:
-    def __init__(self, base_url):
-        self.base_url = base_url
-        self.session = requests.Session()
-        self.user_id = None
-        self.tests_run = 0
-        self.tests_passed = 0
-        self.test_group_id = "e4818c1d-9547-4bb9-8d65-62ab55ef9515"  # Test group ID from request
-        self.test_user_id = "967c04e7-47ae-487d-8226-183d390c7808"  # Test user ID from request
-
-    def run_test(self, name, method, endpoint, expected_status, data=None, files=None, form_data=None):
-        """Run a single API test"""
-        url = f"{self.base_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'} if not form_data and not files else {}
-        
-        self.tests_run += 1
-        print(f"\n🔍 Testing {name}...")
-        
-        try:
-            if method == 'GET':
-                response = self.session.get(url, headers=headers)
-            elif method == 'POST':
-                if form_data:
-                    response = self.session.post(url, data=form_data, files=files)
-                else:
-                    response = self.session.post(url, json=data, headers=headers)
-            
-            success = response.status_code == expected_status
-            
-            if success:
-                self.tests_passed += 1
-                print(f"✅ Passed - Status: {response.status_code}")
-                try:
-                    return success, response.json()
-                except:
-                    return success, {}
-            else:
-                print(f"❌ Failed - Expected {expected_status}, got {response.status_code}")
-                try:
-                    print(f"Response: {response.text}")
-                    return False, response.json()
-                except:
-                    return False, {}
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent / "backend"
+API_BASE = os.environ.get("ACTIFY_API_BASE", "http://localhost:8001/api")
+PASSWORD = "itest-password-123"
+PHOTO = ("proof.jpg", b"\xff\xd8\xff\xe0" + bytes(512), "image/jpeg")
+
+# p95 regressions below this many milliseconds are noise, not failures
+MIN_REGRESSION_MS = 5.0
+# Per-IP budget for in-process runs, where every request comes from one client address
+IN_PROCESS_RATE_LIMIT = "100000/1"
+
+
+class CheckFailed(Exception):
+    pass
+
+
+class ScenarioSkipped(Exception):
+    pass
+
+
+def check(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+class Harness:
+    def __init__(self, client: httpx.AsyncClient, run_id: str):
+        self.client = client
+        self.run_id = run_id
+        self.timings = defaultdict(list)
+
+    async def call(self, method, template, *path_args, expected=200, **kwargs):
+        """Request ``template`` (``{}`` placeholders filled from ``path_args``); timings are keyed by template."""
+        endpoint = f"{method} {template}"
+        started = time.perf_counter()
+        response = await self.client.request(method, template.format(*path_args), **kwargs)
+        self.timings[endpoint].append((time.perf_counter() - started) * 1000)
+        if response.status_code != expected:
+            raise CheckFailed(f"{endpoint}: expected {expected}, got {response.status_code}: {response.text[:200]}")
+        return response.json() if response.content else None
+
+    # --- Fixtures ---------------------------------------------------------
+
+    async def user(self, label):
+        username = f"itest_{self.run_id}_{label}_{uuid.uuid4().hex[:6]}"
+        return await self.call("POST", "/users", json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": PASSWORD,
+            "full_name": f"Itest {label.title()}",
+        })
+
+    async def group(self, admin, members=()):
+        group = await self.call("POST", "/groups", data={
+            "name": f"itest {self.run_id}", "description": "Integration harness group", "user_id": admin["id"]
+        })
+        for member in members:
+            await self.call("POST", "/groups/join-by-code", data={
+                "invite_code": group["invite_code"].lower(), "user_id": member["id"]
+            })
+        return group
+
+
+# --- Scenarios -------------------------------------------------------------
+
+async def scenario_auth(h: Harness):
+    user = await h.user("auth")
+    login = await h.call("POST", "/login", json={"username": user["username"], "password": PASSWORD})
+    check(login["user"]["id"] == user["id"], "login returned a different user")
+    await h.call("POST", "/login", json={"username": user["username"], "password": "wrong"}, expected=401)
+    await h.call("POST", "/users", expected=400, json={
+        "username": user["username"], "email": user["email"], "password": PASSWORD, "full_name": "Dup"
+    })
+    fetched = await h.call("GET", "/users/{}", user["id"])
+    check(fetched["username"] == user["username"], "GET /users/{id} returned a different user")
+    await h.call("GET", "/users/{}", str(uuid.uuid4()), expected=404)
+
+
+async def scenario_groups(h: Harness):
+    admin, first, second = await asyncio.gather(h.user("admin"), h.user("member"), h.user("member"))
+    group = await h.group(admin, [first])
+    await h.call("POST", "/groups/{}/join-by-code", group["id"], data={
+        "invite_code": group["invite_code"], "user_id": second["id"]
+    })
+    await h.call("POST", "/groups/join-by-code", expected=400, data={
+        "invite_code": group["invite_code"], "user_id": first["id"]
+    })
+    await h.call("POST", "/groups/join-by-code", expected=404, data={"invite_code": "NOPE00", "user_id": first["id"]})
+
+    details = await h.call("GET", "/groups/{}", group["id"])
+    check(details["member_count"] == 3, f"member_count {details['member_count']} != 3")
+    check(set(details["members"]) == {admin["id"], first["id"], second["id"]}, "members don't match joins")
+    user_groups = await h.call("GET", "/users/{}/groups", second["id"])
+    check(any(g["id"] == group["id"] for g in user_groups), "joined group missing from user's groups")
+    rankings = await h.call("GET", "/groups/{}/weekly-rankings", group["id"])
+    check(len(rankings["rankings"]) == 3, "rankings don't list every member")
+
+
+async def scenario_weekly_cycle(h: Harness):
+    admin, first, second = await asyncio.gather(h.user("admin"), h.user("member"), h.user("member"))
+    members = [admin, first, second]
+    group = await h.group(admin, [first, second])
+    gid = group["id"]
+
+    today = datetime.utcnow().strftime("%A")
+    await h.call("POST", "/groups/{}/set-submission-day", gid, data={"submission_day": today, "admin_id": admin["id"]})
+    await h.call("POST", "/groups/{}/start-weekly-submissions", gid, data={"admin_id": first["id"]}, expected=403)
+    await h.call("POST", "/groups/{}/start-weekly-submissions", gid, data={"admin_id": admin["id"]})
+    for order in range(7):
+        await h.call("POST", "/groups/{}/submit-activity", gid, data={
+            "activity_title": f"Activity {order + 1}",
+            "activity_description": "Harness activity",
+            "user_id": members[order % 3]["id"],
+        })
+    await h.call("POST", "/groups/{}/submit-activity", gid, expected=400, data={
+        "activity_title": "Extra", "activity_description": "One too many", "user_id": admin["id"]
+    })
+    activities = await h.call("GET", "/groups/{}/weekly-activities", gid)
+    check(len(activities) == 7, f"{len(activities)} weekly activities, expected 7")
+
+    revealed = await h.call("POST", "/groups/{}/reveal-daily-activity", gid, data={"admin_id": admin["id"], "day_number": 1})
+    check(revealed.get("success"), f"reveal failed: {revealed}")
+    current = await h.call("GET", "/groups/{}/current-day-activity", gid)
+    check(current["activity"]["activity_title"] == revealed["revealed_activity"]["activity_title"],
+          "current-day-activity doesn't match the reveal")
+
+    locked = await h.call("GET", "/groups/{}/daily-activity-feed", gid, params={"user_id": first["id"]})
+    check(locked["status"] == "locked", f"group feed status {locked['status']} before completing, expected locked")
+    earned = []
+    for member in (first, second):
+        completion = await h.call("POST", "/groups/{}/complete-daily-activity", gid,
+                                  data={"user_id": member["id"], "description": "Done"}, files={"photo": PHOTO})
+        earned.append(completion["points_earned"])
+    check(earned == [3, 2], f"points {earned}, expected [3, 2]")
+    await h.call("POST", "/groups/{}/complete-daily-activity", gid, expected=400,
+                 data={"user_id": first["id"], "description": "Again"})
+
+    feed = await h.call("GET", "/groups/{}/daily-activity-feed", gid, params={"user_id": first["id"]})
+    check(len(feed.get("completions", [])) == 2, "group feed doesn't show both completions")
+    rankings = await h.call("GET", "/groups/{}/weekly-rankings", gid)
+    check(rankings["rankings"][0]["user_id"] == first["id"], "first finisher isn't ranked first")
+    await h.call("GET", "/groups/{}/weekly-rankings/history", gid)
+
+
+async def scenario_daily_global_activity(h: Harness):
+    user = await h.user("global")
+    activity = await h.call("GET", "/daily-global-activity/current")
+    if not activity.get("id"):
+        raise ScenarioSkipped("no daily global activity (activity dataset empty)")
+
+    locked = await h.call("GET", "/daily-global-activity/feed", params={"user_id": user["id"]})
+    check(locked["status"] == "locked", f"feed status {locked['status']} before completing, expected locked")
+    completed = await h.call("POST", "/daily-global-activity/complete",
+                             data={"user_id": user["id"], "description": "Harness completion"}, files={"photo": PHOTO})
+    check(completed["completion"]["activity_id"] == activity["id"], "completion for a different activity")
+    await h.call("POST", "/daily-global-activity/complete", expected=400,
+                 data={"user_id": user["id"], "description": "Again"})
+    unlocked = await h.call("GET", "/daily-global-activity/feed", params={"user_id": user["id"], "friends_only": "false"})
+    check(unlocked["status"] == "unlocked", "feed still locked after completing")
 
+
+async def scenario_social(h: Harness):
+    follower, followed = await asyncio.gather(h.user("follower"), h.user("followed"))
+    await h.call("POST", "/users/{}/follow", followed["id"], data={"follower_id": follower["id"]})
+    await h.call("POST", "/users/{}/follow", followed["id"], data={"follower_id": follower["id"]}, expected=400)
+    await h.call("POST", "/users/{}/follow", follower["id"], data={"follower_id": follower["id"]}, expected=400)
+
+    status = await h.call("GET", "/users/{}/follow-status/{}", follower["id"], followed["id"])
+    check(status.get("is_following"), f"follow-status {status}")
+    following = await h.call("GET", "/users/{}/following", follower["id"])
+    check(any(u["id"] == followed["id"] for u in following), "followed user not listed")
+    await h.call("GET", "/users/{}/followers", followed["id"])
+    notifications = await h.call("GET", "/notifications/{}", followed["id"])
+    check(any(n["type"] == "new_follower" for n in notifications), "no new_follower notification")
+
+    results = await h.call("GET", "/users/search", params={"q": followed["username"][:12], "user_id": follower["id"]})
+    check(any(u["id"] == followed["id"] for u in results), "search doesn't find the user by prefix")
+    await h.call("POST", "/users/{}/unfollow", followed["id"], data={"follower_id": follower["id"]})
+
+
+async def scenario_submissions(h: Harness):
+    author, member = await asyncio.gather(h.user("author"), h.user("member"))
+    group = await h.group(author, [member])
+    submission = await h.call("POST", "/submissions", data={
+        "group_id": group["id"], "challenge_type": "photo", "description": "Harness post", "user_id": author["id"]
+    }, files={"photo": PHOTO})
+    outsider = await h.user("outsider")
+    await h.call("POST", "/submissions", expected=403, data={
+        "group_id": group["id"], "challenge_type": "photo", "description": "Not mine", "user_id": outsider["id"]
+    })
+
+    group_posts = await h.call("GET", "/groups/{}/submissions", group["id"])
+    check([s["id"] for s in group_posts] == [submission["id"]], "group submissions don't match")
+    feed = await h.call("GET", "/submissions/feed", params={"user_id": member["id"]})
+    check(any(s["id"] == submission["id"] for s in feed), "submission missing from member's feed")
+    notifications = await h.call("GET", "/notifications/{}", member["id"])
+    check(any(n["type"] == "new_activity" for n in notifications), "member wasn't notified of the post")
+    await h.call("GET", "/rankings/weekly")
+    await h.call("GET", "/rankings/alltime")
+
+
+async def scenario_global_challenge(h: Harness):
+    current = await h.call("GET", "/global-challenges/current")
+    if not current.get("challenge"):
+        raise ScenarioSkipped("no active global challenge")
+    challenge_id = current["challenge"]["id"]
+
+    author, voter, lurker = await asyncio.gather(h.user("author"), h.user("voter"), h.user("lurker"))
+    locked = await h.call("GET", "/global-feed", params={"user_id": lurker["id"]})
+    check(locked["status"] == "locked", "feed unlocked without submitting")
+
+    submissions = []
+    for user in (author, voter):
+        submissions.append(await h.call("POST", "/global-submissions", data={
+            "challenge_id": challenge_id, "description": "Harness entry", "user_id": user["id"]
+        }, files={"photo": PHOTO}))
+    feed = await h.call("GET", "/global-feed", params={"user_id": author["id"]})
+    check(feed["status"] == "unlocked", "feed still locked after submitting")
+    check(any(s["id"] == submissions[0]["id"] for s in feed["submissions"]), "own submission missing from the feed")
+
+    target = submissions[0]["id"]
+    await h.call("POST", "/global-submissions/{}/vote", target, data={"user_id": author["id"]}, expected=400)
+    voted = await h.call("POST", "/global-submissions/{}/vote", target, data={"user_id": voter["id"]})
+    check(voted["voted"] and voted["votes"] == 1, f"vote {voted}")
+    unvoted = await h.call("POST", "/global-submissions/{}/vote", target, data={"user_id": voter["id"]})
+    check(not unvoted["voted"] and unvoted["votes"] == 0, f"unvote {unvoted}")
+    await h.call("POST", "/global-submissions/{}/comment", target, data={"comment": "Nice", "user_id": voter["id"]})
+
+
+SCENARIOS = {
+    "auth": scenario_auth,
+    "groups": scenario_groups,
+    "weekly_cycle": scenario_weekly_cycle,
+    "daily_global_activity": scenario_daily_global_activity,
+    "social": scenario_social,
+    "submissions": scenario_submissions,
+    "global_challenge": scenario_global_challenge,
+}
+
+
+# --- Runner ----------------------------------------------------------------
+
+async def run_scenario(h, name, semaphore):
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            await SCENARIOS[name](h)
+            outcome, detail = "passed", None
+        except ScenarioSkipped as e:
+            outcome, detail = "skipped", str(e)
+        except CheckFailed as e:
+            outcome, detail = "failed", str(e)
         except Exception as e:
-            print(f"❌ Failed - Error: {str(e)}")
-            return False, {}
-
-    def test_login(self, username, password):
-        """Test login functionality"""
-        success, response = self.run_test(
-            "Login",
-            "POST",
-            "login",
-            200,
-            data={"username": username, "password": password}
-        )
-        
-        if success and 'user' in response:
-            self.user_id = response['user']['id']
-            print(f"Logged in as user: {response['user']['username']} (ID: {self.user_id})")
-            return True
-        return False
-
-    def test_get_user_groups(self):
-        """Test getting user's groups"""
-        success, response = self.run_test(
-            "Get User Groups",
-            "GET",
-            f"users/{self.test_user_id}/groups",
-            200
-        )
-        
-        if success:
-            print(f"Found {len(response)} groups for user")
-            if len(response) > 0:
-                print(f"First group: {response[0]['name']} (ID: {response[0]['id']})")
-                # Check if our test group is in the list
-                test_group = next((g for g in response if g['id'] == self.test_group_id), None)
-                if test_group:
-                    print(f"Found test group: {test_group['name']} (ID: {test_group['id']})")
-                    print(f"Group status: {test_group['activities_submitted_this_week']}/7 activities submitted")
-                    print(f"Submission phase active: {test_group['submission_phase_active']}")
-                    return True
-                else:
-                    print("Test group not found in user's groups")
-            return len(response) > 0
-        return False
-
-    def test_get_group_details(self):
-        """Test getting group details"""
-        success, response = self.run_test(
-            "Get Group Details",
-            "GET",
-            f"groups/{self.test_group_id}",
-            200
-        )
-        
-        if success:
-            print(f"Group name: {response['name']}")
-            print(f"Member count: {response['member_count']}/{response['max_members']}")
-            print(f"Activities submitted: {response['activities_submitted_this_week']}/7")
-            print(f"Submission phase active: {response['submission_phase_active']}")
-            return True
-        return False
-
-    def test_get_weekly_activities(self):
-        """Test getting weekly activities for a group"""
-        success, response = self.run_test(
-            "Get Weekly Activities",
-            "GET",
-            f"groups/{self.test_group_id}/weekly-activities",
-            200
-        )
-        
-        if success:
-            print(f"Found {len(response)} weekly activities")
-            if len(response) > 0:
-                for idx, activity in enumerate(response):
-                    print(f"Activity {idx+1}: {activity['activity_title']}")
-                    print(f"  Revealed: {activity['is_revealed']}")
-            return True
-        return False
-
-    def test_get_current_day_activity(self):
-        """Test getting current day's activity"""
-        success, response = self.run_test(
-            "Get Current Day Activity",
-            "GET",
-            f"groups/{self.test_group_id}/current-day-activity",
-            200
-        )
-        
-        if success:
-            if response.get('activity'):
-                print(f"Current day activity: {response['activity'].get('activity_title', 'No title')}")
-                print(f"Description: {response['activity'].get('activity_description', 'No description')}")
-                print(f"Revealed at: {response['activity'].get('revealed_at', 'Unknown')}")
-                return True
-            else:
-                print("No current day activity found")
-                return False
-        return False
-
-    def test_reveal_daily_activity(self):
-        """Test revealing daily activity (admin function)"""
-        form_data = {
-            'admin_id': self.test_user_id,
-            'day_number': 2  # Reveal day 2 activity
-        }
-        
-        success, response = self.run_test(
-            "Reveal Daily Activity",
-            "POST",
-            f"groups/{self.test_group_id}/reveal-daily-activity",
-            200,
-            form_data=form_data
-        )
-        
-        if success:
-            print(f"Response: {response}")
-            if response.get('success'):
-                print(f"Revealed activity: {response['revealed_activity']['activity_title']}")
-                print(f"Day number: {response['day_number']}")
-                return True
-            else:
-                print(f"Failed to reveal activity: {response.get('message', 'Unknown error')}")
-                return False
-        return False
-
-    def test_weekly_rankings(self):
-        """Test getting weekly rankings"""
-        success, response = self.run_test(
-            "Get Weekly Rankings",
-            "GET",
-            f"groups/{self.test_group_id}/weekly-rankings",
-            200
-        )
-        
-        if success:
-            if 'rankings' in response:
-                print(f"Found {len(response['rankings'])} members in rankings")
-                for idx, member in enumerate(response['rankings']):
-                    print(f"Rank {idx+1}: {member.get('username', 'Unknown')} - {member.get('points', 0)} points")
-                return True
-            else:
-                print("No rankings found in response")
-                return False
-        return False
-
-    def test_get_daily_global_activity(self):
-        """Test getting today's global activity"""
-        success, response = self.run_test(
-            "Get Today's Global Activity",
-            "GET",
-            "daily-global-activity/current",
-            200
-        )
-        
-        if success:
-            print(f"Global activity title: {response.get('activity_title', 'No title')}")
-            print(f"Global activity description: {response.get('activity_description', 'No description')}")
-            print(f"Participant count: {response.get('participant_count', 0)}")
-            return True
-        return False
-
-    def test_complete_global_activity(self):
-        """Test completing a global activity"""
-        form_data = {
-            'user_id': self.test_user_id,
-            'description': "I completed today's global activity!"
+            outcome, detail = "failed", "".join(traceback.format_exception_only(type(e), e)).strip()
+        return {"scenario": name, "outcome": outcome, "detail": detail,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def endpoint_stats(timings):
+    stats = {}
+    for endpoint, latencies in sorted(timings.items()):
+        latencies = sorted(latencies)
+        stats[endpoint] = {
+            "requests": len(latencies),
+            "p50_ms": round(latencies[len(latencies) // 2], 2),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+            "max_ms": round(latencies[-1], 2),
         }
-        
-        success, response = self.run_test(
-            "Complete Global Activity",
-            "POST",
-            "daily-global-activity/complete",
-            200,
-            form_data=form_data
-        )
-        
-        if success:
-            print(f"Response: {response}")
-            if response.get('success'):
-                print("Successfully completed global activity")
-                return True
-            else:
-                print(f"Failed to complete activity: {response.get('message', 'Unknown error')}")
-                return False
-        return False
-
-    def test_get_global_activity_feed(self):
-        """Test getting global activity feed"""
-        success, response = self.run_test(
-            "Get Global Activity Feed",
-            "GET",
-            f"daily-global-activity/feed?user_id={self.test_user_id}&friends_only=true",
-            200
-        )
-        
-        if success:
-            print(f"Feed status: {response.get('status', 'Unknown')}")
-            print(f"Friends count: {response.get('friends_count', 0)}")
-            
-            if 'completions' in response:
-                print(f"Found {len(response['completions'])} completions in feed")
-                for idx, completion in enumerate(response['completions']):
-                    print(f"Completion {idx+1}: by {completion.get('username', 'Unknown')}")
-            else:
-                print("No completions found in feed")
-            
-            return True
-        return False
-
-    def test_get_group_daily_activity_feed(self):
-        """Test getting group daily activity feed"""
-        success, response = self.run_test(
-            "Get Group Daily Activity Feed",
-            "GET",
-            f"groups/{self.test_group_id}/daily-activity-feed?user_id={self.test_user_id}",
-            200
-        )
-        
-        if success:
-            print(f"Feed status: {response.get('status', 'Unknown')}")
-            
-            if response.get('activity'):
-                print(f"Activity title: {response['activity'].get('activity_title', 'No title')}")
-                print(f"Members completed: {response.get('members_completed', 0)}")
-            
-            if 'completions' in response:
-                print(f"Found {len(response['completions'])} completions in feed")
-            
-            return True
-        return False
-
-def main():
-    # Get the backend URL from environment variable
-    backend_url = "https://333114a3-9b04-4aaa-a7b1-93d53ba2d24b.preview.emergentagent.com/api"
-    
-    # Setup tester
-    tester = ActifyAPITester(backend_url)
-    
-    # Run tests
-    print("\n🚀 Starting ACTIFY API Tests...\n")
-    
-    # Test login
-    if not tester.test_login("testuser", "password123"):
-        print("❌ Login failed, stopping tests")
-        return 1
-    
-    # Test Global Activity APIs
-    print("\n🌍 Testing Global Activity APIs...\n")
-    tester.test_get_daily_global_activity()
-    tester.test_get_global_activity_feed()
-    tester.test_complete_global_activity()
-    tester.test_get_global_activity_feed()  # Test again after completion
-    
-    # Test Group Activity APIs
-    print("\n👥 Testing Group Activity APIs...\n")
-    tester.test_get_group_daily_activity_feed()
-    
-    # Test existing Weekly Challenge Group APIs
-    print("\n🏆 Testing Weekly Challenge Group APIs...\n")
-    tester.test_get_user_groups()
-    tester.test_get_group_details()
-    tester.test_get_weekly_activities()
-    tester.test_get_current_day_activity()
-    tester.test_weekly_rankings()
-    
-    # Print results
-    print(f"\n📊 Tests passed: {tester.tests_passed}/{tester.tests_run}")
-    return 0 if tester.tests_passed == tester.tests_run else 1
+    return stats
+
+
+def regressions(stats, baseline, max_slowdown):
+    found = []
+    for endpoint, current in stats.items():
+        previous = baseline.get(endpoint)
+        if not previous:
+            continue
+        limit = max(previous["p95_ms"] * max_slowdown, previous["p95_ms"] + MIN_REGRESSION_MS)
+        if current["p95_ms"] > limit:
+            found.append(f"{endpoint}: p95 {current['p95_ms']:.1f}ms vs baseline {previous['p95_ms']:.1f}ms")
+    return found
+
+
+async def wait_until_ready(client, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit(f"API not ready after {timeout:.0f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent ACTIFY API integration harness")
+    parser.add_argument("--base-url", default=API_BASE)
+    parser.add_argument("--in-process", action="store_true", help="Run the app in-process via the ASGI transport")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenario names")
+    parser.add_argument("--repeat", type=int, default=1, help="Concurrent copies of each scenario")
+    parser.add_argument("--concurrency", type=int, default=20, help="Scenarios running at once")
+    parser.add_argument("--ready-timeout", type=float, default=60)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Previous JSON report; p95 regressions fail the run")
+    parser.add_argument("--max-slowdown", type=float, default=1.5, help="Allowed p95 ratio vs the baseline")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    app = None
+    if args.in_process:
+        sys.path.insert(0, str(BACKEND_DIR))
+        for route in ("users", "login", "vote", "comment"):
+            os.environ.setdefault(f"RATE_LIMIT_{route.upper()}", IN_PROCESS_RATE_LIMIT)
+        import server  # noqa: E402  (loads backend/.env)
+        app = server.app
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://actify.test/api",
+                                   timeout=30)
+    else:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30)
+
+    print("🚀 ACTIFY API INTEGRATION HARNESS")
+    print("=" * 50)
+    started = time.perf_counter()
+    try:
+        await wait_until_ready(client, args.ready_timeout)
+        h = Harness(client, uuid.uuid4().hex[:8])
+        semaphore = asyncio.Semaphore(args.concurrency)
+        results = await asyncio.gather(*(
+            run_scenario(h, name, semaphore) for name in selected for _ in range(args.repeat)
+        ))
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+    elapsed = time.perf_counter() - started
+
+    icons = {"passed": "✅", "failed": "❌", "skipped": "⏭️ "}
+    for result in results:
+        line = f"{icons[result['outcome']]} {result['scenario']:<24}{result['duration_ms']:>9.0f}ms"
+        print(line + (f"  {result['detail']}" if result["detail"] else ""))
+
+    stats = endpoint_stats(h.timings)
+    print(f"\n📊 Endpoint latency ({sum(s['requests'] for s in stats.values())} requests in {elapsed:.1f}s)")
+    print(f"   {'endpoint':<58}{'req':>6}{'p50':>9}{'p95':>9}{'max':>9}")
+    for endpoint, s in stats.items():
+        print(f"   {endpoint:<58}{s['requests']:>6}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['max_ms']:>9.1f}")
+
+    failed = [result for result in results if result["outcome"] == "failed"]
+    slow = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            slow = regressions(stats, json.load(f)["endpoints"], args.max_slowdown)
+        for line in slow:
+            print(f"🐢 {line}")
+
+    passed = sum(1 for result in results if result["outcome"] == "passed")
+    print(f"\n📋 Scenarios passed: {passed}/{len(results)}"
+          f" ({len(results) - passed - len(failed)} skipped), latency regressions: {len(slow)}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"finished_at": datetime.utcnow().isoformat(), "scenarios": results, "endpoints": stats,
+                       "regressions": slow}, f, indent=2)
+    return 1 if failed or slow else 0
+
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(asyncio.run(main()))
@@ -4,25 +4,58 @@ set -e
 # Start the FastAPI backend
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
-echo "Starting FastAPI backend"
-# Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
-BACKEND_PID=$!
-
-echo "Waiting for backend to start..."
-sleep 30
+# production: gunicorn with one uvicorn worker per core (see gunicorn.conf.py)
+# development: a single uvicorn process
+SERVER_MODE=${SERVER_MODE:-production}
+# nginx in front sets X-Real-IP; key rate limits on it rather than on 127.0.0.1
+export RATE_LIMIT_TRUST_PROXY=${RATE_LIMIT_TRUST_PROXY:-true}
+READY_TIMEOUT=${READY_TIMEOUT:-120}
 
-if ! kill -0 $BACKEND_PID 2>/dev/null; then
-    echo "Backend failed to start at initialization, exiting"
-    exit 1
+if [ "$SERVER_MODE" = "development" ]; then
+    echo "Starting FastAPI backend (single uvicorn process)"
+    uvicorn server:app --host 0.0.0.0 --port 8001 &
+else
+    # Workers share Prometheus metrics through this directory; clear stale files from a previous run
+    export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/actify-metrics}
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    echo "Starting FastAPI backend (gunicorn, ${WEB_CONCURRENCY:-one worker per core})"
+    gunicorn -c gunicorn.conf.py server:app &
 fi
+BACKEND_PID=$!
+
+# Wait for readiness (Mongo reachable, startup bootstrap done) instead of a fixed sleep
+echo "Waiting for backend to become ready..."
+WAITED=0
+until wget -q -O /dev/null http://127.0.0.1:8001/api/ready 2>/dev/null; do
+    if ! kill -0 $BACKEND_PID 2>/dev/null; then
+        echo "Backend failed to start at initialization, exiting"
+        exit 1
+    fi
+    if [ "$WAITED" -ge "$READY_TIMEOUT" ]; then
+        echo "Backend not ready after ${READY_TIMEOUT}s, exiting"
+        kill $BACKEND_PID
+        exit 1
+    fi
+    sleep 1
+    WAITED=$((WAITED + 1))
+done
+echo "Backend ready after ${WAITED}s"
 
 # Start Nginx
 nginx -g 'daemon off;' &
 NGINX_PID=$!
 
-# Handle termination signals
-trap 'kill $BACKEND_PID $NGINX_PID; exit 0' SIGTERM SIGINT
+# Graceful drain: nginx stops accepting and finishes in-flight requests, then the
+# backend gets SIGTERM and its workers finish theirs (bounded by GRACEFUL_TIMEOUT)
+shutdown() {
+    echo "Draining..."
+    nginx -s quit 2>/dev/null || kill $NGINX_PID 2>/dev/null || true
+    wait $NGINX_PID 2>/dev/null || true
+    kill -TERM $BACKEND_PID 2>/dev/null || true
+    wait $BACKEND_PID 2>/dev/null || true
+    exit 0
+}
+trap shutdown TERM INT
 
 # Check if processes are still running
 while kill -0 $BACKEND_PID 2>/dev/null && kill -0 $NGINX_PID 2>/dev/null; do
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+ACTIFY Password Hashing Benchmark
+Measures login throughput and event-loop responsiveness while logins run,
+comparing scrypt inline on the event loop vs the bounded executor in passwords.py
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import passwords  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+async def probe_latency(stop: asyncio.Event, samples: list, interval: float = 0.005):
+    """Simulates other requests: measures how late a 5ms sleep wakes up"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run_logins(mode: str, stored: str, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            if mode == "inline":
+                assert passwords.verify_password_sync(PASSWORD, stored)
+            else:
+                valid, _ = await passwords.verify_password(PASSWORD, stored)
+                assert valid
+
+    stop = asyncio.Event()
+    samples = []
+    probe = asyncio.create_task(probe_latency(stop, samples))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1] if samples else 0.0
+    print(f"📊 {mode.upper()} ({logins} logins, concurrency {concurrency})")
+    print(f"   🔐 Logins/sec: {logins / elapsed:.1f}")
+    print(f"   ⏱️  Total: {elapsed:.2f}s")
+    print(f"   🐢 Concurrent request delay p50: {statistics.median(samples) if samples else 0:.1f}ms, "
+          f"p99: {p99:.1f}ms, max: {max(samples) if samples else 0:.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark password hashing")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    print("🚀 ACTIFY PASSWORD HASHING BENCHMARK")
+    print("=" * 50)
+    print(f"   scrypt n={passwords.SCRYPT_N} r={passwords.SCRYPT_R} p={passwords.SCRYPT_P}, "
+          f"workers={passwords.MAX_WORKERS}")
+    print()
+
+    stored = passwords.hash_password_sync(PASSWORD)
+    await run_logins("inline", stored, args.logins, args.concurrency)
+    print()
+    await run_logins("executor", stored, args.logins, args.concurrency)
+
+    passwords.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
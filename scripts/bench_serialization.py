@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+ACTIFY Response Serialization Benchmark
+Measures the cost of turning one 50-item feed page of Mongo documents into a
+response body: the legacy path (build models, FastAPI response validation,
+json.dumps), model_construct with pydantic's JSON serializer, and the
+serialization.model_response fast path (trim to model fields, orjson).
+Also times jsonable_encoder + json.dumps against orjson for the dict
+endpoints that used to hand-convert datetimes.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "actify_bench")
+
+from bson import ObjectId  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+import serialization  # noqa: E402
+from server import GlobalSubmission, SubmissionResponse  # noqa: E402
+
+
+def global_submission(rng: random.Random, photo_bytes: int) -> dict:
+    created_at = datetime.utcnow() - timedelta(minutes=rng.randint(0, 1440))
+    return {
+        "_id": ObjectId(),
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "username": f"user{rng.randint(1, 10 ** 6)}",
+        "challenge_id": str(uuid.uuid4()),
+        "challenge_prompt": "Show us your view right now",
+        "description": "Sunset from the office window",
+        "photo_data": "A" * photo_bytes if photo_bytes else None,
+        "created_at": created_at,
+        "votes": rng.randint(0, 500),
+        "comments": [
+            {"id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()), "username": f"user{i}",
+             "comment": "Love this!", "created_at": created_at + timedelta(minutes=i)}
+            for i in range(rng.randint(0, 8))
+        ],
+        "reactions": {"🔥": rng.randint(0, 50), "💪": rng.randint(0, 50)},
+    }
+
+
+def group_submission(rng: random.Random, photo_bytes: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "username": f"user{rng.randint(1, 10 ** 6)}",
+        "group_id": str(uuid.uuid4()),
+        "challenge_type": "photo",
+        "description": "Morning run done",
+        "photo_data": "A" * photo_bytes if photo_bytes else None,
+        "created_at": datetime.utcnow() - timedelta(minutes=rng.randint(0, 1440)),
+        "votes": rng.randint(0, 50),
+        "reactions": {},
+    }
+
+
+def legacy(model, docs):
+    """[Model(**doc)] in the handler, then what FastAPI does with a response_model."""
+    adapter = TypeAdapter(List[model])
+    models = [model(**doc) for doc in docs]
+    content = [item.model_dump() for item in models]
+    validated = adapter.validate_python(content)
+    return json.dumps(adapter.dump_python(validated, mode="json"), ensure_ascii=False).encode("utf-8")
+
+
+def constructed(model, docs):
+    adapter = TypeAdapter(List[model])
+    return adapter.dump_json([model.model_construct(**doc) for doc in docs])
+
+
+def fast(model, docs):
+    return serialization.model_response(model, docs).body
+
+
+def dict_legacy(docs):
+    return json.dumps(jsonable_encoder([{k: v for k, v in doc.items() if k != "_id"} for doc in docs]),
+                      ensure_ascii=False).encode("utf-8")
+
+
+def dict_fast(docs):
+    return serialization.dumps([{k: v for k, v in doc.items() if k != "_id"} for doc in docs])
+
+
+def bench(label, run, iterations, baseline=None):
+    run()  # warm caches (TypeAdapter schemas, field tables)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        body = run()
+    per_page_us = (time.perf_counter() - start) / iterations * 1_000_000
+    speedup = f"  ({baseline / per_page_us:.1f}x)" if baseline else ""
+    print(f"   {label:<34}{per_page_us:>10.0f} µs/page  {len(body):>8} bytes{speedup}")
+    return per_page_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization paths")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--photo-bytes", type=int, default=0,
+                        help="Inline base64 photo size per item (0 = no photo)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print("🚀 ACTIFY SERIALIZATION BENCHMARK")
+    print("=" * 50)
+    for model, make in ((GlobalSubmission, global_submission), (SubmissionResponse, group_submission)):
+        docs = [make(rng, args.photo_bytes) for _ in range(args.page_size)]
+        print(f"\n📊 {model.__name__} x {args.page_size}")
+        base = bench("models + response_model + json", lambda: legacy(model, docs), args.iterations)
+        bench("model_construct + dump_json", lambda: constructed(model, docs), args.iterations, base)
+        bench("serialization.model_response", lambda: fast(model, docs), args.iterations, base)
+        if model is GlobalSubmission:
+            print(f"\n📊 dict endpoint x {args.page_size}")
+            base = bench("jsonable_encoder + json.dumps", lambda: dict_legacy(docs), args.iterations)
+            bench("orjson (serialization.dumps)", lambda: dict_fast(docs), args.iterations, base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+ACTIFY Transfer Size Benchmark
+Fetches the feed and leaderboard endpoints through two front ends and
+compares what actually crosses the wire: "before" is the backend as the old
+nginx passed it through (uvicorn directly, uncompressed) and "after" is the
+tuned nginx (gzip, pooled upstream keepalive). Both are requested with a
+gzip Accept-Encoding, so the byte counts are what a client downloads.
+
+Feeds are per-user; without --user-id a user who posted to the active global
+challenge is sampled from the database in backend/.env so the global feed is
+unlocked and carries photos.
+
+Requires httpx (and motor when sampling a user).
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+ENDPOINTS = [
+    ("global_feed", "/global-feed", True),
+    ("submissions_feed", "/submissions/feed", True),
+    ("daily_global_feed", "/daily-global-activity/feed", True),
+    ("rankings_weekly", "/rankings/weekly", False),
+    ("rankings_alltime", "/rankings/alltime", False),
+]
+
+
+async def sample_user() -> str:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(BACKEND_DIR / ".env")
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    try:
+        db = client[os.environ["DB_NAME"]]
+        challenge = await db.global_challenges.find_one({"is_active": True}, sort=[("created_at", -1)])
+        match = {"challenge_id": challenge["id"]} if challenge else {}
+        found = await db.global_submissions.aggregate([
+            {"$match": match}, {"$sample": {"size": 1}}, {"$project": {"_id": 0, "user_id": 1}}
+        ]).to_list(length=1)
+    finally:
+        client.close()
+    if not found:
+        raise SystemExit("❌ No global submissions to sample a user from; pass --user-id")
+    return found[0]["user_id"]
+
+
+async def fetch(client: httpx.AsyncClient, url: str, params: dict) -> dict:
+    start = time.perf_counter()
+    async with client.stream("GET", url, params=params) as response:
+        # Raw chunks are the bytes as sent, before httpx undoes Content-Encoding
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        response.raise_for_status()
+        encoding = response.headers.get("content-encoding", "identity")
+    body = gzip.decompress(raw) if encoding == "gzip" else raw
+    return {"wire": len(raw), "json": len(body), "encoding": encoding, "ms": elapsed_ms}
+
+
+async def measure(client: httpx.AsyncClient, base_url: str, path: str, params: dict, repeat: int) -> dict:
+    runs = [await fetch(client, base_url + path, params) for _ in range(repeat)]
+    return {
+        "wire_bytes": runs[-1]["wire"],
+        "json_bytes": runs[-1]["json"],
+        "encoding": runs[-1]["encoding"],
+        "median_ms": statistics.median(run["ms"] for run in runs),
+    }
+
+
+def human(size: int) -> str:
+    return f"{size / 1024:.1f} KB" if size >= 1024 else f"{size} B"
+
+
+async def run(args) -> dict:
+    user_id = args.user_id or await sample_user()
+    print(f"   👤 Fetching feeds as user {user_id}")
+    headers = {"Accept-Encoding": "gzip"}
+    results = {}
+    async with httpx.AsyncClient(headers=headers, timeout=args.timeout) as client:
+        for name, path, per_user in ENDPOINTS:
+            params = {"user_id": user_id} if per_user else {}
+            try:
+                before = await measure(client, args.before, path, params, args.repeat)
+                after = await measure(client, args.after, path, params, args.repeat)
+            except httpx.HTTPError as exc:
+                print(f"   ⚠️  {name}: {exc}")
+                continue
+            results[name] = {"before": before, "after": after}
+    return results
+
+
+def report(results: dict):
+    print(f"\n   {'endpoint':<20}{'json':>12}{'before':>12}{'after':>12}{'saved':>8}{'before ms':>11}{'after ms':>10}  encoding")
+    total_before = total_after = 0
+    for name, result in results.items():
+        before, after = result["before"], result["after"]
+        total_before += before["wire_bytes"]
+        total_after += after["wire_bytes"]
+        saved = 1 - after["wire_bytes"] / before["wire_bytes"] if before["wire_bytes"] else 0
+        print(f"   {name:<20}{human(after['json_bytes']):>12}{human(before['wire_bytes']):>12}{human(after['wire_bytes']):>12}{saved:>8.0%}"
+              f"{before['median_ms']:>11.1f}{after['median_ms']:>10.1f}  {after['encoding']}")
+    if total_before:
+        print(f"\n   📦 Total: {human(total_before)} → {human(total_after)} "
+              f"({1 - total_after / total_before:.0%} less on the wire)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare feed transfer sizes before and after the nginx tuning")
+    parser.add_argument("--before", default="http://localhost:8001/api",
+                        help="API base without compression (uvicorn directly)")
+    parser.add_argument("--after", default="http://localhost:8080/api",
+                        help="API base through the tuned nginx")
+    parser.add_argument("--user-id", help="Fetch feeds as this user (default: sample one from the database)")
+    parser.add_argument("--repeat", type=int, default=5, help="Requests per endpoint and front end")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    print("🚀 ACTIFY TRANSFER SIZE BENCHMARK")
+    print("=" * 50)
+    results = asyncio.run(run(args))
+    if not results:
+        sys.exit("❌ No endpoint could be fetched")
+    report(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"   💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+ACTIFY User Search Benchmark
+Seeds a synthetic users collection (default 1M users) into a separate database
+and measures typeahead query latency for the indexed prefix search vs the old
+unanchored case-insensitive regex
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+import user_search  # noqa: E402
+
+FIRST_NAMES = ["james", "mary", "john", "patricia", "robert", "jennifer", "michael", "linda", "william",
+               "elizabeth", "david", "barbara", "richard", "susan", "joseph", "jessica", "thomas", "sarah",
+               "charles", "karen", "sofia", "mateo", "amara", "kenji", "priya", "lucas", "chloe", "omar"]
+LAST_NAMES = ["smith", "johnson", "williams", "brown", "jones", "garcia", "miller", "davis", "rodriguez",
+              "martinez", "hernandez", "lopez", "gonzalez", "wilson", "anderson", "thomas", "taylor",
+              "moore", "jackson", "martin", "lee", "perez", "thompson", "white", "harris", "clark"]
+
+
+def synthetic_user(rng: random.Random, i: int) -> dict:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    username = f"{first}{rng.choice(['', '_', '.'])}{last[:rng.randint(1, len(last))]}{i}"
+    full_name = f"{first.title()} {last.title()}"
+    return {
+        "id": str(uuid.uuid4()),
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": "x",
+        "full_name": full_name,
+        **user_search.search_fields(username, full_name),
+        "avatar_color": "#4ECDC4",
+        "groups": [],
+        "achievements": [],
+    }
+
+
+async def seed(collection, count: int, batch_size: int, rng: random.Random):
+    existing = await collection.estimated_document_count()
+    if existing >= count:
+        print(f"   ♻️  Reusing {existing} existing users")
+        return
+    print(f"   🌱 Seeding {count - existing} users...")
+    start = time.perf_counter()
+    for offset in range(existing, count, batch_size):
+        docs = [synthetic_user(rng, i) for i in range(offset, min(offset + batch_size, count))]
+        await collection.insert_many(docs, ordered=False)
+    print(f"   ✅ Seeded in {time.perf_counter() - start:.1f}s")
+
+
+def random_prefix(rng: random.Random) -> str:
+    name = rng.choice(FIRST_NAMES + LAST_NAMES)
+    return name[:rng.randint(2, min(6, len(name)))]
+
+
+async def time_queries(label: str, run, prefixes):
+    latencies = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        await run(prefix)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"📊 {label}: p50 {p50:.2f}ms, p99 {p99:.2f}ms, max {latencies[-1]:.2f}ms ({len(latencies)} queries)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark user search")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.environ.get("BENCH_DB_NAME", "actify_bench"))
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-regex", action="store_true", help="Skip the slow legacy regex baseline")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db]
+
+    print("🚀 ACTIFY USER SEARCH BENCHMARK")
+    print("=" * 50)
+    await seed(db.users, args.users, args.batch_size, rng)
+    await user_search.ensure_indexes(db.users)
+    await db.follows.create_index([("follower_id", 1), ("following_id", 1)])
+    print()
+
+    prefixes = [random_prefix(rng) for _ in range(args.queries)]
+
+    explain = await db.users.find({"username_lower": {"$regex": f"^{prefixes[0]}"}}).limit(10).explain()
+    stage = explain["queryPlanner"]["winningPlan"]
+    while "inputStage" in stage:
+        stage = stage["inputStage"]
+    print(f"🔎 Prefix plan leaf stage: {stage.get('stage')} {stage.get('indexName', '')}")
+
+    await time_queries(
+        "Indexed prefix search",
+        lambda q: user_search.search_users(db.users, db.follows, q),
+        prefixes
+    )
+
+    if not args.skip_regex:
+        async def legacy(q):
+            await db.users.find({"$or": [
+                {"username": {"$regex": q, "$options": "i"}},
+                {"full_name": {"$regex": q, "$options": "i"}}
+            ]}).limit(10).to_list(length=10)
+        await time_queries("Legacy regex search", legacy, prefixes[:20])
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
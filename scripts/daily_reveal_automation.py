@@ -1,144 +1,231 @@
 #!/usr/bin/env python3
 """
 ACTIFY Daily Activity Reveal Automation Script
-Simulates daily reveals for both global and group activities
+Reveals today's global activity and group activities, non-interactively
+
+Examples:
+    # Server-side batch reveal for every eligible group
+    python daily_reveal_automation.py --all-groups
+
+    # Concurrent per-group reveals for specific groups
+    python daily_reveal_automation.py --groups ID1,ID2 --admin-id ADMIN --concurrency 50
+
+    # Groups from a file (one ID per line), JSON summary written to a file
+    python daily_reveal_automation.py --groups-file groups.txt --admin-id ADMIN --output summary.json
 """
 
+import argparse
 import asyncio
-import aiohttp
 import json
-from datetime import datetime, timedelta
-import random
-
-API_BASE = "http://localhost:8001/api"
-ADMIN_USER_ID = "967c04e7-47ae-487d-8226-183d390c7808"
-TEST_GROUP_ID = "e4818c1d-9547-4bb9-8d65-62ab55ef9515"
-
-async def reveal_global_activity():
-    """Simulate global activity reveal (happens automatically)"""
-    print(f"🌍 GLOBAL ACTIVITY REVEAL - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    async with aiohttp.ClientSession() as session:
-        # Get current global activity (auto-generates if needed)
-        async with session.get(f"{API_BASE}/daily-global-activity/current") as response:
-            if response.status == 200:
-                data = await response.json()
-                print(f"   📋 Today's Global Challenge: {data['activity_title']}")
-                print(f"   📝 Description: {data['activity_description']}")
-                print(f"   👥 Participants: {data['participant_count']}")
-                print(f"   ⏰ Selected at: {data['selected_at']}")
-                return True
-            else:
-                print(f"   ❌ Error getting global activity: {response.status}")
-                return False
-
-async def reveal_group_activity(group_id, day_number):
-    """Simulate group activity reveal (admin-triggered)"""
-    print(f"👥 GROUP ACTIVITY REVEAL - Day {day_number}")
-    
-    async with aiohttp.ClientSession() as session:
-        # Prepare form data for reveal
-        form_data = aiohttp.FormData()
-        form_data.add_field('admin_id', ADMIN_USER_ID)
-        form_data.add_field('day_number', str(day_number))
-        
-        async with session.post(f"{API_BASE}/groups/{group_id}/reveal-daily-activity", data=form_data) as response:
-            if response.status == 200:
-                data = await response.json()
-                if data.get('success'):
-                    activity = data['revealed_activity']
-                    print(f"   🎯 Revealed: {activity['activity_title']}")
-                    print(f"   📝 Description: {activity['activity_description']}")
-                    print(f"   📅 Day {activity['day_number']} of 7")
-                    print(f"   ⏰ Revealed at: {activity['revealed_at']}")
-                    return True
-                else:
-                    print(f"   ❌ Reveal failed: {data.get('message', 'Unknown error')}")
-                    return False
-            else:
-                error_data = await response.json()
-                print(f"   ❌ Error revealing activity: {error_data.get('detail', 'Unknown error')}")
-                return False
-
-async def get_group_status(group_id):
-    """Get current group status and next day to reveal"""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f"{API_BASE}/groups/{group_id}/weekly-activities") as response:
-            if response.status == 200:
-                activities = await response.json()
-                revealed_count = sum(1 for activity in activities if activity.get('is_revealed', False))
-                total_activities = len(activities)
-                next_day = revealed_count + 1
-                
-                print(f"📊 GROUP STATUS:")
-                print(f"   📝 Activities Submitted: {total_activities}/7")
-                print(f"   👁️  Activities Revealed: {revealed_count}")
-                print(f"   ➡️  Next Day to Reveal: {next_day}")
-                
-                return next_day if next_day <= 7 and total_activities >= next_day else None
-            return None
-
-async def simulate_daily_reveals():
-    """Simulate the daily reveal process for both global and group activities"""
-    print("🚀 ACTIFY DAILY REVEAL SIMULATION")
-    print("=" * 50)
-    
-    # 1. Reveal Global Activity
-    global_success = await reveal_global_activity()
-    print()
-    
-    # 2. Check Group Status
-    next_day = await get_group_status(TEST_GROUP_ID)
-    print()
-    
-    # 3. Reveal Group Activity (if applicable)
-    if next_day:
-        group_success = await reveal_group_activity(TEST_GROUP_ID, next_day)
+import os
+import sys
+import time
+from datetime import datetime
+
+import aiohttp
+
+API_BASE = os.environ.get("ACTIFY_API_BASE", "http://localhost:8001/api")
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RevealRunner:
+    def __init__(self, session, api_base, concurrency, retries, backoff):
+        self.session = session
+        self.api_base = api_base
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.calls = []
+
+    async def request(self, name, method, path, data=None, group_id=None):
+        """Issue one API call with bounded concurrency and retries on transient failures"""
+        attempts = 0
+        status, body, error = None, None, None
+
+        async with self.semaphore:
+            # Timed from here so latency excludes time spent queued for a slot
+            started = time.perf_counter()
+            while True:
+                attempts += 1
+                try:
+                    form = None
+                    if data is not None:
+                        form = aiohttp.FormData()
+                        for key, value in data.items():
+                            form.add_field(key, str(value))
+                    async with self.session.request(method, f"{self.api_base}{path}", data=form) as response:
+                        status = response.status
+                        body = await response.json(content_type=None)
+                        retry_after = response.headers.get("Retry-After")
+                    error = None
+                    if status not in RETRY_STATUSES:
+                        break
+                    error = f"HTTP {status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError) as e:
+                    status, body, retry_after = None, None, None
+                    error = f"{type(e).__name__}: {e}"
+
+                if attempts > self.retries:
+                    break
+                delay = self.backoff * (2 ** (attempts - 1))
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+                await asyncio.sleep(delay)
+
+        self.calls.append({
+            "name": name,
+            "group_id": group_id,
+            "status": status,
+            "attempts": attempts,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "error": error or (body.get("detail") if isinstance(body, dict) and status and status >= 400 else None),
+        })
+        return status, body
+
+    async def reveal_global_activity(self):
+        """Get today's global activity (auto-generates if needed)"""
+        status, body = await self.request("global_activity", "GET", "/daily-global-activity/current")
+        return body if status == 200 else None
+
+    async def reveal_group(self, group_id, admin_id, day_number=None, dry_run=False):
+        """Reveal the next day's activity for one group (with dry_run, only report which day would be revealed)"""
+        if day_number is None:
+            status, activities = await self.request("weekly_activities", "GET", f"/groups/{group_id}/weekly-activities", group_id=group_id)
+            if status != 200:
+                return {"group_id": group_id, "revealed": False, "reason": "status_unavailable"}
+            revealed = sum(1 for activity in activities if activity.get("is_revealed", False))
+            day_number = revealed + 1
+            if day_number > 7 or len(activities) < day_number:
+                return {"group_id": group_id, "revealed": False, "reason": "nothing_to_reveal"}
+
+        if dry_run:
+            return {"group_id": group_id, "revealed": False, "day_number": day_number, "reason": "dry_run"}
+
+        status, body = await self.request(
+            "reveal", "POST", f"/groups/{group_id}/reveal-daily-activity",
+            data={"admin_id": admin_id, "day_number": day_number}, group_id=group_id
+        )
+        if status == 200 and body.get("success"):
+            return {"group_id": group_id, "revealed": True, "day_number": day_number,
+                    "activity_title": body["revealed_activity"]["activity_title"]}
+        reason = body.get("message") or body.get("detail") if isinstance(body, dict) else None
+        return {"group_id": group_id, "revealed": False, "day_number": day_number, "reason": reason or f"HTTP {status}"}
+
+    async def batch_reveal(self, group_ids=None, dry_run=False):
+        """Server-side batch reveal (all eligible groups when group_ids is None)"""
+        data = {"dry_run": str(dry_run).lower()}
+        if group_ids:
+            data["group_ids"] = ",".join(group_ids)
+        status, body = await self.request("batch_reveal", "POST", "/admin/reveals/batch", data=data)
+        return body if status == 200 else {"success": False, "status": status, "detail": body}
+
+
+def latency_summary(calls):
+    latencies = sorted(call["latency_ms"] for call in calls)
+    if not latencies:
+        return {}
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1],
+    }
+
+
+def load_group_ids(args):
+    group_ids = []
+    if args.groups:
+        group_ids += [group_id.strip() for group_id in args.groups.split(",") if group_id.strip()]
+    if args.groups_file:
+        with open(args.groups_file) as f:
+            group_ids += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return list(dict.fromkeys(group_ids))
+
+
+async def run(args):
+    group_ids = load_group_ids(args)
+    started = time.perf_counter()
+    summary = {"started_at": datetime.utcnow().isoformat(), "api_base": args.api_base}
+
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        runner = RevealRunner(session, args.api_base, args.concurrency, args.retries, args.backoff)
+
+        if not args.skip_global:
+            global_activity = await runner.reveal_global_activity()
+            summary["global_activity"] = {
+                "ok": global_activity is not None,
+                "activity_title": (global_activity or {}).get("activity_title"),
+            }
+
+        if args.all_groups or args.mode == "batch":
+            summary["mode"] = "batch"
+            summary["batch"] = await runner.batch_reveal(group_ids or None, dry_run=args.dry_run)
+        elif group_ids:
+            if not args.admin_id:
+                raise SystemExit("--admin-id is required for per-group reveals")
+            summary["mode"] = "per-group"
+            results = await asyncio.gather(*(
+                runner.reveal_group(group_id, args.admin_id, args.day, dry_run=args.dry_run) for group_id in group_ids
+            ))
+            summary["groups"] = {
+                "requested": len(group_ids),
+                "revealed": sum(1 for result in results if result["revealed"]),
+                "results": results,
+            }
+
+        summary["calls"] = runner.calls if args.verbose else [call for call in runner.calls if call["error"]]
+        summary["latency"] = latency_summary(runner.calls)
+        summary["latency_by_call"] = {
+            name: latency_summary([call for call in runner.calls if call["name"] == name])
+            for name in sorted({call["name"] for call in runner.calls})
+        }
+        summary["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Reveal ACTIFY daily global and group activities")
+    parser.add_argument("--api-base", default=API_BASE)
+    targets = parser.add_argument_group("targets")
+    targets.add_argument("--all-groups", action="store_true", help="Batch reveal every eligible group server-side")
+    targets.add_argument("--groups", help="Comma-separated group IDs")
+    targets.add_argument("--groups-file", help="File with one group ID per line")
+    targets.add_argument("--skip-global", action="store_true", help="Don't touch the daily global activity")
+    parser.add_argument("--mode", choices=["per-group", "batch"], default="per-group",
+                        help="How to reveal explicit --groups (default: concurrent per-group calls)")
+    parser.add_argument("--admin-id", default=os.environ.get("ACTIFY_ADMIN_USER_ID"))
+    parser.add_argument("--day", type=int, default=None, help="Force the day number instead of the next unrevealed day")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be revealed without writing")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=0.5, help="Initial retry backoff in seconds")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="Write the JSON summary to this file instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="Include every call in the summary")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = asyncio.run(run(args))
+
+    output = json.dumps(summary, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
     else:
-        print("👥 GROUP ACTIVITY REVEAL - No activities to reveal")
-        print("   ℹ️  Either all activities revealed or insufficient submissions")
-        group_success = False
-    
-    print()
-    print("📊 REVEAL SUMMARY:")
-    print(f"   🌍 Global Activity: {'✅ Success' if global_success else '❌ Failed'}")
-    print(f"   👥 Group Activity: {'✅ Success' if next_day and group_success else '❌ Not Available'}")
-    
-    return global_success, (group_success if next_day else False)
-
-async def schedule_reveals_for_week():
-    """Simulate reveals for an entire week"""
-    print("📅 SIMULATING WEEK-LONG REVEAL SCHEDULE")
-    print("=" * 50)
-    
-    for day in range(1, 8):  # 7 days
-        print(f"\n🗓️  DAY {day} SIMULATION:")
-        print("-" * 30)
-        
-        # Simulate global activity (happens daily)
-        await reveal_global_activity()
-        print()
-        
-        # Simulate group activity reveal (one per day)
-        await reveal_group_activity(TEST_GROUP_ID, day)
-        
-        # Add delay to simulate real timing
-        await asyncio.sleep(1)
-    
-    print("\n🎉 WEEK SIMULATION COMPLETE!")
+        print(output)
+
+    failed_calls = [call for call in summary["calls"] if call["error"]]
+    return 1 if failed_calls else 0
+
 
 if __name__ == "__main__":
-    print("ACTIFY REVEAL AUTOMATION SCRIPT")
-    print("Choose simulation mode:")
-    print("1. Single Daily Reveal (Today)")
-    print("2. Full Week Simulation")
-    
-    choice = input("Enter choice (1 or 2): ").strip()
-    
-    if choice == "1":
-        asyncio.run(simulate_daily_reveals())
-    elif choice == "2":
-        asyncio.run(schedule_reveals_for_week())
-    else:
-        print("Invalid choice. Running single daily reveal...")
-        asyncio.run(simulate_daily_reveals())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""
+ACTIFY Synthetic Dataset Generator
+Generates a scale-test dataset into a separate database: users, a power-law
+follow graph, groups of 3-7 members partway through a weekly cycle (activity
+submissions, daily reveals, completions, points and archived rankings),
+daily global challenges with submissions, votes and comments, and
+notifications. Documents match the shapes server.py writes.
+
+Output is deterministic for a given --seed, --now and sizing: every batch
+draws from its own RNG, so the worker count doesn't change the data. Batches
+are generated in a process pool and written with unordered insert_many
+calls in parallel.
+
+Indexes are not built here (bulk loads are faster without them): start the
+backend against the database once (DB_NAME=<db>) and its startup bootstrap
+builds them.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+import group_reveals  # noqa: E402
+import user_search  # noqa: E402
+import week_rollover  # noqa: E402
+
+FIRST_NAMES = ["james", "mary", "john", "patricia", "robert", "jennifer", "michael", "linda", "william",
+               "elizabeth", "david", "barbara", "richard", "susan", "joseph", "jessica", "thomas", "sarah",
+               "charles", "karen", "sofia", "mateo", "amara", "kenji", "priya", "lucas", "chloe", "omar"]
+LAST_NAMES = ["smith", "johnson", "williams", "brown", "jones", "garcia", "miller", "davis", "rodriguez",
+              "martinez", "hernandez", "lopez", "gonzalez", "wilson", "anderson", "thomas", "taylor",
+              "moore", "jackson", "martin", "lee", "perez", "thompson", "white", "harris", "clark"]
+AVATAR_COLORS = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FCEA2B", "#FF9F43", "#6C5CE7", "#FD79A8"]
+CATEGORIES = ["fitness", "wellness", "creativity", "social", "learning", "outdoors"]
+CHALLENGE_TYPES = ["photo", "workout", "mindfulness", "social", "creative"]
+ACTIVITY_TITLES = ["Morning run", "Cold shower", "Read 20 pages", "Call a friend", "Sketch something",
+                   "No phone hour", "Cook a new recipe", "10k steps", "Stretch for 15 minutes", "Journal"]
+PROMPTS = ["Show us your view right now", "Your favourite mug", "Something green", "What you're reading",
+           "Your workout spot", "A random act of kindness", "Your lunch", "The sky above you"]
+COMMENTS = ["Love this!", "🔥🔥", "Great shot", "So inspiring", "Nice one", "Haha amazing", "Goals 💪"]
+
+GROUP_SIZES = (3, 4, 5, 6, 7)
+COLLECTIONS = ["users", "follows", "groups", "weekly_activity_submissions", "daily_activity_completions",
+               "weekly_rankings", "submissions", "global_challenges", "global_submissions", "global_votes",
+               "notifications"]
+
+
+# --- Deterministic identities and layout -----------------------------------
+
+def batch_rng(seed: int, kind: str, index: int) -> random.Random:
+    digest = hashlib.blake2b(f"{seed}:{kind}:{index}".encode(), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, "big"))
+
+
+def new_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def identity(seed: int, i: int) -> Tuple[str, str, str]:
+    """(id, username, full_name) of user ``i``, computable from any batch."""
+    digest = hashlib.blake2b(f"{seed}:user:{i}".encode(), digest_size=16).digest()
+    first, last = FIRST_NAMES[digest[0] % len(FIRST_NAMES)], LAST_NAMES[digest[1] % len(LAST_NAMES)]
+    separator = ("", "_", ".")[digest[2] % 3]
+    username = f"{first}{separator}{last[:1 + digest[3] % len(last)]}{i}"
+    return str(uuid.UUID(bytes=digest, version=4)), username, f"{first.title()} {last.title()}"
+
+
+def coprime_multiplier(n: int, rng: random.Random) -> int:
+    a = rng.randrange(n // 3, n) | 1 if n > 3 else 1
+    while math.gcd(a, n) != 1:
+        a += 2
+    return a
+
+
+def spread_remainder(sizes: List[int]):
+    """Absorb a trailing group smaller than 3 while keeping every group within 3-7.
+
+    Its members go one by one to the latest earlier groups with room; if every
+    group is already full, the trailing group stays and is topped up to 3 from
+    groups above the minimum instead.
+    """
+    smallest, largest = GROUP_SIZES[0], GROUP_SIZES[-1]
+    leftover = sizes.pop()
+    for i in range(len(sizes) - 1, -1, -1):
+        room = min(largest - sizes[i], leftover)
+        sizes[i] += room
+        leftover -= room
+        if not leftover:
+            return
+    sizes.append(leftover)
+    for i in range(len(sizes) - 2, -1, -1):
+        moved = min(sizes[i] - smallest, smallest - sizes[-1])
+        sizes[i] -= moved
+        sizes[-1] += moved
+        if sizes[-1] >= smallest:
+            return
+
+
+class Layout:
+    """Group membership shared by the user and group generators without coordination.
+
+    Each round shuffles users with an affine permutation ``(a*i + b) mod n``
+    and cuts the order into groups of 3-7, so every user joins one group per
+    round; both directions (user -> groups, group -> members) are O(log n).
+    """
+
+    def __init__(self, seed: int, users: int, rounds: int):
+        self.users = users
+        self.rounds = []
+        offset = 0
+        for round_index in range(rounds):
+            rng = batch_rng(seed, "layout", round_index)
+            a, b = coprime_multiplier(users, rng), rng.randrange(users)
+            sizes = []
+            remaining = users
+            while remaining > 0:
+                sizes.append(min(rng.choice(GROUP_SIZES), remaining))
+                remaining -= sizes[-1]
+            if len(sizes) > 1 and sizes[-1] < GROUP_SIZES[0]:
+                spread_remainder(sizes)
+            starts = array("q")
+            position = 0
+            for size in sizes:
+                starts.append(position)
+                position += size
+            self.rounds.append((a, pow(a, -1, users), b, starts, offset))
+            offset += len(starts)
+        self.groups = offset
+
+    def groups_of(self, user_index: int) -> List[int]:
+        groups = []
+        for a, _, b, starts, offset in self.rounds:
+            position = (a * user_index + b) % self.users
+            groups.append(offset + bisect_right(starts, position) - 1)
+        return groups
+
+    def members_of(self, group_index: int) -> List[int]:
+        for a, a_inverse, b, starts, offset in self.rounds:
+            local = group_index - offset
+            if 0 <= local < len(starts):
+                end = starts[local + 1] if local + 1 < len(starts) else self.users
+                return [(a_inverse * (position - b)) % self.users for position in range(starts[local], end)]
+        raise IndexError(group_index)
+
+
+def group_id(seed: int, group_index: int) -> str:
+    return str(uuid.UUID(bytes=hashlib.blake2b(f"{seed}:group:{group_index}".encode(), digest_size=16).digest(),
+                         version=4))
+
+
+def challenges(seed: int, days: int, now: datetime) -> List[Dict]:
+    """One global challenge per day, oldest first; only the latest is active."""
+    rng = batch_rng(seed, "challenges", 0)
+    docs = []
+    for day in range(days - 1, -1, -1):
+        created_at = week_rollover.day_start(now) - timedelta(days=day) + timedelta(hours=rng.randint(8, 20))
+        if created_at > now:
+            created_at -= timedelta(days=1)
+        docs.append({
+            "id": new_id(rng),
+            "prompt": rng.choice(PROMPTS),
+            "created_at": created_at,
+            "expires_at": created_at + timedelta(hours=24),
+            "promptness_window_minutes": 5,
+            "is_active": False,
+        })
+    if docs:
+        docs[-1]["is_active"] = docs[-1]["expires_at"] > now
+    return docs
+
+
+# --- Batch generators (run in worker processes) ----------------------------
+
+_config: Dict = {}
+_layout: Layout = None
+_challenges: List[Dict] = []
+
+
+def init_worker(config: Dict):
+    global _config, _layout, _challenges
+    _config = config
+    _layout = Layout(config["seed"], config["users"], config["group_rounds"])
+    _challenges = challenges(config["seed"], config["challenge_days"], config["now"])
+
+
+def power_law(rng: random.Random, minimum: float, alpha: float, cap: int) -> int:
+    return min(cap, int(minimum * rng.paretovariate(alpha)))
+
+
+def generate_users(index: int) -> Dict[str, List[Dict]]:
+    """Users with their group submissions, global submissions (votes, comments) and notifications."""
+    config, seed, now = _config, _config["seed"], _config["now"]
+    rng = batch_rng(seed, "users", index)
+    n = config["users"]
+    docs = {"users": [], "submissions": [], "global_submissions": [], "global_votes": [], "notifications": []}
+
+    for i in range(index * config["batch_size"], min((index + 1) * config["batch_size"], n)):
+        user_id, username, full_name = identity(seed, i)
+        groups = [group_id(seed, g) for g in _layout.groups_of(i)]
+        activities = 0
+
+        for group in groups:
+            for _ in range(rng.randint(0, 2 * config["submissions_per_user"])):
+                activities += 1
+                docs["submissions"].append({
+                    "id": new_id(rng),
+                    "user_id": user_id,
+                    "username": username,
+                    "group_id": group,
+                    "challenge_type": rng.choice(CHALLENGE_TYPES),
+                    "description": "Synthetic activity",
+                    "photo_data": None,
+                    "created_at": now - timedelta(minutes=rng.randint(0, 30 * 1440)),
+                    "votes": 0,
+                    "reactions": {},
+                })
+
+        for challenge in _challenges:
+            if rng.random() >= config["challenge_participation"]:
+                continue
+            activities += 1
+            submission_id = new_id(rng)
+            created_at = min(now, challenge["created_at"] + timedelta(minutes=rng.randint(0, 1439)))
+            voters = {rng.randrange(n) for _ in range(power_law(rng, 1, config["vote_alpha"], n) - 1)} - {i}
+            docs["global_votes"].extend({
+                "id": new_id(rng),
+                "submission_id": submission_id,
+                "user_id": identity(seed, voter)[0],
+                "created_at": min(now, created_at + timedelta(minutes=rng.randint(1, 600))),
+            } for voter in sorted(voters))
+            comments = []
+            for _ in range(power_law(rng, 1, config["comment_alpha"], 50) - 1):
+                commenter_id, commenter_name, _ = identity(seed, rng.randrange(n))
+                comments.append({
+                    "id": new_id(rng),
+                    "user_id": commenter_id,
+                    "username": commenter_name,
+                    "comment": rng.choice(COMMENTS),
+                    "created_at": min(now, created_at + timedelta(minutes=rng.randint(1, 600))),
+                })
+            comments.sort(key=lambda comment: comment["created_at"])
+            docs["global_submissions"].append({
+                "id": submission_id,
+                "user_id": user_id,
+                "username": username,
+                "challenge_id": challenge["id"],
+                "challenge_prompt": challenge["prompt"],
+                "description": "Synthetic challenge entry",
+                "photo_data": None,
+                "created_at": created_at,
+                "votes": len(voters),
+                "comments": comments,
+                "reactions": {},
+            })
+
+        docs["users"].append({
+            "id": user_id,
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "x",
+            "full_name": full_name,
+            **user_search.search_fields(username, full_name),
+            "created_at": now - timedelta(minutes=rng.randint(0, 365 * 1440)),
+            "avatar_color": AVATAR_COLORS[i % len(AVATAR_COLORS)],
+            "groups": groups,
+            "achievements": [],
+            "stats": {
+                "total_activities": activities,
+                "current_streak": rng.randint(0, min(activities, 30)),
+                "total_groups_joined": len(groups),
+            },
+        })
+        docs["notifications"].extend(notifications(rng, seed, n, user_id, groups, now, config))
+
+    return docs
+
+
+def notifications(rng: random.Random, seed: int, n: int, user_id: str, groups: List[str], now: datetime,
+                  config: Dict) -> List[Dict]:
+    docs = []
+    for _ in range(rng.randint(0, 2 * config["notifications_per_user"])):
+        created_at = now - timedelta(minutes=rng.randint(0, 14 * 1440))
+        read = rng.random() < config["notification_read_rate"]
+        actor = identity(seed, rng.randrange(n))
+        kind = rng.choice(["new_follower", "group_join", "new_activity", "global_challenge_drop"])
+        if kind == "new_follower":
+            docs.append({"id": new_id(rng), "user_id": user_id, "type": kind, "title": "New Follower!",
+                         "message": f"{actor[1]} started following you!", "data": {"follower_id": actor[0]},
+                         "read": read, "created_at": created_at})
+        elif kind == "global_challenge_drop" and _challenges:
+            challenge = rng.choice(_challenges)
+            prompt = challenge["prompt"]
+            docs.append({
+                "id": new_id(rng), "user_id": user_id, "type": kind, "challenge_id": challenge["id"],
+                "message": f"🌍 New Global Challenge: {prompt[:50]}{'...' if len(prompt) > 50 else ''}",
+                "title": "New Global Challenge!", "read": read, "created_at": challenge["created_at"],
+                "action_url": "/feed",
+                "metadata": {"challenge_id": challenge["id"], "challenge_prompt": prompt,
+                             "notification_category": "global_challenge"},
+            })
+        elif groups:
+            group = rng.choice(groups)
+            if kind == "group_join":
+                title, message, data = "New Group Member!", f"{actor[1]} joined the group", {
+                    "group_id": group, "new_member_id": actor[0]}
+            else:
+                challenge_type = rng.choice(CHALLENGE_TYPES)
+                title, message, data = "New Activity Posted!", f"{actor[1]} completed the {challenge_type} challenge", {
+                    "group_id": group, "submission_id": new_id(rng)}
+            docs.append({"id": new_id(rng), "user_id": user_id, "type": kind, "title": title, "message": message,
+                         "data": data, "read": read, "created_at": created_at})
+    return docs
+
+
+def generate_follows(index: int) -> Dict[str, List[Dict]]:
+    """Out-degree is Pareto-distributed; targets follow a Zipf-like popularity ranking."""
+    config, seed, now = _config, _config["seed"], _config["now"]
+    rng = batch_rng(seed, "follows", index)
+    n = config["users"]
+    popularity = batch_rng(seed, "popularity", 0)
+    a, b = coprime_multiplier(n, popularity), popularity.randrange(n)
+    docs = []
+    for i in range(index * config["batch_size"], min((index + 1) * config["batch_size"], n)):
+        follower_id = identity(seed, i)[0]
+        wanted = power_law(rng, config["follows_min"], config["follow_alpha"], min(config["follows_max"], n - 1))
+        targets = set()
+        for _ in range(wanted * 3):
+            if len(targets) >= wanted:
+                break
+            # Rank r drawn with density ~1/r, mapped to a user by a fixed permutation
+            target = (a * (int(n ** rng.random()) - 1) + b) % n
+            if target != i:
+                targets.add(target)
+        docs.extend({
+            "id": new_id(rng),
+            "follower_id": follower_id,
+            "following_id": identity(seed, target)[0],
+            "created_at": now - timedelta(minutes=rng.randint(0, 180 * 1440)),
+        } for target in sorted(targets))
+    return {"follows": docs}
+
+
+def generate_groups(index: int) -> Dict[str, List[Dict]]:
+    """Groups partway through their week, with the week's activities, reveals, completions and past rankings."""
+    config, seed, now = _config, _config["seed"], _config["now"]
+    rng = batch_rng(seed, "groups", index)
+    batch = max(1, config["batch_size"] // 5)
+    docs = {"groups": [], "weekly_activity_submissions": [], "daily_activity_completions": [], "weekly_rankings": []}
+
+    for g in range(index * batch, min((index + 1) * batch, _layout.groups)):
+        gid = group_id(seed, g)
+        members = [identity(seed, i) for i in _layout.members_of(g)]
+        member_ids = [member[0] for member in members]
+        submission_day = week_rollover.WEEKDAYS[g % 7]
+        days_since = (now.weekday() - g % 7) % 7
+        week_start = week_rollover.day_start(now) - timedelta(days=days_since)
+        created_at = week_start - timedelta(weeks=config["history_weeks"], days=rng.randint(0, 30))
+
+        activities = []
+        for order in range(1, 8):
+            submitted_by = rng.choice(member_ids)
+            activities.append({
+                "id": new_id(rng),
+                "group_id": gid,
+                "submitted_by": submitted_by,
+                "activity_title": rng.choice(ACTIVITY_TITLES),
+                "activity_description": "Synthetic weekly activity",
+                "week_start": week_start,
+                "submission_order": order,
+                "created_at": week_start + timedelta(minutes=rng.randint(0, 8 * 60)),
+                "is_revealed": False,
+                "reveal_date": None,
+            })
+
+        # Day 1 is revealed at the first GROUP_REVEAL_HOUR slot after submissions close, one more each day
+        first_reveal = group_reveals.next_reveal_time(max(activity["created_at"] for activity in activities))
+        reveals = []
+        points = {member_id: 0 for member_id in member_ids}
+        for day_number, activity in enumerate(activities, start=1):
+            revealed_at = first_reveal + timedelta(days=day_number - 1)
+            if revealed_at > now:
+                break
+            activity["is_revealed"], activity["reveal_date"] = True, revealed_at
+            reveal = group_reveals.build_reveal(activity, day_number, revealed_at)
+            reveals.append(reveal)
+
+            completers = [member for member in member_ids if rng.random() < config["completion_rate"]]
+            rng.shuffle(completers)
+            for order, member_id in enumerate(completers):
+                points_earned = 3 if order == 0 else 2 if order == 1 else 1
+                points[member_id] += points_earned
+                docs["daily_activity_completions"].append({
+                    "id": new_id(rng),
+                    "group_id": gid,
+                    "activity_id": activity["id"],
+                    "completed_by": member_id,
+                    "completion_description": "Synthetic completion",
+                    "photo_url": None,
+                    "points_earned": points_earned,
+                    "completed_at": min(now, revealed_at + timedelta(minutes=rng.randint(1, 600))),
+                    "day_number": day_number,
+                })
+
+        summaries = []
+        for weeks_ago in range(config["history_weeks"], 0, -1):
+            past_start = week_start - timedelta(weeks=weeks_ago)
+            past = {"members": member_ids, "current_week_points": {
+                member_id: rng.randint(0, 21) for member_id in member_ids}}
+            completed = {member_id: min(7, past["current_week_points"][member_id] // 2) for member_id in member_ids}
+            rankings = week_rollover.rank_members(past, completed)
+            docs["weekly_rankings"].extend({
+                "id": new_id(rng), "group_id": gid, "week_start": past_start,
+                "created_at": past_start + timedelta(weeks=1), **ranking
+            } for ranking in rankings)
+            summaries.append({
+                "week_start": past_start,
+                "winner_id": rankings[0]["member_id"] if rankings and rankings[0]["total_points"] > 0 else None,
+                "top_points": rankings[0]["total_points"] if rankings else 0,
+            })
+
+        category = rng.choice(CATEGORIES)
+        group = {
+            "id": gid,
+            "name": f"{members[0][2].split()[0]}'s {category} crew {g}",
+            "description": "Synthetic group",
+            "category": category,
+            "is_public": rng.random() < 0.2,
+            "created_by": member_ids[0],
+            "admin_id": member_ids[0],
+            "invite_code": f"G{g:07d}",
+            "created_at": created_at,
+            "members": member_ids,
+            "member_count": len(member_ids),
+            "max_members": 7,
+            "current_challenge": "Weekly Activity Challenge",
+            "submission_day": submission_day.capitalize(),
+            "current_week_start": week_start,
+            "activities_submitted_this_week": 7,
+            "activities_needed": 7,
+            "submission_phase_active": False,
+            "daily_reveals": reveals,
+            "current_day_activity": reveals[-1] if reveals else None,
+            "weekly_rankings": summaries[-week_rollover.EMBEDDED_RANKINGS_KEEP:],
+            "current_week_points": points,
+        }
+        if len(reveals) < len(activities):
+            group["next_reveal_at"] = first_reveal + timedelta(days=len(reveals))
+        docs["groups"].append(group)
+        docs["weekly_activity_submissions"].extend(activities)
+
+    return docs
+
+
+GENERATORS = {"users": generate_users, "follows": generate_follows, "groups": generate_groups}
+
+
+# --- Driver ------------------------------------------------------------------
+
+async def run(db, config: Dict, workers: int, inflight: int):
+    layout = Layout(config["seed"], config["users"], config["group_rounds"])
+    user_batches = math.ceil(config["users"] / config["batch_size"])
+    group_batches = math.ceil(layout.groups / max(1, config["batch_size"] // 5))
+    tasks = ([("users", i) for i in range(user_batches)] + [("follows", i) for i in range(user_batches)]
+             + [("groups", i) for i in range(group_batches)])
+    print(f"   🧩 {layout.groups} groups, {len(tasks)} batches on {workers} workers")
+
+    await db.global_challenges.insert_many(challenges(config["seed"], config["challenge_days"], config["now"]))
+    counts = {"global_challenges": config["challenge_days"]}
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(inflight)
+    done = 0
+    started = time.perf_counter()
+
+    async def write(collection, docs):
+        for offset in range(0, len(docs), config["batch_size"]):
+            await db[collection].insert_many(docs[offset:offset + config["batch_size"]], ordered=False)
+
+    async def run_batch(pool, kind, index):
+        nonlocal done
+        async with semaphore:
+            batch = await loop.run_in_executor(pool, GENERATORS[kind], index)
+            await asyncio.gather(*(write(collection, docs) for collection, docs in batch.items() if docs))
+        for collection, docs in batch.items():
+            counts[collection] = counts.get(collection, 0) + len(docs)
+        done += 1
+        if done % max(1, len(tasks) // 20) == 0 or done == len(tasks):
+            print(f"   ⏳ {done}/{len(tasks)} batches, {sum(counts.values())} docs, "
+                  f"{time.perf_counter() - started:.0f}s")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(config,)) as pool:
+        await asyncio.gather(*(run_batch(pool, kind, index) for kind, index in tasks))
+    return counts
+
+
+async def main():
+    load_dotenv(BACKEND_DIR / ".env")
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic ACTIFY dataset for scale testing")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.environ.get("BENCH_DB_NAME", "actify_bench"))
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--group-rounds", type=int, default=1, help="Groups each user belongs to")
+    parser.add_argument("--follows-min", type=float, default=5, help="Pareto scale of follows per user")
+    parser.add_argument("--follows-max", type=int, default=5000)
+    parser.add_argument("--follow-alpha", type=float, default=1.5, help="Pareto shape of follows per user")
+    parser.add_argument("--submissions-per-user", type=int, default=3, help="Mean group submissions per group")
+    parser.add_argument("--challenge-days", type=int, default=7)
+    parser.add_argument("--challenge-participation", type=float, default=0.3)
+    parser.add_argument("--vote-alpha", type=float, default=1.2, help="Pareto shape of votes per submission")
+    parser.add_argument("--comment-alpha", type=float, default=2.0, help="Pareto shape of comments per submission")
+    parser.add_argument("--completion-rate", type=float, default=0.6, help="Chance a member completes a reveal")
+    parser.add_argument("--history-weeks", type=int, default=8, help="Archived weekly rankings per group")
+    parser.add_argument("--notifications-per-user", type=int, default=5)
+    parser.add_argument("--notification-read-rate", type=float, default=0.7)
+    parser.add_argument("--now", help="Reference time (ISO, UTC); fix it for reproducible output")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--inflight", type=int, default=None, help="Batches generated/written at once")
+    parser.add_argument("--drop", action="store_true", help="Drop the generated collections first")
+    args = parser.parse_args()
+
+    now = datetime.fromisoformat(args.now) if args.now else datetime.utcnow().replace(microsecond=0)
+    config = {
+        "seed": args.seed,
+        "now": now.replace(tzinfo=None),
+        "users": args.users,
+        "group_rounds": args.group_rounds,
+        "follows_min": args.follows_min,
+        "follows_max": args.follows_max,
+        "follow_alpha": args.follow_alpha,
+        "submissions_per_user": args.submissions_per_user,
+        "challenge_days": args.challenge_days,
+        "challenge_participation": args.challenge_participation,
+        "vote_alpha": args.vote_alpha,
+        "comment_alpha": args.comment_alpha,
+        "completion_rate": args.completion_rate,
+        "history_weeks": args.history_weeks,
+        "notifications_per_user": args.notifications_per_user,
+        "notification_read_rate": args.notification_read_rate,
+        "batch_size": args.batch_size,
+    }
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db]
+
+    print("🚀 ACTIFY DATASET GENERATOR")
+    print("=" * 50)
+    if args.drop:
+        for name in COLLECTIONS:
+            await db.drop_collection(name)
+        print(f"   🗑️  Dropped {len(COLLECTIONS)} collections in {args.db}")
+    elif await db.users.estimated_document_count():
+        print(f"   ⚠️  {args.db}.users is not empty; generated ids are seed-derived, rerun with --drop to replace")
+
+    started = time.perf_counter()
+    counts = await run(db, config, args.workers, args.inflight or 2 * args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Generated {sum(counts.values())} documents in {elapsed:.1f}s")
+    print(json.dumps({"db": args.db, "seed": args.seed, "now": now.isoformat(), "counts": counts}, indent=2))
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
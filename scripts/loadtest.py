@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+ACTIFY Load Test
+Seeds a synthetic dataset (users, follows, groups with a revealed daily
+activity, group submissions, an active global challenge with submissions and
+today's global activity completions) and drives concurrent load against the
+hot API paths, reporting throughput and p50/p95/p99 latency per scenario
+
+Run the backend against a scratch database (e.g. DB_NAME=actify_loadtest) and
+point --db at the same one: the seeded challenge becomes the active one.
+Seeded documents carry a ``loadtest_run`` tag and are removed afterwards
+unless --keep is given.
+
+All load comes from one host, so the per-IP rate limits (60 votes a minute
+by default) would turn the vote scenario into a measurement of the limiter.
+Start the backend under test with raised budgets, e.g.
+RATE_LIMIT_VOTE=1000000/1 RATE_LIMIT_COMMENT=1000000/1. 429 responses are
+counted in their own column and kept out of the latency percentiles.
+
+Compare runs with --output current.json --compare baseline.json. To load
+test at scale, build a database with generate_dataset.py, run the backend on
+it and pass --existing: fixtures are then sampled from that data instead of
+seeded (write scenarios add votes and completions to it).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import aiohttp
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+import user_search  # noqa: E402
+
+API_BASE = os.environ.get("ACTIFY_API_BASE", "http://localhost:8001/api")
+
+FIRST_NAMES = ["james", "mary", "john", "patricia", "robert", "jennifer", "michael", "linda", "william",
+               "elizabeth", "david", "barbara", "sofia", "mateo", "amara", "kenji", "priya", "lucas"]
+LAST_NAMES = ["smith", "johnson", "williams", "brown", "jones", "garcia", "miller", "davis", "lopez",
+              "wilson", "anderson", "taylor", "moore", "jackson", "martin", "lee", "perez", "clark"]
+CHALLENGE_TYPES = ["photo", "workout", "mindfulness", "social", "creative"]
+PHOTO = b"\xff\xd8\xff\xe0" + bytes(2048)
+
+# Scenario weights for --mode mixed (reads dominate, as in the app)
+DEFAULT_MIX = {
+    "global_feed": 20,
+    "daily_feed": 15,
+    "submissions_feed": 15,
+    "search": 15,
+    "rankings_weekly": 5,
+    "rankings_alltime": 5,
+    "group_rankings": 5,
+    "vote": 10,
+    "complete_global": 5,
+    "complete_group": 5,
+}
+
+
+# --- Seeding ---------------------------------------------------------------
+
+def synthetic_user(rng, run_id, i, now):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    username = f"{first}{last[:rng.randint(1, len(last))]}_{run_id}_{i}"
+    full_name = f"{first.title()} {last.title()}"
+    return {
+        "id": f"lt-{run_id}-{i}",
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": "x",
+        "full_name": full_name,
+        **user_search.search_fields(username, full_name),
+        "created_at": now - timedelta(days=rng.randint(0, 365)),
+        "avatar_color": "#4ECDC4",
+        "groups": [],
+        "achievements": [],
+        "stats": {"total_activities": 0, "current_streak": 0, "total_groups_joined": 0},
+        "loadtest_run": run_id,
+    }
+
+
+def synthetic_group(run_id, index, members, reveal, now):
+    return {
+        "id": f"lt-{run_id}-group-{index}",
+        "name": f"Load test group {index}",
+        "description": "",
+        "category": "fitness",
+        "is_public": False,
+        "created_by": members[0],
+        "admin_id": members[0],
+        "invite_code": f"L{run_id[:4].upper()}{index:06d}",
+        "created_at": now,
+        "members": members,
+        "member_count": len(members),
+        "max_members": 7,
+        "current_challenge": "Weekly Activity Challenge",
+        "submission_day": None,
+        "current_week_start": None,
+        "activities_submitted_this_week": 0,
+        "activities_needed": 7,
+        "submission_phase_active": False,
+        "daily_reveals": [reveal],
+        "current_day_activity": reveal,
+        "weekly_rankings": [],
+        "current_week_points": {member: 0 for member in members},
+        "loadtest_run": run_id,
+    }
+
+
+async def insert_batched(collection, docs, batch_size):
+    for offset in range(0, len(docs), batch_size):
+        await collection.insert_many(docs[offset:offset + batch_size], ordered=False)
+
+
+async def seed(db, session, args, rng):
+    run_id = uuid.uuid4().hex[:8]
+    now = datetime.utcnow()
+    print(f"   🌱 Seeding run {run_id}: {args.users} users...")
+    started = time.perf_counter()
+
+    users = [synthetic_user(rng, run_id, i, now) for i in range(args.users)]
+    user_ids = [user["id"] for user in users]
+
+    follows = []
+    for follower in user_ids:
+        candidates = rng.sample(user_ids, min(args.follows_per_user + 1, len(user_ids)))
+        for following in [user_id for user_id in candidates if user_id != follower][:args.follows_per_user]:
+            follows.append({"id": str(uuid.uuid4()), "follower_id": follower, "following_id": following,
+                            "created_at": now, "loadtest_run": run_id})
+
+    groups = []
+    shuffled = user_ids[:]
+    rng.shuffle(shuffled)
+    for index, offset in enumerate(range(0, len(shuffled), 7)):
+        members = shuffled[offset:offset + 7]
+        reveal = {
+            "day_number": 1,
+            "activity_id": f"lt-{run_id}-activity-{index}",
+            "activity_title": "Load test activity",
+            "activity_description": "Synthetic reveal",
+            "revealed_at": now,
+            "submitted_by": members[0],
+        }
+        groups.append(synthetic_group(run_id, index, members, reveal, now))
+    user_groups = {member: group["id"] for group in groups for member in group["members"]}
+    for user in users:
+        user["groups"] = [user_groups[user["id"]]]
+        user["stats"]["total_groups_joined"] = 1
+
+    usernames = {user["id"]: user["username"] for user in users}
+    submissions = []
+    for user_id in user_ids:
+        for _ in range(rng.randint(0, args.submissions_per_user * 2)):
+            submissions.append({
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "username": usernames[user_id],
+                "group_id": user_groups[user_id],
+                "challenge_type": rng.choice(CHALLENGE_TYPES),
+                "description": "Load test submission",
+                "photo_data": None,
+                "created_at": now - timedelta(days=rng.randint(0, 30), minutes=rng.randint(0, 1440)),
+                "votes": 0,
+                "reactions": {},
+                "loadtest_run": run_id,
+            })
+
+    challenge = {
+        "id": f"lt-{run_id}-challenge",
+        "prompt": "Load test challenge",
+        "created_at": now,
+        "expires_at": now + timedelta(days=1),
+        "promptness_window_minutes": 60,
+        "is_active": True,
+        "loadtest_run": run_id,
+    }
+    submitters = rng.sample(user_ids, int(len(user_ids) * args.submitted_fraction))
+    global_submissions = [{
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "username": usernames[user_id],
+        "challenge_id": challenge["id"],
+        "challenge_prompt": challenge["prompt"],
+        "description": "Load test global submission",
+        "photo_data": None,
+        "created_at": now - timedelta(minutes=rng.randint(0, 600)),
+        "votes": 0,
+        "comments": [],
+        "reactions": {},
+        "loadtest_run": run_id,
+    } for user_id in submitters]
+
+    await insert_batched(db.users, users, args.batch_size)
+    await insert_batched(db.follows, follows, args.batch_size)
+    await insert_batched(db.groups, groups, args.batch_size)
+    await insert_batched(db.submissions, submissions, args.batch_size)
+    await db.global_challenges.insert_one(challenge)
+    await insert_batched(db.global_submissions, global_submissions, args.batch_size)
+
+    # Today's global activity is picked by the server; completions reference it
+    async with session.get(f"{API_BASE}/daily-global-activity/current") as response:
+        activity = await response.json()
+    completers = []
+    if activity.get("id"):
+        completers = rng.sample(user_ids, int(len(user_ids) * args.submitted_fraction))
+        await insert_batched(db.global_activity_completions, [{
+            "id": str(uuid.uuid4()),
+            "activity_id": activity["id"],
+            "user_id": user_id,
+            "username": usernames[user_id],
+            "description": "Load test completion",
+            "photo_url": None,
+            "completed_at": now - timedelta(minutes=rng.randint(0, 600)),
+            "is_friends_visible": True,
+            "votes": 0,
+            "loadtest_run": run_id,
+        } for user_id in completers], args.batch_size)
+    else:
+        print("   ⚠️  No daily global activity available; daily feed scenarios will be locked")
+
+    print(f"   ✅ Seeded {len(users)} users, {len(follows)} follows, {len(groups)} groups, "
+          f"{len(submissions)} submissions, {len(global_submissions)} global submissions, "
+          f"{len(completers)} completions in {time.perf_counter() - started:.1f}s")
+
+    completed = set(completers)
+    return {
+        "run_id": run_id,
+        "user_ids": user_ids,
+        "groups": groups,
+        "submitters": submitters,
+        "completers": completers,
+        "global_submission_ids": [submission["id"] for submission in global_submissions],
+        # One-shot writes: each user can complete each activity once per day
+        "pending_global": [user_id for user_id in user_ids if user_id not in completed],
+        "pending_group": [(group["id"], member) for group in groups for member in group["members"]],
+    }
+
+
+async def sample(db, session, args, rng):
+    """Fixtures sampled from an existing (generated) dataset instead of seeding one."""
+    print(f"   🎯 Sampling fixtures from {args.db}...")
+    size = args.users
+
+    async def sampled(collection, match, projection):
+        return await db[collection].aggregate([
+            {"$match": match}, {"$sample": {"size": size}}, {"$project": projection}
+        ]).to_list(length=None)
+
+    user_ids = [user["id"] for user in await sampled("users", {}, {"_id": 0, "id": 1})]
+    groups = await sampled("groups", {"current_day_activity": {"$ne": None}}, {"_id": 0, "id": 1, "members": 1})
+    challenge = await db.global_challenges.find_one({"is_active": True}, sort=[("created_at", -1)])
+    global_submissions = await sampled(
+        "global_submissions", {"challenge_id": challenge["id"] if challenge else None}, {"_id": 0, "id": 1, "user_id": 1}
+    )
+    if not user_ids or not global_submissions:
+        raise SystemExit(f"{args.db} has no users or no submissions to the active challenge; generate a dataset first")
+
+    async with session.get(f"{API_BASE}/daily-global-activity/current") as response:
+        activity = await response.json()
+    completers, pending_global = [], user_ids
+    if activity.get("id"):
+        completers = [completion["user_id"] for completion in await sampled(
+            "global_activity_completions", {"activity_id": activity["id"]}, {"_id": 0, "user_id": 1})]
+        done = set(await db.global_activity_completions.distinct(
+            "user_id", {"activity_id": activity["id"], "user_id": {"$in": user_ids}}))
+        pending_global = [user_id for user_id in user_ids if user_id not in done]
+
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    completed_today = {
+        (completion["group_id"], completion["completed_by"])
+        async for completion in db.daily_activity_completions.find(
+            {"group_id": {"$in": [group["id"] for group in groups]}, "completed_at": {"$gte": today}},
+            {"_id": 0, "group_id": 1, "completed_by": 1}
+        )
+    }
+    print(f"   ✅ Sampled {len(user_ids)} users, {len(groups)} groups, {len(global_submissions)} global submissions")
+    return {
+        "run_id": None,
+        "user_ids": user_ids,
+        "groups": groups,
+        "submitters": [submission["user_id"] for submission in global_submissions],
+        "completers": completers,
+        "global_submission_ids": [submission["id"] for submission in global_submissions],
+        "pending_global": pending_global,
+        "pending_group": [(group["id"], member) for group in groups for member in group["members"]
+                          if (group["id"], member) not in completed_today],
+    }
+
+
+async def cleanup(db, run_id):
+    tag = {"loadtest_run": run_id}
+    for name in ("users", "follows", "groups", "submissions", "global_challenges",
+                 "global_submissions", "global_activity_completions"):
+        await db[name].delete_many(tag)
+    prefix = {"$regex": f"^lt-{run_id}-"}
+    await db.global_activity_completions.delete_many({"user_id": prefix})
+    await db.daily_activity_completions.delete_many({"group_id": prefix})
+    await db.global_votes.delete_many({"user_id": prefix})
+    await db.notifications.delete_many({"user_id": prefix})
+
+
+# --- Scenarios -------------------------------------------------------------
+
+def build_scenarios(data, rng):
+    """name -> callable returning (method, path, params, form) or None when the scenario is exhausted."""
+    rng.shuffle(data["pending_global"])
+    rng.shuffle(data["pending_group"])
+
+    def form(fields, with_photo=False):
+        payload = aiohttp.FormData()
+        for key, value in fields.items():
+            payload.add_field(key, value)
+        if with_photo:
+            payload.add_field("photo", PHOTO, filename="photo.jpg", content_type="image/jpeg")
+        return payload
+
+    def search_prefix():
+        name = rng.choice(FIRST_NAMES + LAST_NAMES)
+        return name[:rng.randint(2, min(6, len(name)))]
+
+    def complete_global():
+        if not data["pending_global"]:
+            return None
+        user_id = data["pending_global"].pop()
+        return "POST", "/daily-global-activity/complete", None, form(
+            {"user_id": user_id, "description": "Load test completion"}, with_photo=True)
+
+    def complete_group():
+        if not data["pending_group"]:
+            return None
+        group_id, user_id = data["pending_group"].pop()
+        return "POST", f"/groups/{group_id}/complete-daily-activity", None, form(
+            {"user_id": user_id, "description": "Load test completion"}, with_photo=True)
+
+    return {
+        "global_feed": lambda: ("GET", "/global-feed", {
+            "user_id": rng.choice(data["submitters"]), "friends_only": rng.choice(["true", "false"])}, None),
+        "daily_feed": lambda: ("GET", "/daily-global-activity/feed", {
+            "user_id": rng.choice(data["completers"] or data["user_ids"]),
+            "friends_only": rng.choice(["true", "false"])}, None),
+        "submissions_feed": lambda: ("GET", "/submissions/feed", {"user_id": rng.choice(data["user_ids"])}, None),
+        "search": lambda: ("GET", "/users/search", {"q": search_prefix(), "user_id": rng.choice(data["user_ids"])}, None),
+        "rankings_weekly": lambda: ("GET", "/rankings/weekly", None, None),
+        "rankings_alltime": lambda: ("GET", "/rankings/alltime", None, None),
+        "group_rankings": lambda: ("GET", f"/groups/{rng.choice(data['groups'])['id']}/weekly-rankings", None, None),
+        "vote": lambda: ("POST", f"/global-submissions/{rng.choice(data['global_submission_ids'])}/vote", None,
+                         form({"user_id": rng.choice(data["user_ids"])})),
+        "complete_global": complete_global,
+        "complete_group": complete_group,
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, scenario, status, elapsed_ms):
+        self.statuses[scenario][str(status)] += 1
+        # Rate-limited requests never reach the handler; timing them would skew the percentiles
+        if status != 429:
+            self.latencies[scenario].append(elapsed_ms)
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(recorder, elapsed_seconds):
+    report = {}
+    for scenario, statuses in sorted(recorder.statuses.items()):
+        latencies = sorted(recorder.latencies[scenario]) or [0.0]
+        statuses = dict(statuses)
+        rate_limited = statuses.get("429", 0)
+        errors = sum(count for status, count in statuses.items() if not status.startswith("2")) - rate_limited
+        requests = sum(statuses.values()) - rate_limited
+        report[scenario] = {
+            "requests": requests,
+            "errors": errors,
+            "rate_limited": rate_limited,
+            "rps": round(requests / elapsed_seconds, 1),
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(latencies[-1], 2),
+            "statuses": statuses,
+        }
+    return report
+
+
+async def run_load(session, scenarios, weights, duration, concurrency, rng):
+    recorder = Recorder()
+    names = list(weights)
+    exhausted = set()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            live = [name for name in names if name not in exhausted]
+            if not live:
+                return
+            scenario = rng.choices(live, weights=[weights[name] for name in live])[0]
+            request = scenarios[scenario]()
+            if request is None:
+                exhausted.add(scenario)
+                continue
+            method, path, params, data = request
+            started = time.perf_counter()
+            try:
+                async with session.request(method, f"{API_BASE}{path}", params=params, data=data) as response:
+                    await response.read()
+                    status = response.status
+            except aiohttp.ClientError as e:
+                status = type(e).__name__
+            recorder.record(scenario, status, (time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(recorder, time.perf_counter() - started)
+
+
+def print_report(title, report, baseline=None):
+    print(f"\n📊 {title}")
+    print(f"   {'scenario':<18}{'req':>7}{'err':>6}{'429':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for scenario, stats in report.items():
+        line = (f"   {scenario:<18}{stats['requests']:>7}{stats['errors']:>6}{stats.get('rate_limited', 0):>7}{stats['rps']:>9.1f}"
+                f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+        previous = (baseline or {}).get(scenario)
+        if previous:
+            deltas = [
+                f"{key[:-3]} {100 * (stats[key] - previous[key]) / previous[key]:+.0f}%"
+                for key in ("p50_ms", "p95_ms", "p99_ms") if previous[key]
+            ]
+            if previous["rps"]:
+                deltas.append(f"rps {100 * (stats['rps'] - previous['rps']) / previous['rps']:+.0f}%")
+            line += "   vs baseline: " + ", ".join(deltas)
+        print(line)
+    if any(stats.get("rate_limited") for stats in report.values()):
+        print("   ⚠️  Requests were rate limited; raise the backend's RATE_LIMIT_* budgets for load tests")
+
+
+async def main():
+    load_dotenv(BACKEND_DIR / ".env")
+
+    parser = argparse.ArgumentParser(description="Load test the ACTIFY hot API paths")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.environ.get("DB_NAME", "test_database"),
+                        help="Database the backend under test uses")
+    parser.add_argument("--users", type=int, default=2000, help="Users to seed (or sample with --existing)")
+    parser.add_argument("--follows-per-user", type=int, default=20)
+    parser.add_argument("--submissions-per-user", type=int, default=3, help="Mean group submissions per user")
+    parser.add_argument("--submitted-fraction", type=float, default=0.5,
+                        help="Share of users who submitted to the challenge / completed today's activity")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--mode", choices=["isolated", "mixed"], default="isolated",
+                        help="isolated: each scenario alone for --duration; mixed: weighted mix for --duration")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_MIX), help="Comma-separated scenario names")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per phase")
+    parser.add_argument("--warmup", type=float, default=3, help="Seconds of unreported mixed load first")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Baseline JSON report to diff against")
+    parser.add_argument("--keep", action="store_true", help="Don't delete the seeded data")
+    parser.add_argument("--existing", action="store_true",
+                        help="Sample --users fixtures from the database's data instead of seeding")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(DEFAULT_MIX)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    rng = random.Random(args.seed)
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db]
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    print("🚀 ACTIFY LOAD TEST")
+    print("=" * 50)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        data = await (sample if args.existing else seed)(db, session, args, rng)
+        try:
+            scenarios = build_scenarios(data, rng)
+            mix = {name: DEFAULT_MIX[name] for name in selected}
+            reads = {name: weight for name, weight in mix.items() if not name.startswith("complete_")}
+            if args.warmup > 0 and reads:
+                await run_load(session, scenarios, reads, args.warmup, args.concurrency, rng)
+
+            results = {}
+            if args.mode == "mixed":
+                results["mixed"] = await run_load(session, scenarios, mix, args.duration, args.concurrency, rng)
+                print_report(f"Mixed load, {args.concurrency} concurrent, {args.duration:.0f}s",
+                             results["mixed"], (baseline or {}).get("mixed"))
+            else:
+                for name in selected:
+                    results[name] = (await run_load(
+                        session, scenarios, {name: 1}, args.duration, args.concurrency, rng
+                    )).get(name, {})
+                isolated = {name: stats for name, stats in results.items() if stats}
+                print_report(f"Isolated scenarios, {args.concurrency} concurrent, {args.duration:.0f}s each",
+                             isolated, baseline)
+        finally:
+            if data["run_id"] and not args.keep:
+                await cleanup(db, data["run_id"])
+
+    report = {
+        "finished_at": datetime.utcnow().isoformat(),
+        "api_base": API_BASE,
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "mongo_url")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+    client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+ACTIFY Datetime Migration
+Converts legacy ISO-string timestamps (global challenges, follows,
+notifications) to UTC BSON datetimes and reports converted counts
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+import datetimes  # noqa: E402
+
+
+async def main():
+    load_dotenv(BACKEND_DIR / ".env")
+
+    parser = argparse.ArgumentParser(description="Normalize ACTIFY timestamps to UTC datetimes")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.environ.get("DB_NAME", "test_database"))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    converted = await datetimes.migrate_string_timestamps(client[args.db], batch_size=args.batch_size)
+    print(json.dumps(converted, indent=2))
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
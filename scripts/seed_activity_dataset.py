@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+ACTIFY Activity Dataset Seeder
+Idempotently upserts the versioned activity seed file into MongoDB and
+reports inserted/updated/unchanged counts
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+import activity_dataset  # noqa: E402
+
+
+async def main():
+    load_dotenv(BACKEND_DIR / ".env")
+
+    parser = argparse.ArgumentParser(description="Seed the ACTIFY activity dataset")
+    parser.add_argument("--path", type=Path, default=None, help="Seed file (.json or .csv), defaults to the bundled one")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.environ.get("DB_NAME", "test_database"))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Report counts without writing")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    collection = client[args.db].activity_dataset
+
+    await activity_dataset.ensure_indexes(collection)
+    result = await activity_dataset.seed_activity_dataset(
+        collection, path=args.path, batch_size=args.batch_size, dry_run=args.dry_run
+    )
+    print(json.dumps(result, indent=2))
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
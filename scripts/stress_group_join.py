@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+ACTIFY Group Join Stress Test
+Fires concurrent joins (through all three join endpoints, with duplicate
+attempts per user) at one group and checks that the member cap holds, no
+member is added twice and the user-side group lists stay consistent
+
+Seeds its users and group directly in MongoDB (so registration rate limits
+don't apply) and removes them afterwards unless --keep is given.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import string
+import sys
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+API_BASE = os.environ.get("ACTIFY_API_BASE", "http://localhost:8001/api")
+
+
+async def seed(db, users, max_members):
+    run_id = uuid.uuid4().hex[:8]
+    now = datetime.utcnow()
+    user_ids = [f"stress-{run_id}-{i}" for i in range(users + 1)]
+    await db.users.insert_many([
+        {"id": user_id, "username": user_id, "full_name": user_id, "email": f"{user_id}@example.com",
+         "groups": [], "stats": {"total_groups_joined": 0}, "created_at": now, "stress_run": run_id}
+        for user_id in user_ids
+    ])
+    creator = user_ids[0]
+    group = {
+        "id": f"stress-{run_id}",
+        "name": f"Join stress {run_id}",
+        "description": "",
+        "category": "fitness",
+        "is_public": False,
+        "created_by": creator,
+        "admin_id": creator,
+        "invite_code": "S" + "".join(random.choices(string.ascii_uppercase + string.digits, k=7)),
+        "created_at": now,
+        "members": [creator],
+        "member_count": 1,
+        "max_members": max_members,
+        "current_week_points": {creator: 0},
+        "stress_run": run_id
+    }
+    await db.groups.insert_one(group)
+    await db.users.update_one({"id": creator}, {"$push": {"groups": group["id"]}})
+    return run_id, group, user_ids[1:]
+
+
+async def join(session, semaphore, group, user_id, endpoint):
+    if endpoint == "join":
+        path, data = f"/groups/{group['id']}/join", {"user_id": user_id}
+    elif endpoint == "join-by-code":
+        path, data = "/groups/join-by-code", {"user_id": user_id, "invite_code": group["invite_code"].lower()}
+    else:
+        path, data = f"/groups/{group['id']}/join-by-code", {"user_id": user_id, "invite_code": group["invite_code"]}
+
+    async with semaphore:
+        try:
+            async with session.post(f"{API_BASE}{path}", data=data) as response:
+                return endpoint, response.status
+        except aiohttp.ClientError as e:
+            return endpoint, type(e).__name__
+
+
+async def verify(db, group_id, max_members):
+    group = await db.groups.find_one({"id": group_id}, {"_id": 0, "members": 1, "member_count": 1})
+    members = group["members"]
+    duplicates = [member for member, count in Counter(members).items() if count > 1]
+    user_group_counts = {}
+    async for user in db.users.find({"groups": group_id}, {"_id": 0, "id": 1, "groups": 1}):
+        user_group_counts[user["id"]] = user["groups"].count(group_id)
+
+    failures = []
+    if len(members) > max_members:
+        failures.append(f"cap exceeded: {len(members)} members > {max_members}")
+    if duplicates:
+        failures.append(f"duplicate members: {duplicates}")
+    if group.get("member_count") != len(members):
+        failures.append(f"member_count {group.get('member_count')} != {len(members)} members")
+    if set(user_group_counts) != set(members):
+        failures.append("user group lists don't match group members")
+    if any(count > 1 for count in user_group_counts.values()):
+        failures.append("group listed twice on a user")
+    return {"members": len(members), "member_count": group.get("member_count"), "failures": failures}
+
+
+async def main():
+    load_dotenv(BACKEND_DIR / ".env")
+
+    parser = argparse.ArgumentParser(description="Stress concurrent joins against one ACTIFY group")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.environ.get("DB_NAME", "test_database"))
+    parser.add_argument("--users", type=int, default=50, help="Distinct users racing to join")
+    parser.add_argument("--attempts-per-user", type=int, default=3, help="Concurrent join requests per user")
+    parser.add_argument("--max-members", type=int, default=7)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=1, help="Repeat with a fresh group")
+    parser.add_argument("--keep", action="store_true", help="Don't delete the seeded users and groups")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db]
+    results = []
+    failed = False
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=args.concurrency)) as session:
+        semaphore = asyncio.Semaphore(args.concurrency)
+        for _ in range(args.rounds):
+            run_id, group, user_ids = await seed(db, args.users, args.max_members)
+            requests = [
+                (user_id, random.choice(["join", "join-by-code", "join-by-group-code"]))
+                for user_id in user_ids
+                for _ in range(args.attempts_per_user)
+            ]
+            random.shuffle(requests)
+            responses = await asyncio.gather(*(
+                join(session, semaphore, group, user_id, endpoint) for user_id, endpoint in requests
+            ))
+
+            result = await verify(db, group["id"], args.max_members)
+            result["group_id"] = group["id"]
+            result["responses"] = {
+                f"{endpoint} {status}": count for (endpoint, status), count in sorted(Counter(responses).items(), key=str)
+            }
+            successes = sum(1 for _, status in responses if status == 200)
+            if successes != result["members"] - 1:
+                result["failures"].append(f"{successes} successful joins but {result['members'] - 1} members added")
+            failed = failed or bool(result["failures"])
+            results.append(result)
+
+            if not args.keep:
+                await db.groups.delete_one({"stress_run": run_id})
+                await db.users.delete_many({"stress_run": run_id})
+                await db.notifications.delete_many({"data.group_id": group["id"]})
+
+    print(json.dumps({"passed": not failed, "rounds": results}, indent=2))
+    client.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))